@@ -1,36 +1,65 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_restx import Api
-from decouple import config
+from decouple import config as env_config # backend.app.config (the submodule) shadows a plain `config`
 from .config import config_by_name
+from .services.payment_gateway import PaymentGateway
+from .utils.compression import Compression
+from .utils.db_pool import prewarm_pool
+from .utils.db_routing import ReplicaRouter, RoutingSession
+from .utils.metrics import Metrics
+from .utils.profiler import Profiler
 
-db = SQLAlchemy()
-api = Api(
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+rest_api = Api( # not `api`: importing backend.app.api rebinds that name to the subpackage
     version='1.0',
     title='Document Analysis Platform API',
     description='API for managing documents, analyses, orders, and payments.',
     doc='/swagger/'
 )
+payment_gateway = PaymentGateway()
+compression = Compression()
+replica_router = ReplicaRouter()
+metrics = Metrics()
+profiler = Profiler()
 
-def create_app():
+def create_app(config_name=None):
     app = Flask(__name__)
-    app_settings = config('APP_SETTINGS', 'development')
+    app_settings = config_name or env_config('APP_SETTINGS', 'development')
     app.config.from_object(config_by_name[app_settings])
 
+    replica_router.init_app(app) # Adds the replica binds, so before db.init_app
     db.init_app(app)
-    api.init_app(app)
+    if app.config.get('DB_POOL_PREWARM'):
+        with app.app_context():
+            prewarm_pool(db.engine, app.config['DB_POOL_PREWARM'])
+    rest_api.init_app(app)
+    payment_gateway.init_app(app)
+    compression.init_app(app)
+    metrics.init_app(app)
+    profiler.init_app(app)
 
     from backend.app.api.auth import auth_ns
     from backend.app.api.orders import orders_ns
     from backend.app.api.documents import documents_ns
     from backend.app.api.analyses import analyses_ns
     from backend.app.api.payments import payments_ns
+    from backend.app.api.notifications import notifications_ns
+    from backend.app.api.exports import exports_ns
+    from backend.app.api.health import health_ns
 
-    api.add_namespace(auth_ns, path='/auth')
-    api.add_namespace(orders_ns, path='/orders')
-    api.add_namespace(documents_ns, path='/documents')
-    api.add_namespace(analyses_ns, path='/analyses')
-    api.add_namespace(payments_ns, path='/payments')
+    rest_api.add_namespace(auth_ns, path='/auth')
+    rest_api.add_namespace(orders_ns, path='/orders')
+    rest_api.add_namespace(documents_ns, path='/documents')
+    rest_api.add_namespace(analyses_ns, path='/analyses')
+    rest_api.add_namespace(payments_ns, path='/payments')
+    rest_api.add_namespace(notifications_ns, path='/notifications')
+    rest_api.add_namespace(exports_ns, path='/exports')
+    rest_api.add_namespace(health_ns, path='/health')
+
+    from backend.app.commands import payments_cli, notifications_cli
+    app.cli.add_command(payments_cli)
+    app.cli.add_command(notifications_cli)
 
     # Register error handlers
     from backend.app.utils.exceptions import APIError
@@ -1,5 +1,6 @@
 from flask_restx import Namespace, Resource, fields
 from backend.app.utils.decorators import token_required
+from backend.app.utils.serializers import serialize_list_with
 from backend.app.services.analysis_service import AnalysisService
 
 analyses_ns = Namespace('analyses', description='Analysis related operations')
@@ -28,7 +29,7 @@ class OrderAnalysis(Resource):
         analysis = AnalysisService.request_analysis(order_id, data['analysis_type'], current_user.id)
         return analysis, 201
 
-    @analyses_ns.marshal_list_with(analysis_model)
+    @serialize_list_with(analysis_model)
     @analyses_ns.doc(description='Get all analyses for a specific order')
     @token_required
     def get(self, current_user, order_id):
@@ -0,0 +1,36 @@
+from flask import Response, current_app, stream_with_context
+from flask_restx import Namespace, Resource, inputs
+from backend.app.utils.decorators import token_required
+from backend.app.services.export_service import ExportService
+
+exports_ns = Namespace('exports', description='Bulk export of the current user\'s history')
+
+export_parser = exports_ns.parser()
+export_parser.add_argument('format', type=str, location='args', default='ndjson',
+                           choices=tuple(ExportService.FORMATS), help='ndjson or csv')
+export_parser.add_argument('since', type=inputs.datetime_from_iso8601, location='args',
+                           help='Only rows created at or after this ISO 8601 timestamp')
+export_parser.add_argument('until', type=inputs.datetime_from_iso8601, location='args',
+                           help='Only rows created before this ISO 8601 timestamp')
+export_parser.add_argument('after', type=int, location='args',
+                           help='Resume after this id (the last id received)')
+
+@exports_ns.route('/<string:resource>')
+@exports_ns.param('resource', 'orders, documents or analyses')
+class Export(Resource):
+    @exports_ns.expect(export_parser)
+    @exports_ns.doc(description='Stream all rows of a resource as NDJSON or CSV, ordered by id')
+    @token_required
+    def get(self, current_user, resource):
+        args = export_parser.parse_args()
+        chunks = ExportService.stream(
+            resource, args['format'], current_user.id,
+            batch_size=current_app.config['EXPORT_BATCH_SIZE'],
+            since=args['since'], until=args['until'], after=args['after']
+        )
+        filename = f'{resource}.{args["format"]}'
+        return Response(
+            stream_with_context(chunks), # Keeps the request (and its DB session) alive while streaming
+            mimetype=ExportService.FORMATS[args['format']],
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
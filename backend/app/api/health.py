@@ -0,0 +1,33 @@
+import time
+from flask_restx import Namespace, Resource
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from backend.app import db, replica_router
+from backend.app.utils.db_pool import pool_status
+
+health_ns = Namespace('health', description='Liveness and database pool telemetry')
+
+@health_ns.route('/')
+class Health(Resource):
+    @health_ns.doc(description='Liveness check, does not touch the database')
+    def get(self):
+        return {'status': 'healthy'}, 200
+
+@health_ns.route('/db')
+class DatabaseHealth(Resource):
+    @health_ns.doc(description='Database round trip and connection pool statistics')
+    def get(self):
+        start = time.perf_counter()
+        try:
+            db.session.execute(text('SELECT 1'))
+            status, code = 'healthy', 200
+        except SQLAlchemyError:
+            status, code = 'unavailable', 503
+        finally:
+            db.session.remove() # Return the connection before reading the pool counters
+        return {
+            'status': status,
+            'latency_ms': round((time.perf_counter() - start) * 1000, 2),
+            'pool': pool_status(db.engine),
+            'replica_lag_seconds': replica_router.status(),
+        }, code
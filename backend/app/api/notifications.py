@@ -0,0 +1,67 @@
+from flask_restx import Namespace, Resource, fields, inputs
+from backend.app.utils.decorators import token_required
+from backend.app.utils.serializers import serialize_with
+from backend.app.services.inbox_service import InboxService
+
+notifications_ns = Namespace('notifications', description='In-app notification inbox')
+
+notification_model = notifications_ns.model('Notification', {
+    'id': fields.Integer(readOnly=True, description='The notification unique identifier'),
+    'message': fields.String(required=True, description='The notification text'),
+    'type': fields.String(required=True, description='The notification type'),
+    'read_at': fields.DateTime(readOnly=True, description='When the notification was read, null if unread'),
+    'created_at': fields.DateTime(readOnly=True, description='The timestamp when the notification was created')
+})
+
+notification_page_model = notifications_ns.model('NotificationPage', {
+    'items': fields.List(fields.Nested(notification_model)),
+    'next_cursor': fields.Integer(description='Pass as cursor to get the next page, null on the last page'),
+    'unread_count': fields.Integer(description='Unread notifications of the current user')
+})
+
+unread_count_model = notifications_ns.model('UnreadCount', {
+    'unread_count': fields.Integer(description='Unread notifications of the current user')
+})
+
+notification_list_parser = notifications_ns.parser()
+notification_list_parser.add_argument('cursor', type=int, location='args', help='next_cursor of the previous page')
+notification_list_parser.add_argument('limit', type=int, location='args', default=InboxService.DEFAULT_PAGE_SIZE,
+                                      help=f'Page size, at most {InboxService.MAX_PAGE_SIZE}')
+notification_list_parser.add_argument('unread_only', type=inputs.boolean, location='args', default=False)
+
+@notifications_ns.route('/')
+class NotificationList(Resource):
+    @notifications_ns.expect(notification_list_parser)
+    @serialize_with(notification_page_model)
+    @notifications_ns.doc(description='Get a page of the current user\'s notifications, newest first')
+    @token_required
+    def get(self, current_user):
+        args = notification_list_parser.parse_args()
+        items, next_cursor = InboxService.list_notifications(
+            current_user.id, cursor=args['cursor'], limit=args['limit'], unread_only=args['unread_only']
+        )
+        return {'items': items, 'next_cursor': next_cursor, 'unread_count': InboxService.unread_count(current_user.id)}
+
+@notifications_ns.route('/unread-count')
+class NotificationUnreadCount(Resource):
+    @notifications_ns.marshal_with(unread_count_model)
+    @notifications_ns.doc(description='Get the unread notification count (for badges)')
+    @token_required
+    def get(self, current_user):
+        return {'unread_count': InboxService.unread_count(current_user.id)}
+
+@notifications_ns.route('/<int:notification_id>/read')
+class NotificationRead(Resource):
+    @notifications_ns.marshal_with(unread_count_model)
+    @notifications_ns.doc(description='Mark a notification as read')
+    @token_required
+    def post(self, current_user, notification_id):
+        return {'unread_count': InboxService.mark_read(current_user.id, notification_id)}
+
+@notifications_ns.route('/read-all')
+class NotificationReadAll(Resource):
+    @notifications_ns.doc(description='Mark all notifications of the current user as read')
+    @token_required
+    def post(self, current_user):
+        marked = InboxService.mark_all_read(current_user.id)
+        return {'message': 'All notifications marked as read', 'marked': marked}, 200
@@ -1,6 +1,7 @@
 from flask import request
 from flask_restx import Namespace, Resource, fields
 from backend.app.utils.decorators import token_required
+from backend.app.utils.serializers import serialize_list_with
 from backend.app.services.order_service import OrderService
 from backend.app.services.document_service import DocumentService
 from werkzeug.datastructures import FileStorage
@@ -26,7 +27,7 @@ document_upload_parser.add_argument('file', type=FileStorage, location='files',
 
 @orders_ns.route('/')
 class OrderList(Resource):
-    @orders_ns.marshal_list_with(order_model)
+    @serialize_list_with(order_model)
     @orders_ns.doc(description='Get all orders for the current user')
     @token_required
     def get(self, current_user):
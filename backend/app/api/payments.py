@@ -1,5 +1,6 @@
+from flask import request
 from flask_restx import Namespace, Resource, fields
-from backend.app.utils.decorators import token_required
+from backend.app.utils.decorators import token_required, idempotent
 from backend.app.services.payment_service import PaymentService
 
 payments_ns = Namespace('payments', description='Payment related operations')
@@ -14,13 +15,18 @@ payment_confirm_parser.add_argument('payment_intent_id', type=str, required=True
 @payments_ns.route('/orders/<int:order_id>/payment-intent')
 class PaymentIntentResource(Resource):
     @payments_ns.marshal_with(payment_intent_model)
-    @payments_ns.doc(description='Create a Stripe Payment Intent for an order')
+    @payments_ns.doc(description='Create a Stripe Payment Intent for an order',
+                     params={'Idempotency-Key': {'in': 'header', 'description': 'Optional key making retries safe'}})
     @token_required
+    @idempotent
     def post(self, current_user, order_id):
         # In a real app, the amount would be calculated based on the order details
         # For simplicity, we'll use a fixed amount or derive it from order
         amount = 1000 # Example amount in cents (e.g., $10.00)
-        client_secret = PaymentService.create_payment_intent(order_id, amount, current_user.id)
+        client_secret = PaymentService.create_payment_intent(
+            order_id, amount, current_user.id,
+            idempotency_key=request.headers.get('Idempotency-Key')
+        )
         return {'client_secret': client_secret}, 201
 
 @payments_ns.route('/orders/<int:order_id>/payment-confirm')
@@ -32,3 +38,12 @@ class PaymentConfirmResource(Resource):
         data = payment_confirm_parser.parse_args()
         PaymentService.confirm_payment(order_id, data['payment_intent_id'], current_user.id)
         return {'message': 'Payment confirmed successfully'}, 200
+
+
+@payments_ns.route('/webhook')
+class StripeWebhookResource(Resource):
+    @payments_ns.doc(description='Receive signed Stripe payment_intent.* webhook events')
+    def post(self):
+        # Authenticated by the Stripe-Signature header instead of a user token
+        PaymentService.handle_webhook_event(request.get_data(), request.headers.get('Stripe-Signature'))
+        return {'received': True}, 200
@@ -0,0 +1,33 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from backend.app.services.notification_dispatcher import NotificationDispatcher
+from backend.app.services.reconciliation_service import PaymentReconciliationService
+
+payments_cli = AppGroup('payments', help='Payment maintenance commands.')
+notifications_cli = AppGroup('notifications', help='Notification delivery commands.')
+
+@payments_cli.command('reconcile')
+@click.option('--page-size', default=100, show_default=True, help='Payment intents requested per Stripe list call (max 100).')
+def reconcile_payments(page_size):
+    """Sync non-final payments with Stripe; resumes an interrupted run."""
+    summary = PaymentReconciliationService.reconcile(page_size=page_size)
+    click.echo(
+        f"{'Resumed' if summary['resumed'] else 'Reconciled'}: {summary['intents']} intents in {summary['pages']} pages, "
+        f"{summary['payments_synced']} payments synced, {summary['orders_paid']} orders marked paid."
+    )
+
+@notifications_cli.command('dispatch')
+@click.option('--once', is_flag=True, help='Drain one batch and exit instead of polling.')
+def dispatch_notifications(once):
+    """Deliver pending notifications from the outbox."""
+    dispatcher = NotificationDispatcher(current_app)
+    try:
+        if once:
+            summary = dispatcher.run_once()
+            click.echo(f"Claimed {summary['claimed']} in {summary['messages']} messages: "
+                       f"{summary['sent']} sent, {summary['failed']} failed.")
+        else:
+            dispatcher.run_forever(current_app.config['NOTIFICATION_POLL_INTERVAL'])
+    finally:
+        dispatcher.close()
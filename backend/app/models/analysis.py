@@ -4,6 +4,9 @@ from sqlalchemy.dialects.postgresql import JSONB
 
 class Analysis(db.Model):
     __tablename__ = 'analyses'
+    __table_args__ = (
+        db.Index('ix_analyses_order_id', 'order_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
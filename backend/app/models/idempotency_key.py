@@ -0,0 +1,21 @@
+from datetime import datetime
+from backend.app import db
+from sqlalchemy.dialects.postgresql import JSONB
+
+class IdempotencyKey(db.Model):
+    __tablename__ = 'idempotency_keys'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'key', name='uq_idempotency_keys_user_id_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    key = db.Column(db.String(255), nullable=False) # Client-supplied Idempotency-Key header
+    request_fingerprint = db.Column(db.String(64), nullable=False) # sha256 of method, path and body
+    response_code = db.Column(db.Integer, nullable=True) # NULL while the first request is in flight
+    response_body = db.Column(JSONB, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<IdempotencyKey {self.key} for User {self.user_id}>'
@@ -0,0 +1,21 @@
+from datetime import datetime
+from backend.app import db
+
+class InAppNotification(db.Model):
+    __tablename__ = 'in_app_notifications'
+    __table_args__ = (
+        # Inbox pages are read newest first by id, per user
+        db.Index('ix_in_app_notifications_user_id_id', 'user_id', 'id'),
+        # Keeps "mark all read" from touching read rows
+        db.Index('ix_in_app_notifications_user_id_unread', 'user_id', postgresql_where=db.text('read_at IS NULL')),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    type = db.Column(db.String(50), default='info', nullable=False)
+    read_at = db.Column(db.DateTime, nullable=True) # NULL while unread
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<InAppNotification {self.id} for User {self.user_id}>'
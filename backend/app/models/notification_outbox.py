@@ -0,0 +1,36 @@
+from datetime import datetime
+from backend.app import db
+
+class NotificationOutbox(db.Model):
+    """Notifications waiting to be delivered by the NotificationDispatcher.
+
+    Rows are added in the same transaction as the business change that
+    triggers them, so a notification is sent if and only if that change commits.
+    """
+    __tablename__ = 'notification_outbox'
+    __table_args__ = (
+        # Serves the dispatcher's "due and pending" claim query
+        db.Index('ix_notification_outbox_due', 'next_attempt_at', postgresql_where=db.text("status = 'pending'")),
+        # Finds the open digest window of a user when coalescing
+        db.Index('ix_notification_outbox_user_pending', 'user_id', 'channel', 'recipient', postgresql_where=db.text("status = 'pending'")),
+        # Finds rows left 'sending' by a dispatcher that stopped mid-batch
+        db.Index('ix_notification_outbox_lease', 'lease_expires_at', postgresql_where=db.text("status = 'sending'")),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    channel = db.Column(db.String(20), nullable=False) # 'email' or 'sms'
+    recipient = db.Column(db.String(255), nullable=False) # email address or phone number
+    subject = db.Column(db.String(255), nullable=True)
+    body = db.Column(db.Text, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    type = db.Column(db.String(50), default='info', nullable=False)
+    status = db.Column(db.String(20), default='pending', nullable=False) # 'pending', 'sending', 'sent', 'failed'
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    last_error = db.Column(db.Text, nullable=True)
+    lease_expires_at = db.Column(db.DateTime, nullable=True) # While 'sending': when another dispatcher may claim the row again
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<NotificationOutbox {self.id} {self.channel} to {self.recipient} - {self.status}>'
@@ -3,13 +3,20 @@ from backend.app import db
 
 class Payment(db.Model):
     __tablename__ = 'payments'
+    __table_args__ = (
+        db.Index('ix_payments_order_id_status', 'order_id', 'status'),
+        # At most one pending intent per order; also serves the pending-intent lookup
+        db.Index('uq_payments_order_id_pending', 'order_id', unique=True,
+                 postgresql_where=db.text("status = 'pending'"), sqlite_where=db.text("status = 'pending'")),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
     stripe_payment_intent_id = db.Column(db.String(255), unique=True, nullable=False)
     amount = db.Column(db.Float, nullable=False)
     currency = db.Column(db.String(10), default='usd', nullable=False)
-    status = db.Column(db.String(50), default='pending', nullable=False) # e.g., 'pending', 'succeeded', 'failed'
+    status = db.Column(db.String(50), default='pending', nullable=False) # 'pending' (any non-final Stripe status), 'succeeded' or 'canceled'
+    status_synced_at = db.Column(db.DateTime, nullable=True) # Last time the status was confirmed by Stripe (webhook or API)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -0,0 +1,16 @@
+from datetime import datetime
+from backend.app import db
+
+class ReconciliationCheckpoint(db.Model):
+    """Progress of a resumable reconciliation run against a Stripe list endpoint."""
+    __tablename__ = 'reconciliation_checkpoints'
+
+    name = db.Column(db.String(100), primary_key=True) # e.g., 'stripe_payment_intents'
+    window_start = db.Column(db.Integer, nullable=True) # Unix timestamp, Stripe 'created[gte]' of the current run
+    window_end = db.Column(db.Integer, nullable=True) # Unix timestamp, Stripe 'created[lte]' of the current run
+    starting_after = db.Column(db.String(255), nullable=True) # Last object id processed; NULL when no run is in progress
+    last_completed_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ReconciliationCheckpoint {self.name} after {self.starting_after}>'
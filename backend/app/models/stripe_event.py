@@ -0,0 +1,14 @@
+from datetime import datetime
+from backend.app import db
+
+class StripeEvent(db.Model):
+    """Stripe webhook events already processed, keyed by Stripe's event id."""
+    __tablename__ = 'stripe_events'
+
+    id = db.Column(db.String(255), primary_key=True) # Stripe event id (evt_...)
+    type = db.Column(db.String(100), nullable=False) # e.g., 'payment_intent.succeeded'
+    payment_intent_id = db.Column(db.String(255), nullable=True)
+    received_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<StripeEvent {self.id} ({self.type})>'
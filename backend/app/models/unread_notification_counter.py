@@ -0,0 +1,14 @@
+from backend.app import db
+
+class UnreadNotificationCounter(db.Model):
+    """Denormalized unread count per user, kept in step with in_app_notifications.
+
+    Badges read this single row instead of counting the inbox.
+    """
+    __tablename__ = 'unread_notification_counters'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    unread_count = db.Column(db.Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f'<UnreadNotificationCounter User {self.user_id}: {self.unread_count}>'
@@ -2,6 +2,7 @@ from datetime import datetime
 from backend.app import db
 from backend.app.models.analysis import Analysis
 from backend.app.models.order import Order
+from backend.app.utils.db_routing import replica_read
 from backend.app.utils.exceptions import NotFoundError, ForbiddenError, BadRequestError
 
 class AnalysisService:
@@ -29,6 +30,7 @@ class AnalysisService:
         return new_analysis
 
     @staticmethod
+    @replica_read
     def get_analyses_for_order(order_id, user_id):
         order = Order.query.get(order_id)
         if not order:
@@ -0,0 +1,125 @@
+import csv
+import io
+import json
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import select
+from backend.app import db
+from backend.app.models.analysis import Analysis
+from backend.app.models.document import Document
+from backend.app.models.order import Order
+from backend.app.utils.db_pool import set_idle_in_transaction_timeout
+from backend.app.utils.exceptions import BadRequestError, NotFoundError
+
+class ExportService:
+    """Streams a user's history as NDJSON or CSV with constant memory.
+
+    Rows are read through a server-side cursor in batches of
+    EXPORT_BATCH_SIZE (yield_per) and each batch is encoded into one chunk,
+    so neither ORM objects nor the whole result are ever held in memory.
+    Rows come out in id order; passing the last received id as ``after``
+    resumes an interrupted export.
+    """
+    # resource: (model, exported columns, date column used for since/until)
+    RESOURCES = {
+        'orders': (Order, ('id', 'status', 'created_at', 'updated_at'), 'created_at'),
+        'documents': (Document, ('id', 'order_id', 'filename', 'file_type', 'status', 'uploaded_at'), 'uploaded_at'),
+        'analyses': (Analysis, ('id', 'order_id', 'analysis_type', 'status', 'result_data', 'created_at', 'completed_at'), 'created_at'),
+    }
+    FORMATS = {
+        'ndjson': 'application/x-ndjson',
+        'csv': 'text/csv',
+    }
+
+    @staticmethod
+    def columns(resource):
+        return ExportService._resource(resource)[1]
+
+    @staticmethod
+    def build_query(resource, user_id, since=None, until=None, after=None):
+        model, columns, date_column = ExportService._resource(resource)
+        if since and until and since > until:
+            raise BadRequestError('since must not be later than until.')
+
+        query = select(*(getattr(model, name) for name in columns))
+        if model is Order:
+            query = query.where(Order.user_id == user_id)
+        else:
+            query = query.join(Order, Order.id == model.order_id).where(Order.user_id == user_id)
+        if since:
+            query = query.where(getattr(model, date_column) >= since)
+        if until:
+            query = query.where(getattr(model, date_column) < until)
+        if after:
+            query = query.where(model.id > after)
+        return query.order_by(model.id)
+
+    @staticmethod
+    def iter_batches(query, batch_size):
+        """Yields lists of row tuples fetched through a server-side cursor.
+
+        The transaction sits idle while a slow client drains the response, so it
+        gets EXPORT_IDLE_IN_TRANSACTION_TIMEOUT_MS instead of the pool-wide limit.
+        """
+        set_idle_in_transaction_timeout(db.session, current_app.config['EXPORT_IDLE_IN_TRANSACTION_TIMEOUT_MS'])
+        result = db.session.execute(query.execution_options(yield_per=batch_size))
+        try:
+            for partition in result.partitions():
+                yield partition
+        finally:
+            result.close()
+
+    @staticmethod
+    def stream(resource, export_format, user_id, batch_size, since=None, until=None, after=None):
+        if export_format not in ExportService.FORMATS:
+            raise BadRequestError(f'Unsupported export format: {export_format}. Use one of: {", ".join(ExportService.FORMATS)}')
+        query = ExportService.build_query(resource, user_id, since=since, until=until, after=after)
+        batches = ExportService.iter_batches(query, batch_size)
+        columns = ExportService.columns(resource)
+        if export_format == 'csv':
+            return ExportService.encode_csv(columns, batches)
+        return ExportService.encode_ndjson(columns, batches)
+
+    @staticmethod
+    def encode_ndjson(columns, batches):
+        for batch in batches:
+            yield ''.join(
+                json.dumps(dict(zip(columns, row)), default=ExportService._json_default, ensure_ascii=False) + '\n'
+                for row in batch
+            )
+
+    @staticmethod
+    def encode_csv(columns, batches):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for batch in batches:
+            writer.writerows(
+                [ExportService._csv_value(value) for value in row]
+                for row in batch
+            )
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue() # Header only: nothing matched
+
+    @staticmethod
+    def _resource(resource):
+        if resource not in ExportService.RESOURCES:
+            raise NotFoundError(f'Unknown export resource: {resource}.')
+        return ExportService.RESOURCES[resource]
+
+    @staticmethod
+    def _json_default(value):
+        if isinstance(value, datetime):
+            return value.isoformat() # Same format as the API models
+        raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+    @staticmethod
+    def _csv_value(value):
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, ensure_ascii=False)
+        return value
@@ -0,0 +1,50 @@
+import hashlib
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from backend.app import db
+from backend.app.models.idempotency_key import IdempotencyKey
+from backend.app.utils.exceptions import BadRequestError, ConflictError
+
+class IdempotencyService:
+    @staticmethod
+    def fingerprint(method, path, body):
+        digest = hashlib.sha256()
+        for part in (method.encode(), path.encode(), body or b''):
+            digest.update(part)
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    @staticmethod
+    def begin(user_id, key, fingerprint):
+        """Claims the key for this request, or returns the earlier record if the key was already used.
+
+        A returned record with a response_code is a completed request whose response should be replayed.
+        """
+        record = IdempotencyKey(user_id=user_id, key=key, request_fingerprint=fingerprint)
+        db.session.add(record)
+        try:
+            db.session.commit()
+            return record
+        except IntegrityError:
+            db.session.rollback()
+
+        existing = IdempotencyKey.query.filter_by(user_id=user_id, key=key).first()
+        if existing.request_fingerprint != fingerprint:
+            raise BadRequestError('Idempotency-Key has already been used for a different request.')
+        if existing.response_code is None:
+            raise ConflictError('A request with this Idempotency-Key is still being processed.')
+        return existing
+
+    @staticmethod
+    def complete(record, response_body, response_code):
+        record.response_body = response_body
+        record.response_code = response_code
+        record.completed_at = datetime.utcnow()
+        db.session.commit()
+
+    @staticmethod
+    def release(record):
+        # The request failed; free the key so the client can retry it.
+        db.session.rollback()
+        db.session.delete(record)
+        db.session.commit()
@@ -0,0 +1,100 @@
+from datetime import datetime
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
+from backend.app import db
+from backend.app.models.in_app_notification import InAppNotification
+from backend.app.models.unread_notification_counter import UnreadNotificationCounter
+from backend.app.utils.db_routing import replica_read
+from backend.app.utils.exceptions import NotFoundError
+
+class InboxService:
+    """In-app notification inbox.
+
+    Every write updates the user's unread counter in the same transaction:
+    inserts increment it, mark-read decrements it by the number of rows that
+    actually changed, so the counter never needs a COUNT(*) to stay correct.
+    """
+    DEFAULT_PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+
+    @staticmethod
+    def add(user_id, message, type='info'):
+        """Stores a notification in the caller's transaction (no commit)."""
+        notification = InAppNotification(user_id=user_id, message=message, type=type)
+        db.session.add(notification)
+        db.session.flush()
+        db.session.execute(
+            insert(UnreadNotificationCounter)
+            .values(user_id=user_id, unread_count=1)
+            .on_conflict_do_update(
+                index_elements=[UnreadNotificationCounter.user_id],
+                set_={'unread_count': UnreadNotificationCounter.unread_count + 1}
+            )
+        )
+        return notification
+
+    @staticmethod
+    @replica_read
+    def list_notifications(user_id, cursor=None, limit=DEFAULT_PAGE_SIZE, unread_only=False):
+        """Returns (notifications, next_cursor), newest first.
+
+        The cursor is the id of the last notification of the previous page, so
+        pages stay stable while new notifications arrive.
+        """
+        limit = max(1, min(limit or InboxService.DEFAULT_PAGE_SIZE, InboxService.MAX_PAGE_SIZE))
+        query = InAppNotification.query.filter(InAppNotification.user_id == user_id)
+        if cursor is not None:
+            query = query.filter(InAppNotification.id < cursor)
+        if unread_only:
+            query = query.filter(InAppNotification.read_at.is_(None))
+        # One extra row tells whether another page exists
+        rows = query.order_by(InAppNotification.id.desc()).limit(limit + 1).all()
+        next_cursor = rows[limit - 1].id if len(rows) > limit else None
+        return rows[:limit], next_cursor
+
+    @staticmethod
+    @replica_read
+    def unread_count(user_id):
+        count = db.session.query(UnreadNotificationCounter.unread_count).filter_by(user_id=user_id).scalar()
+        return count or 0
+
+    @staticmethod
+    def mark_read(user_id, notification_id):
+        changed = db.session.execute(
+            update(InAppNotification)
+            .where(
+                InAppNotification.id == notification_id,
+                InAppNotification.user_id == user_id,
+                InAppNotification.read_at.is_(None)
+            )
+            .values(read_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not changed and not InAppNotification.query.filter_by(id=notification_id, user_id=user_id).first():
+            raise NotFoundError('Notification not found.')
+        InboxService._decrement(user_id, changed)
+        db.session.commit()
+        return InboxService.unread_count(user_id)
+
+    @staticmethod
+    def mark_all_read(user_id):
+        changed = db.session.execute(
+            update(InAppNotification)
+            .where(InAppNotification.user_id == user_id, InAppNotification.read_at.is_(None))
+            .values(read_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        InboxService._decrement(user_id, changed)
+        db.session.commit()
+        return changed
+
+    @staticmethod
+    def _decrement(user_id, count):
+        if not count:
+            return
+        db.session.execute(
+            update(UnreadNotificationCounter)
+            .where(UnreadNotificationCounter.user_id == user_id)
+            .values(unread_count=UnreadNotificationCounter.unread_count - count)
+            .execution_options(synchronize_session=False)
+        )
@@ -0,0 +1,300 @@
+import logging
+import queue
+import random
+import smtplib
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from sqlalchemy import and_, or_, update
+from backend.app import db
+from backend.app.models.notification_outbox import NotificationOutbox
+
+logger = logging.getLogger(__name__)
+
+# Detached copy of one outbox row, or of several merged into a digest, safe to hand
+# to sender threads. row_ids lists the merged rows and row_attempts their own attempt
+# counts; empty means just (id,) with attempts.
+NotificationJob = namedtuple('NotificationJob', 'id channel recipient subject body attempts row_ids row_attempts',
+                             defaults=((), ()))
+
+
+class SMTPConnectionPool:
+    """Keeps authenticated SMTP connections open between messages."""
+
+    def __init__(self, host, port, username=None, password=None, use_tls=False, timeout=10,
+                 max_size=4, idle_check_seconds=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.idle_check_seconds = idle_check_seconds
+        self._idle = queue.LifoQueue(maxsize=max_size)
+
+    @contextmanager
+    def connection(self):
+        conn = self._checkout()
+        try:
+            yield conn
+        except (smtplib.SMTPServerDisconnected, OSError):
+            self._discard(conn)
+            raise
+        except Exception:
+            # Protocol-level errors (e.g. a rejected recipient) leave the session usable after RSET
+            try:
+                conn.rset()
+            except (smtplib.SMTPException, OSError):
+                self._discard(conn)
+                raise
+            self._checkin(conn)
+            raise
+        else:
+            self._checkin(conn)
+
+    def close(self):
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(conn)
+
+    def _checkout(self):
+        while True:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if time.monotonic() - last_used < self.idle_check_seconds:
+                return conn
+            try:
+                conn.noop() # The server may have dropped a long-idle connection
+                return conn
+            except (smtplib.SMTPException, OSError):
+                self._discard(conn)
+
+    def _checkin(self, conn):
+        try:
+            self._idle.put_nowait((conn, time.monotonic()))
+        except queue.Full:
+            self._discard(conn)
+
+    def _connect(self):
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            conn.starttls()
+        if self.username:
+            conn.login(self.username, self.password)
+        return conn
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.quit()
+        except (smtplib.SMTPException, OSError):
+            conn.close()
+
+
+class NotificationDispatcher:
+    """Drains the notification outbox in batches.
+
+    Due rows are claimed with FOR UPDATE SKIP LOCKED and marked 'sending'
+    under a lease in a short transaction, so several dispatchers can run side
+    by side and no row lock or transaction is held while talking to SMTP or
+    SMS providers. Rows whose lease expired are claimed again. Non-urgent
+    email and SMS rows of the same user and recipient are merged into one
+    digest message. Each channel gets its own bounded thread pool and results
+    are written back with one UPDATE per outcome kind.
+    """
+
+    def __init__(self, app):
+        self.batch_size = app.config['NOTIFICATION_BATCH_SIZE']
+        self.max_attempts = app.config['NOTIFICATION_MAX_ATTEMPTS']
+        self.retry_backoff = app.config['NOTIFICATION_RETRY_BACKOFF']
+        self.lease_seconds = app.config['NOTIFICATION_LEASE_SECONDS']
+        self.mail_sender = app.config['MAIL_DEFAULT_SENDER']
+        self.concurrency = app.config['NOTIFICATION_CHANNEL_CONCURRENCY']
+        self.coalesce = app.config['NOTIFICATION_COALESCE_WINDOW'] > 0
+        self.coalesce_channels = app.config['NOTIFICATION_COALESCE_CHANNELS']
+        self.urgent_types = app.config['NOTIFICATION_URGENT_TYPES']
+        self.smtp_pool = SMTPConnectionPool(
+            app.config['SMTP_HOST'],
+            app.config['SMTP_PORT'],
+            username=app.config['SMTP_USERNAME'],
+            password=app.config['SMTP_PASSWORD'],
+            use_tls=app.config['SMTP_USE_TLS'],
+            timeout=app.config['SMTP_TIMEOUT'],
+            max_size=self.concurrency['email']
+        )
+        self.senders = {
+            'email': self._send_email,
+            'sms': self._send_sms,
+        }
+        self._executors = {
+            channel: ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f'notify-{channel}')
+            for channel, limit in self.concurrency.items()
+        }
+
+    def run_forever(self, poll_interval, stop_event=None):
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            processed = self.run_once()
+            if not processed['claimed']:
+                stop_event.wait(poll_interval)
+
+    def run_once(self):
+        jobs, lease = self.claim()
+        results = self.dispatch(jobs)
+        summary = self._record_results(jobs, results, lease)
+        db.session.commit()
+        return summary
+
+    def claim(self):
+        """Marks a batch of due rows 'sending' and commits. Returns (jobs, lease expiry).
+
+        The lease expiry also identifies this claim: results are only written
+        to rows that still carry it.
+        """
+        now = datetime.utcnow()
+        rows = NotificationOutbox.query.filter(or_(
+            and_(NotificationOutbox.status == 'pending', NotificationOutbox.next_attempt_at <= now),
+            and_(NotificationOutbox.status == 'sending', NotificationOutbox.lease_expires_at <= now)
+        )).order_by(NotificationOutbox.next_attempt_at, NotificationOutbox.id).limit(self.batch_size).with_for_update(skip_locked=True).all()
+        jobs = self.build_jobs(rows)
+
+        lease = now + timedelta(seconds=self.lease_seconds)
+        if rows:
+            db.session.execute(
+                update(NotificationOutbox)
+                .where(NotificationOutbox.id.in_([row.id for row in rows]))
+                .values(status='sending', lease_expires_at=lease)
+                .execution_options(synchronize_session=False)
+            )
+        db.session.commit() # Releases the row locks before anything is sent
+        return jobs, lease
+
+    def build_jobs(self, rows):
+        """Turns claimed outbox rows into jobs, one digest per user and recipient."""
+        groups = {}
+        for row in rows:
+            if self._is_coalescable(row):
+                key = (row.user_id, row.channel, row.recipient)
+            else:
+                key = ('single', row.id)
+            groups.setdefault(key, []).append(row)
+
+        jobs = []
+        for group in groups.values():
+            first = group[0]
+            if len(group) == 1:
+                jobs.append(NotificationJob(first.id, first.channel, first.recipient, first.subject, first.body, first.attempts))
+                continue
+            subject, body = self._digest(first.channel, group)
+            # Each row keeps its own attempt count; the digest backs off like its freshest row
+            jobs.append(NotificationJob(
+                first.id, first.channel, first.recipient, subject, body,
+                min(row.attempts for row in group),
+                tuple(row.id for row in group),
+                tuple(row.attempts for row in group)
+            ))
+        return jobs
+
+    def dispatch(self, jobs):
+        """Sends jobs with per-channel concurrency limits. Returns {job id: error or None}."""
+        futures = {}
+        for job in jobs:
+            executor = self._executors.get(job.channel)
+            if executor is None:
+                futures[job.id] = None
+                continue
+            futures[job.id] = executor.submit(self.senders[job.channel], job)
+
+        results = {}
+        for job_id, future in futures.items():
+            if future is None:
+                results[job_id] = 'Unknown notification channel.'
+                continue
+            try:
+                future.result()
+                results[job_id] = None
+            except Exception as e:
+                results[job_id] = f'{type(e).__name__}: {e}'
+        return results
+
+    def close(self):
+        for executor in self._executors.values():
+            executor.shutdown(wait=True)
+        self.smtp_pool.close()
+
+    def _is_coalescable(self, row):
+        return (
+            self.coalesce
+            and row.user_id is not None
+            and row.channel in self.coalesce_channels
+            and row.type not in self.urgent_types
+        )
+
+    @staticmethod
+    def _digest(channel, rows):
+        if channel == 'sms':
+            return None, f'{len(rows)} updates:\n' + '\n'.join(row.body for row in rows)
+        sections = [f'{row.subject}\n{row.body}' if row.subject else row.body for row in rows]
+        return f'You have {len(rows)} new notifications', '\n\n'.join(sections)
+
+    def _record_results(self, jobs, results, lease):
+        now = datetime.utcnow()
+        sent_ids = [row_id for job in jobs if results[job.id] is None for row_id in (job.row_ids or (job.id,))]
+        failures = []
+        for job in jobs:
+            error = results[job.id]
+            if error is None:
+                continue
+            attempts = job.attempts + 1
+            logger.warning('Notification %s (%s) failed, attempt %d: %s', job.id, job.channel, attempts, error)
+            # Exponential backoff with jitter between attempts; the rows of a digest
+            # share it, so they are claimed and merged together again.
+            delay = self.retry_backoff * (2 ** (attempts - 1)) * random.uniform(0.5, 1.5)
+            for row_id, row_attempts in zip(job.row_ids or (job.id,), job.row_attempts or (job.attempts,)):
+                failures.append({
+                    'id': row_id,
+                    'attempts': row_attempts + 1,
+                    'status': 'failed' if row_attempts + 1 >= self.max_attempts else 'pending',
+                    'next_attempt_at': now + timedelta(seconds=delay),
+                    'last_error': error[:1000],
+                    'lease_expires_at': None,
+                })
+
+        # Rows whose lease ran out may have been claimed by another dispatcher; their outcome is its to record.
+        claimed = and_(NotificationOutbox.status == 'sending', NotificationOutbox.lease_expires_at == lease)
+        if sent_ids:
+            db.session.execute(
+                update(NotificationOutbox)
+                .where(NotificationOutbox.id.in_(sent_ids), claimed)
+                .values(status='sent', sent_at=now, attempts=NotificationOutbox.attempts + 1, lease_expires_at=None)
+                .execution_options(synchronize_session=False)
+            )
+        if failures:
+            db.session.execute(
+                update(NotificationOutbox).where(claimed),
+                failures,
+                execution_options={'synchronize_session': None}
+            )
+        return {'claimed': len(sent_ids) + len(failures), 'messages': len(jobs), 'sent': len(sent_ids), 'failed': len(failures)}
+
+    def _send_email(self, job):
+        message = EmailMessage()
+        message['From'] = self.mail_sender
+        message['To'] = job.recipient
+        message['Subject'] = job.subject or ''
+        message.set_content(job.body)
+        with self.smtp_pool.connection() as conn:
+            conn.send_message(message)
+
+    def _send_sms(self, job):
+        # Placeholder for SMS sending logic (e.g., using Twilio)
+        logger.info('Sending SMS to %s - Message: %s', job.recipient, job.body)
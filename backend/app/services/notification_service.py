@@ -1,21 +1,70 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from backend.app import db
+from backend.app.models.notification_outbox import NotificationOutbox
+from backend.app.services.inbox_service import InboxService
+
 class NotificationService:
+    """Queues notifications in the outbox.
+
+    Nothing is sent here and nothing is committed: the row joins the caller's
+    transaction and the NotificationDispatcher delivers it after the commit.
+    In-app notifications need no delivery and go straight to the inbox.
+    Non-urgent email and SMS notifications are held for
+    NOTIFICATION_COALESCE_WINDOW seconds so the dispatcher can merge a user's
+    notifications into one digest.
+    """
     @staticmethod
-    def send_email_notification(recipient_email, subject, body):
-        # Placeholder for email sending logic (e.g., using Flask-Mail, SendGrid, etc.)
-        print(f"Sending email to {recipient_email} - Subject: {subject}\nBody: {body}")
-        # In a real application, integrate with an email service provider
-        return True
+    def send_email_notification(recipient_email, subject, body, user_id=None, type='info'):
+        return NotificationService._enqueue('email', recipient_email, body, subject=subject, user_id=user_id, type=type)
 
     @staticmethod
-    def send_sms_notification(phone_number, message):
-        # Placeholder for SMS sending logic (e.g., using Twilio)
-        print(f"Sending SMS to {phone_number} - Message: {message}")
-        # In a real application, integrate with an SMS service provider
-        return True
+    def send_sms_notification(phone_number, message, user_id=None, type='info'):
+        return NotificationService._enqueue('sms', phone_number, message, user_id=user_id, type=type)
 
     @staticmethod
     def send_in_app_notification(user_id, message, type='info'):
-        # Placeholder for in-app notification logic
-        print(f"Sending in-app notification to user {user_id} - Type: {type}, Message: {message}")
-        # This might involve storing notifications in the database or using a real-time service
-        return True
+        return InboxService.add(user_id, message, type=type)
+
+    @staticmethod
+    def is_coalescable(channel, user_id, type):
+        config = current_app.config
+        return (
+            user_id is not None
+            and config['NOTIFICATION_COALESCE_WINDOW'] > 0
+            and channel in config['NOTIFICATION_COALESCE_CHANNELS']
+            and type not in config['NOTIFICATION_URGENT_TYPES']
+        )
+
+    @staticmethod
+    def _enqueue(channel, recipient, body, subject=None, user_id=None, type='info'):
+        now = datetime.utcnow()
+        next_attempt_at = now
+        if NotificationService.is_coalescable(channel, user_id, type):
+            next_attempt_at = NotificationService._digest_due_at(channel, recipient, user_id, now)
+
+        notification = NotificationOutbox(
+            channel=channel,
+            recipient=recipient,
+            subject=subject,
+            body=body,
+            user_id=user_id,
+            type=type,
+            status='pending',
+            next_attempt_at=next_attempt_at
+        )
+        db.session.add(notification)
+        return notification
+
+    @staticmethod
+    def _digest_due_at(channel, recipient, user_id, now):
+        # Join the user's open window, if any, so the whole buffer becomes due together
+        open_window = db.session.query(db.func.max(NotificationOutbox.next_attempt_at)).filter(
+            NotificationOutbox.user_id == user_id,
+            NotificationOutbox.channel == channel,
+            NotificationOutbox.recipient == recipient,
+            NotificationOutbox.status == 'pending',
+            NotificationOutbox.attempts == 0,
+            NotificationOutbox.next_attempt_at > now
+        ).scalar()
+        return open_window or now + timedelta(seconds=current_app.config['NOTIFICATION_COALESCE_WINDOW'])
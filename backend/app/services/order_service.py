@@ -1,6 +1,7 @@
 from backend.app import db
 from backend.app.models.order import Order
 from backend.app.models.user import User
+from backend.app.utils.db_routing import replica_read
 from backend.app.utils.exceptions import NotFoundError, ForbiddenError, BadRequestError
 
 class OrderService:
@@ -25,6 +26,7 @@ class OrderService:
         return order
 
     @staticmethod
+    @replica_read
     def get_orders_by_user(user_id):
         orders = Order.query.filter_by(user_id=user_id).all()
         return orders
@@ -0,0 +1,149 @@
+import logging
+import random
+import threading
+import time
+import uuid
+import requests
+import stripe
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class PaymentGateway:
+    """Stripe client shared by all requests of the app.
+
+    Configured once in create_app: one keep-alive connection pool, explicit
+    connect/read timeouts, bounded retries with jittered backoff for
+    idempotent calls and per-call latency statistics.
+    """
+
+    def __init__(self, app=None):
+        self._client = None
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+        self.max_retries = 0
+        self.retry_backoff = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=app.config['STRIPE_POOL_MAXSIZE'],
+            max_retries=0 # Retries are handled by the gateway, per call
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+        http_client = stripe.RequestsClient(
+            timeout=(app.config['STRIPE_CONNECT_TIMEOUT'], app.config['STRIPE_READ_TIMEOUT']),
+            session=session
+        )
+        base_addresses = {}
+        if app.config.get('STRIPE_API_BASE'):
+            base_addresses['api'] = app.config['STRIPE_API_BASE'] # e.g. a local fake Stripe server in tests
+
+        secret_key = app.config.get('STRIPE_SECRET_KEY')
+        if secret_key:
+            self._client = stripe.StripeClient(
+                secret_key,
+                http_client=http_client,
+                base_addresses=base_addresses,
+                max_network_retries=0
+            )
+        self.max_retries = app.config['STRIPE_MAX_RETRIES']
+        self.retry_backoff = app.config['STRIPE_RETRY_BACKOFF']
+        app.extensions['payment_gateway'] = self
+
+    @property
+    def client(self):
+        if self._client is None:
+            raise RuntimeError('Payment gateway is not configured (missing STRIPE_SECRET_KEY).')
+        return self._client
+
+    def create_payment_intent(self, amount, currency, metadata, idempotency_key=None):
+        # Creation is only safe to retry when Stripe can deduplicate it,
+        # so every create carries an idempotency key.
+        options = {'idempotency_key': idempotency_key or str(uuid.uuid4())}
+        return self._call(
+            'payment_intents.create',
+            lambda: self.client.v1.payment_intents.create(
+                params={'amount': amount, 'currency': currency, 'metadata': metadata},
+                options=options
+            ),
+            idempotent=True
+        )
+
+    def retrieve_payment_intent(self, payment_intent_id):
+        return self._call(
+            'payment_intents.retrieve',
+            lambda: self.client.v1.payment_intents.retrieve(payment_intent_id),
+            idempotent=True
+        )
+
+    def list_payment_intents(self, created, limit=100, starting_after=None):
+        params = {'created': created, 'limit': limit}
+        if starting_after:
+            params['starting_after'] = starting_after
+        return self._call(
+            'payment_intents.list',
+            lambda: self.client.v1.payment_intents.list(params=params),
+            idempotent=True
+        )
+
+    def cancel_payment_intent(self, payment_intent_id):
+        return self._call(
+            'payment_intents.cancel',
+            lambda: self.client.v1.payment_intents.cancel(
+                payment_intent_id,
+                options={'idempotency_key': f'cancel-{payment_intent_id}'}
+            ),
+            idempotent=True
+        )
+
+    def metrics(self):
+        """Returns a snapshot of per-call latency statistics."""
+        with self._stats_lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def _call(self, name, func, idempotent=False):
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                result = func()
+            except stripe.error.StripeError as e:
+                self._record(name, time.perf_counter() - start, error=True)
+                if not idempotent or attempt >= self.max_retries or not self._is_retryable(e):
+                    raise
+                attempt += 1
+                self._record_retry(name)
+                delay = random.uniform(0, self.retry_backoff * (2 ** (attempt - 1))) # Full jitter
+                logger.warning('Stripe call %s failed (%s), retry %d/%d in %.3fs',
+                               name, type(e).__name__, attempt, self.max_retries, delay)
+                time.sleep(delay)
+            else:
+                self._record(name, time.perf_counter() - start)
+                return result
+
+    @staticmethod
+    def _is_retryable(error):
+        if isinstance(error, (stripe.error.APIConnectionError, stripe.error.RateLimitError)):
+            return True
+        return isinstance(error, stripe.error.APIError) and (error.http_status or 500) >= 500
+
+    def _record(self, name, elapsed, error=False):
+        with self._stats_lock:
+            stats = self._stats.setdefault(name, {
+                'count': 0, 'errors': 0, 'retries': 0, 'total_seconds': 0.0, 'max_seconds': 0.0
+            })
+            stats['count'] += 1
+            stats['errors'] += int(error)
+            stats['total_seconds'] += elapsed
+            stats['max_seconds'] = max(stats['max_seconds'], elapsed)
+
+    def _record_retry(self, name):
+        with self._stats_lock:
+            self._stats[name]['retries'] += 1
@@ -1,13 +1,30 @@
+import logging
 import stripe
+from datetime import datetime, timedelta
 from flask import current_app
-from backend.app import db
+from sqlalchemy.exc import IntegrityError
+from backend.app import db, payment_gateway
 from backend.app.models.order import Order
 from backend.app.models.payment import Payment
+from backend.app.models.stripe_event import StripeEvent
 from backend.app.utils.exceptions import NotFoundError, ForbiddenError, BadRequestError, ConflictError
 
+logger = logging.getLogger(__name__)
+
+# Stripe statuses after which a payment intent can no longer change
+FINAL_PAYMENT_STATUSES = ('succeeded', 'canceled')
+
+def local_payment_status(stripe_status):
+    """Maps a Stripe intent status to the stored one: final statuses are kept, all others are 'pending'.
+
+    An intent waiting for a payment method or action is still open, so it must stay
+    under the pending-payment check and uq_payments_order_id_pending.
+    """
+    return stripe_status if stripe_status in FINAL_PAYMENT_STATUSES else 'pending'
+
 class PaymentService:
     @staticmethod
-    def create_payment_intent(order_id, amount, user_id):
+    def create_payment_intent(order_id, amount, user_id, idempotency_key=None):
         order = Order.query.get(order_id)
         if not order:
             raise NotFoundError('Order not found.')
@@ -21,29 +38,39 @@ class PaymentService:
             # Or update the existing payment intent if amount changes
             raise ConflictError('A pending payment intent already exists for this order.')
 
-        stripe.api_key = current_app.config['STRIPE_SECRET_KEY']
-
         try:
-            intent = stripe.PaymentIntent.create(
+            intent = payment_gateway.create_payment_intent(
                 amount=amount, # amount in cents
                 currency='usd',
                 metadata={'order_id': order_id, 'user_id': user_id},
+                # Stripe keys are account-wide, so scope the client's key to the user
+                idempotency_key=f'{user_id}:{idempotency_key}' if idempotency_key else None
             )
-            
-            new_payment = Payment(
-                order_id=order.id,
-                stripe_payment_intent_id=intent.id,
-                amount=amount / 100.0, # Store in dollars
-                currency='usd',
-                status='pending'
-            )
-            db.session.add(new_payment)
-            db.session.commit()
-
-            return intent.client_secret
         except stripe.error.StripeError as e:
             raise BadRequestError(f'Stripe error: {str(e)}')
 
+        new_payment = Payment(
+            order_id=order.id,
+            stripe_payment_intent_id=intent.id,
+            amount=amount / 100.0, # Store in dollars
+            currency='usd',
+            status='pending' # status_synced_at stays NULL until Stripe reports on the intent
+        )
+        db.session.add(new_payment)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent request passed the check above too; uq_payments_order_id_pending
+            # (or the unique intent id) let only one of them in.
+            db.session.rollback()
+            if Payment.query.filter_by(stripe_payment_intent_id=intent.id).first():
+                # Same Idempotency-Key, so Stripe returned the same intent to both requests
+                return intent.client_secret
+            PaymentService._cancel_orphaned_intent(intent.id)
+            raise ConflictError('A pending payment intent already exists for this order.')
+
+        return intent.client_secret
+
     @staticmethod
     def confirm_payment(order_id, payment_intent_id, user_id):
         order = Order.query.get(order_id)
@@ -55,24 +82,75 @@ class PaymentService:
         payment = Payment.query.filter_by(order_id=order_id, stripe_payment_intent_id=payment_intent_id).first()
         if not payment:
             raise NotFoundError('Payment intent not found for this order.')
-        
+
+        # Webhooks keep the local status current; Stripe is only asked when
+        # the local status is non-final and has not been confirmed recently.
+        status = payment.status
+        if PaymentService._is_status_stale(payment):
+            try:
+                intent = payment_gateway.retrieve_payment_intent(payment_intent_id)
+            except stripe.error.StripeError as e:
+                raise BadRequestError(f'Stripe error: {str(e)}')
+            PaymentService._apply_intent_status(payment, intent.status)
+            db.session.commit()
+            status = intent.status
+
         if payment.status == 'succeeded':
-            raise ConflictError('Payment has already been confirmed.')
+            return True
+        # Handle other statuses like 'requires_action', 'requires_payment_method', etc.
+        raise BadRequestError(f'Payment intent status: {status}. Payment not succeeded.')
+
+    @staticmethod
+    def handle_webhook_event(payload, signature):
+        """Applies a signed Stripe webhook event. Returns False for ignored or already processed events."""
+        if not signature:
+            raise BadRequestError('Missing Stripe-Signature header.')
+        try:
+            event = stripe.Webhook.construct_event(payload, signature, current_app.config['STRIPE_WEBHOOK_SECRET'])
+        except ValueError:
+            raise BadRequestError('Invalid webhook payload.')
+        except stripe.error.SignatureVerificationError:
+            raise BadRequestError('Invalid webhook signature.')
 
-        stripe.api_key = current_app.config['STRIPE_SECRET_KEY']
+        if not event['type'].startswith('payment_intent.'):
+            return False
 
+        intent = event['data']['object']
+        # Stripe delivers at least once; the event id primary key makes redelivery a no-op.
+        db.session.add(StripeEvent(id=event['id'], type=event['type'], payment_intent_id=intent['id']))
         try:
-            intent = stripe.PaymentIntent.retrieve(payment_intent_id)
-            
-            if intent.status == 'succeeded':
-                payment.status = 'succeeded'
-                order.status = 'paid' # Update order status after successful payment
-                db.session.commit()
-                return True
-            else:
-                # Handle other statuses like 'requires_action', 'requires_payment_method', etc.
-                payment.status = intent.status # Update payment status based on Stripe
-                db.session.commit()
-                raise BadRequestError(f'Payment intent status: {intent.status}. Payment not succeeded.')
-        except stripe.error.StripeError as e:
-            raise BadRequestError(f'Stripe error: {str(e)}')
+            db.session.flush()
+        except IntegrityError:
+            db.session.rollback()
+            return False
+
+        payment = Payment.query.filter_by(stripe_payment_intent_id=intent['id']).with_for_update().first()
+        if payment:
+            PaymentService._apply_intent_status(payment, intent['status'])
+        db.session.commit()
+        return True
+
+    @staticmethod
+    def _cancel_orphaned_intent(payment_intent_id):
+        try:
+            payment_gateway.cancel_payment_intent(payment_intent_id)
+        except stripe.error.StripeError:
+            logger.exception('Could not cancel orphaned payment intent %s', payment_intent_id)
+
+    @staticmethod
+    def _is_status_stale(payment):
+        if payment.status in FINAL_PAYMENT_STATUSES:
+            return False
+        if payment.status_synced_at is None:
+            return True
+        max_age = timedelta(seconds=current_app.config['PAYMENT_STATUS_MAX_AGE'])
+        return datetime.utcnow() - payment.status_synced_at > max_age
+
+    @staticmethod
+    def _apply_intent_status(payment, status):
+        # Events may arrive out of order; a final status is never overwritten.
+        if payment.status not in FINAL_PAYMENT_STATUSES:
+            payment.status = local_payment_status(status)
+        payment.status_synced_at = datetime.utcnow()
+        if payment.status == 'succeeded' and payment.order.status != 'paid':
+            payment.order.status = 'paid' # Update order status after successful payment
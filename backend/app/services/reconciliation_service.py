@@ -0,0 +1,110 @@
+import calendar
+import logging
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, func, update
+from backend.app import db, payment_gateway
+from backend.app.models.order import Order
+from backend.app.models.payment import Payment
+from backend.app.models.reconciliation_checkpoint import ReconciliationCheckpoint
+from backend.app.services.payment_service import FINAL_PAYMENT_STATUSES, local_payment_status
+
+logger = logging.getLogger(__name__)
+
+class PaymentReconciliationService:
+    """Brings stuck local payments in line with Stripe using its list API.
+
+    A run covers Stripe intents created between the oldest non-final local
+    payment and the start of the run, looking back at most
+    PAYMENT_RECONCILE_MAX_AGE so abandoned intents do not stretch every run
+    over the whole payment history. Each page is applied with batched
+    UPDATEs and committed together with the checkpoint, so a crashed run
+    resumes after the last applied page. Run it from a single scheduler.
+    """
+    CHECKPOINT_NAME = 'stripe_payment_intents'
+    WINDOW_SLACK_SECONDS = 300 # Tolerates clock skew between Stripe and the local created_at
+
+    @staticmethod
+    def reconcile(page_size=100):
+        checkpoint = ReconciliationCheckpoint.query.get(PaymentReconciliationService.CHECKPOINT_NAME)
+        if checkpoint is None:
+            checkpoint = ReconciliationCheckpoint(name=PaymentReconciliationService.CHECKPOINT_NAME)
+            db.session.add(checkpoint)
+
+        summary = {'pages': 0, 'intents': 0, 'payments_synced': 0, 'orders_paid': 0, 'resumed': False}
+        if checkpoint.starting_after is not None:
+            summary['resumed'] = True
+            logger.info('Resuming payment reconciliation after %s', checkpoint.starting_after)
+        else:
+            cutoff = datetime.utcnow() - timedelta(seconds=current_app.config['PAYMENT_RECONCILE_MAX_AGE'])
+            oldest_open = db.session.query(func.min(Payment.created_at)).filter(
+                Payment.status.notin_(FINAL_PAYMENT_STATUSES),
+                Payment.created_at >= cutoff
+            ).scalar()
+            if oldest_open is None:
+                db.session.commit()
+                return summary
+            checkpoint.window_start = calendar.timegm(oldest_open.utctimetuple()) - PaymentReconciliationService.WINDOW_SLACK_SECONDS
+            checkpoint.window_end = calendar.timegm(datetime.utcnow().utctimetuple())
+            db.session.commit()
+
+        while True:
+            page = payment_gateway.list_payment_intents(
+                created={'gte': checkpoint.window_start, 'lte': checkpoint.window_end},
+                limit=page_size,
+                starting_after=checkpoint.starting_after
+            )
+            intents = page.data
+            payments_synced, orders_paid = PaymentReconciliationService._apply_page(intents)
+
+            summary['pages'] += 1
+            summary['intents'] += len(intents)
+            summary['payments_synced'] += payments_synced
+            summary['orders_paid'] += orders_paid
+
+            if page.has_more and intents:
+                checkpoint.starting_after = intents[-1].id
+            else:
+                checkpoint.starting_after = None
+                checkpoint.last_completed_at = datetime.utcnow()
+            db.session.commit() # Page updates and checkpoint move together
+
+            if checkpoint.starting_after is None:
+                return summary
+
+    @staticmethod
+    def _apply_page(intents):
+        if not intents:
+            return 0, 0
+        stripe_status = {intent.id: intent.status for intent in intents}
+
+        rows = db.session.query(Payment.id, Payment.order_id, Payment.stripe_payment_intent_id).filter(
+            Payment.stripe_payment_intent_id.in_(list(stripe_status)),
+            Payment.status.notin_(FINAL_PAYMENT_STATUSES)
+        ).all()
+        if not rows:
+            return 0, 0
+
+        now = datetime.utcnow()
+        payment_updates = [
+            {'id': row.id, 'status': local_payment_status(stripe_status[row.stripe_payment_intent_id]),
+             'status_synced_at': now, 'updated_at': now}
+            for row in rows
+        ]
+        # One executemany UPDATE by primary key; rows a webhook finalised meanwhile are left alone.
+        db.session.execute(
+            update(Payment).where(and_(*(Payment.status != status for status in FINAL_PAYMENT_STATUSES))),
+            payment_updates,
+            execution_options={'synchronize_session': None}
+        )
+
+        paid_order_ids = [row.order_id for row in rows if stripe_status[row.stripe_payment_intent_id] == 'succeeded']
+        orders_paid = 0
+        if paid_order_ids:
+            orders_paid = db.session.execute(
+                update(Order)
+                .where(Order.id.in_(paid_order_ids), Order.status != 'paid')
+                .values(status='paid', updated_at=now)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+        return len(payment_updates), orders_paid
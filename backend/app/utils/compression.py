@@ -0,0 +1,122 @@
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError: # Optional; without it only gzip is offered
+    brotli = None
+
+
+class _GzipEncoder:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS) # gzip container
+
+    def compress(self, chunk):
+        return self._compressor.compress(chunk)
+
+    def flush(self):
+        # Sync flush: the client can decode everything sent so far
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    def __init__(self, level):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, chunk):
+        return self._compressor.process(chunk)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class Compression:
+    """Negotiated gzip/brotli compression of responses.
+
+    Only compressible media types at least COMPRESS_MIN_SIZE bytes long are
+    compressed; responses that already carry a Content-Encoding or are sent
+    as files (e.g. PDF downloads) pass through. Streamed responses are
+    compressed chunk by chunk and flushed every COMPRESS_FLUSH_SIZE bytes of
+    input, so streaming is preserved without flushing (and losing ratio) on
+    every small chunk.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config['COMPRESS_ENABLED']:
+            return
+        self.min_size = app.config['COMPRESS_MIN_SIZE']
+        self.flush_size = app.config['COMPRESS_FLUSH_SIZE']
+        self.mimetypes = set(app.config['COMPRESS_MIMETYPES'])
+        self.levels = {'gzip': app.config['COMPRESS_GZIP_LEVEL']}
+        if brotli is not None:
+            self.levels['br'] = app.config['COMPRESS_BROTLI_LEVEL']
+        app.after_request(self.compress_response)
+        app.extensions['compression'] = self
+
+    def compress_response(self, response):
+        if not self._is_compressible(response):
+            return response
+        response.vary.add('Accept-Encoding')
+
+        # br is preferred over gzip at equal quality
+        encoding = request.accept_encodings.best_match([name for name in ('br', 'gzip') if name in self.levels])
+        if encoding is None:
+            return response
+        if not response.is_streamed and len(response.get_data()) < self.min_size:
+            return response # Not worth the CPU and the extra headers
+
+        if response.is_streamed:
+            response.response = self._compress_stream(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            encoder = self._encoder(encoding)
+            response.set_data(encoder.compress(response.get_data()) + encoder.finish())
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True) # The representation differs from the identity one
+        return response
+
+    def _is_compressible(self, response):
+        return (
+            200 <= response.status_code < 300
+            and response.status_code != 204
+            and not response.direct_passthrough # send_file / send_from_directory
+            and 'Content-Encoding' not in response.headers
+            and response.mimetype in self.mimetypes
+        )
+
+    def _encoder(self, encoding):
+        if encoding == 'br':
+            return _BrotliEncoder(self.levels['br'])
+        return _GzipEncoder(self.levels['gzip'])
+
+    def _compress_stream(self, chunks, encoding):
+        encoder = self._encoder(encoding)
+        unflushed = 0
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                data = encoder.compress(chunk)
+                unflushed += len(chunk)
+                if unflushed >= self.flush_size:
+                    data += encoder.flush()
+                    unflushed = 0
+                if data:
+                    yield data
+            yield encoder.finish()
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
@@ -0,0 +1,128 @@
+import logging
+import threading
+import time
+from sqlalchemy import exc, func, select
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+def engine_options(pool_size, max_overflow, pool_timeout, pool_recycle, statement_timeout_ms,
+                   idle_in_transaction_timeout_ms):
+    """Builds SQLALCHEMY_ENGINE_OPTIONS for a PostgreSQL engine."""
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': pool_timeout, # seconds to wait for a connection before TimeoutError
+        'pool_recycle': pool_recycle, # seconds; stays below server/proxy idle limits
+        'pool_pre_ping': True,
+        'connect_args': {
+            # Server-side limits: a runaway query or a request that leaves a transaction open
+            # cannot hold locks (or a pooled connection) indefinitely.
+            'options': f'-c statement_timeout={statement_timeout_ms} '
+                       f'-c idle_in_transaction_session_timeout={idle_in_transaction_timeout_ms}',
+        },
+    }
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.overflow_connections = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_checkout(self, elapsed, timed_out=False):
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += int(timed_out)
+            self.wait_seconds_total += elapsed
+            self.wait_seconds_max = max(self.wait_seconds_max, elapsed)
+
+    def record_overflow(self):
+        with self._lock:
+            self.overflow_connections += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'overflow_connections': self.overflow_connections,
+                'timeouts': self.timeouts,
+                'wait_seconds_total': round(self.wait_seconds_total, 6),
+                'wait_seconds_max': round(self.wait_seconds_max, 6),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records checkout wait times, overflow connections and timeouts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.record_checkout(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record_checkout(time.perf_counter() - start)
+        return connection
+
+    def _inc_overflow(self):
+        created = super()._inc_overflow()
+        if created and self._overflow > 0: # Beyond pool_size
+            self.stats.record_overflow()
+        return created
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats # Keep counting across dispose()
+        return pool
+
+
+def pool_status(engine):
+    pool = engine.pool
+    status = {'pool_class': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+        })
+    stats = getattr(pool, 'stats', None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
+
+
+def prewarm_pool(engine, count):
+    """Opens `count` connections up front so the first requests do not pay for the connects."""
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(engine.raw_connection())
+    except exc.SQLAlchemyError:
+        logger.warning('Pool prewarm stopped after %d of %d connections', len(connections), count, exc_info=True)
+    finally:
+        for connection in connections:
+            connection.close() # Returns it to the pool
+    return len(connections)
+
+
+def set_idle_in_transaction_timeout(session, timeout_ms):
+    """Overrides idle_in_transaction_session_timeout for the session's current transaction (PostgreSQL only).
+
+    Meant for transactions that are idle by design, such as a streamed export
+    waiting for a slow client. The setting is transaction-local, so the pooled
+    connection returns to the engine-wide limit at commit or rollback.
+    """
+    if session.get_bind().dialect.name != 'postgresql':
+        return
+    session.execute(select(func.set_config('idle_in_transaction_session_timeout', str(timeout_ms), True)))
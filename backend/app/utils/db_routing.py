@@ -0,0 +1,183 @@
+"""Routing of read-only queries to read replicas.
+
+Replicas are registered as SQLALCHEMY_BINDS (``replica_0``, ``replica_1``...)
+so they share the engine options and pool telemetry of the primary. Only
+code running inside ``replica_reads()`` (or a ``@replica_read`` service
+method) is routed; everything else, every flush and every statement of a
+session that has already written (ORM flush or ``session.execute`` of an
+INSERT/UPDATE/DELETE) goes to the primary. After a write the
+user is also pinned to the primary for REPLICA_STICKY_SECONDS so the next
+requests read their own writes. Replicas lagging more than
+REPLICA_MAX_LAG_SECONDS (or unreachable) are skipped until the next check.
+A session picks its replica once and keeps it until it is closed, so related
+reads (a count and its page, an object and its children) see one snapshot.
+"""
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, g, has_app_context, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+BIND_PREFIX = 'replica_'
+
+
+def replica_binds(uris):
+    """SQLALCHEMY_BINDS entries for the given replica URIs."""
+    return {f'{BIND_PREFIX}{index}': uri for index, uri in enumerate(uris)}
+
+
+def replication_lag(engine):
+    """Seconds the replica behind ``engine`` trails its primary.
+
+    A standby that has replayed everything it received reports 0 even when
+    the primary has been idle for a while. Non-PostgreSQL engines (SQLite
+    files in tests) have no replication and report 0.
+    """
+    if engine.dialect.name != 'postgresql':
+        return 0.0
+    with engine.connect() as connection:
+        lag = connection.execute(text(
+            'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+            'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END'
+        )).scalar()
+    return float(lag or 0.0)
+
+
+class ReplicaRouter:
+    """Picks a replica engine for read-only queries, or None for the primary."""
+
+    def __init__(self, app=None, lag_probe=replication_lag):
+        self.lag_probe = lag_probe
+        self.keys = ()
+        self._lags = {} # bind key -> (lag in seconds or None when unreachable, monotonic check time)
+        self._sticky = {} # user id -> monotonic time until which reads stay on the primary
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Registers the replicas as binds; must run before ``db.init_app``."""
+        self.max_lag = app.config['REPLICA_MAX_LAG_SECONDS']
+        self.check_interval = app.config['REPLICA_LAG_CHECK_INTERVAL']
+        self.sticky_seconds = app.config['REPLICA_STICKY_SECONDS']
+        binds = replica_binds(app.config['SQLALCHEMY_REPLICA_URIS'])
+        self.keys = tuple(binds)
+        if binds:
+            app.config['SQLALCHEMY_BINDS'] = {**(app.config.get('SQLALCHEMY_BINDS') or {}), **binds}
+        app.extensions['replica_router'] = self
+
+    def replica_engine(self, sticky_key=None):
+        if not self.keys or self.is_sticky(sticky_key):
+            return None
+        engines = current_app.extensions['sqlalchemy'].engines
+        healthy = [key for key in self.keys if self._within_lag(key, engines[key])]
+        if not healthy:
+            return None
+        return engines[healthy[next(self._counter) % len(healthy)]]
+
+    def mark_write(self, sticky_key):
+        if sticky_key is None or not self.sticky_seconds:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._sticky) > 10000:
+                self._sticky = {key: until for key, until in self._sticky.items() if until > now}
+            self._sticky[sticky_key] = now + self.sticky_seconds
+
+    def is_sticky(self, sticky_key):
+        return sticky_key is not None and self._sticky.get(sticky_key, 0) > time.monotonic()
+
+    def status(self):
+        """Last measured lag per replica (None = unreachable), for the health endpoint."""
+        return {key: self._lags.get(key, (None, None))[0] for key in self.keys}
+
+    def _within_lag(self, key, engine):
+        now = time.monotonic()
+        with self._lock:
+            lag, checked_at = self._lags.get(key, (None, None))
+            stale = checked_at is None or now - checked_at >= self.check_interval
+            if stale:
+                # Claim the check so concurrent requests keep using the previous measurement
+                self._lags[key] = (lag, now)
+        if stale:
+            try:
+                lag = self.lag_probe(engine)
+            except SQLAlchemyError:
+                logger.warning('Replica %s is unreachable, reading from the primary', key, exc_info=True)
+                lag = None
+            with self._lock:
+                self._lags[key] = (lag, now)
+        return lag is not None and lag <= self.max_lag
+
+
+class RoutingSession(Session):
+    """Session sending statements issued inside ``replica_reads()`` to a replica."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get('replica_reads') and not self._flushing and not self.info.get('wrote'):
+            if 'replica' not in self.info:
+                router = current_app.extensions.get('replica_router')
+                self.info['replica'] = router.replica_engine(self.info.get('sticky_key')) if router else None # None = primary
+            engine = self.info['replica']
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def close(self):
+        self.info.pop('wrote', None)
+        self.info.pop('replica', None)
+        super().close()
+
+
+def _record_write(session):
+    session.info['wrote'] = True # Read-your-writes for the rest of this session
+    if has_request_context():
+        router = current_app.extensions.get('replica_router')
+        if router is not None:
+            router.mark_write(g.get('current_user_id'))
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _record_flush(session, flush_context):
+    _record_write(session)
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _record_dml(orm_execute_state):
+    # Bulk UPDATE/DELETE and INSERT statements bypass the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _record_write(orm_execute_state.session)
+
+
+@contextmanager
+def replica_reads():
+    """Routes the queries of the block to a replica when one is healthy."""
+    if not has_app_context():
+        yield
+        return
+    session = current_app.extensions['sqlalchemy'].session()
+    outer = session.info.get('replica_reads', 0)
+    session.info['replica_reads'] = outer + 1
+    if not outer:
+        session.info['sticky_key'] = g.get('current_user_id') if has_request_context() else None
+    try:
+        yield
+    finally:
+        session.info['replica_reads'] = outer
+
+
+def replica_read(f):
+    """Runs a read-only service method inside ``replica_reads()``."""
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        with replica_reads():
+            return f(*args, **kwargs)
+    return wrapper
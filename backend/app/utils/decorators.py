@@ -1,6 +1,7 @@
 from functools import wraps
-from flask import request
+from flask import g, request
 from backend.app.services.auth_service import AuthService
+from backend.app.services.idempotency_service import IdempotencyService
 from backend.app.utils.exceptions import UnauthorizedError
 
 def token_required(f):
@@ -18,5 +19,33 @@ def token_required(f):
         except UnauthorizedError as e:
             raise UnauthorizedError(str(e))
 
+        g.current_user_id = current_user.id # Read-your-writes routing (utils.db_routing)
         return f(current_user, *args, **kwargs)
     return decorated
+
+def idempotent(f):
+    """Replays the stored response when a request is retried with the same Idempotency-Key header.
+
+    Must be applied below @token_required, which passes the current user first.
+    """
+    @wraps(f)
+    def decorated(current_user, *args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return f(current_user, *args, **kwargs)
+
+        fingerprint = IdempotencyService.fingerprint(request.method, request.full_path, request.get_data())
+        record = IdempotencyService.begin(current_user.id, key, fingerprint)
+        if record.response_code is not None:
+            return record.response_body, record.response_code
+
+        try:
+            response = f(current_user, *args, **kwargs)
+        except Exception:
+            IdempotencyService.release(record)
+            raise
+
+        body, code = response if isinstance(response, tuple) else (response, 200)
+        IdempotencyService.complete(record, body, code)
+        return body, code
+    return decorated
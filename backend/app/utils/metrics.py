@@ -0,0 +1,128 @@
+"""Prometheus metrics: request latency, in-flight requests and DB usage per route.
+
+Routes are labelled by their URL rule (``/orders/<int:order_id>``), never by
+the raw path, so the number of series stays bounded. Under multi-process
+servers (gunicorn workers) set PROMETHEUS_MULTIPROC_DIR to an empty
+directory before the processes start: every worker then writes its samples
+there, ``/metrics`` aggregates all of them, and the server's child-exit hook
+should call ``prometheus_client.multiprocess.mark_process_dead(worker.pid)``.
+"""
+import os
+import time
+from contextvars import ContextVar
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Gauge, Histogram, generate_latest, multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by route',
+    ['method', 'route', 'status'], buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'http_requests_in_progress', 'Requests being handled',
+    ['method', 'route'], multiprocess_mode='livesum',
+)
+DB_QUERIES = Histogram(
+    'db_queries_per_request', 'SQL statements executed per request',
+    ['method', 'route'], buckets=QUERY_COUNT_BUCKETS,
+)
+DB_TIME = Histogram(
+    'db_time_per_request_seconds', 'Time spent in SQL statements per request',
+    ['method', 'route'], buckets=LATENCY_BUCKETS,
+)
+
+UNMATCHED_ROUTE = '<unmatched>'
+
+
+class QueryStats:
+    __slots__ = ('count', 'seconds')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# Statements outside a request (CLI, workers) are not attributed to anything
+_query_stats = ContextVar('query_stats', default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started_at', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started_at'].pop()
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += time.perf_counter() - started
+
+
+def instrument_engines():
+    """Hooks every engine (primary and replicas) once per process."""
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def metrics_registry():
+    """Registry to expose: the shared directory of all workers in multi-process mode."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+class Metrics:
+    """Records REQUEST_LATENCY, REQUESTS_IN_PROGRESS, DB_QUERIES and DB_TIME and serves METRICS_PATH."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config['METRICS_ENABLED']:
+            return
+        instrument_engines()
+        app.before_request(self._start)
+        app.after_request(self._observe)
+        app.teardown_request(self._finish)
+        app.add_url_rule(app.config['METRICS_PATH'], 'metrics', self.metrics_view)
+        app.extensions['metrics'] = self
+
+    def metrics_view(self):
+        return Response(generate_latest(metrics_registry()), mimetype=CONTENT_TYPE_LATEST)
+
+    def _start(self):
+        if request.endpoint == 'metrics':
+            return # Scrapes would dominate the histograms
+        route = request.url_rule.rule if request.url_rule is not None else UNMATCHED_ROUTE
+        stats = QueryStats()
+        g._metrics = (route, time.perf_counter(), stats, _query_stats.set(stats))
+        REQUESTS_IN_PROGRESS.labels(request.method, route).inc()
+
+    def _observe(self, response):
+        self._record(response.status_code)
+        return response
+
+    def _finish(self, exc):
+        self._record(500) # Unhandled exception: after_request did not run
+
+    def _record(self, status):
+        state = g.pop('_metrics', None)
+        if state is None:
+            return
+        route, started, stats, token = state
+        elapsed = time.perf_counter() - started
+        _query_stats.reset(token)
+        REQUESTS_IN_PROGRESS.labels(request.method, route).dec()
+        REQUEST_LATENCY.labels(request.method, route, str(status)).observe(elapsed)
+        DB_QUERIES.labels(request.method, route).observe(stats.count)
+        DB_TIME.labels(request.method, route).observe(stats.seconds)
@@ -0,0 +1,126 @@
+"""On-demand sampling profiler for single requests.
+
+A profiled request gets a background thread that snapshots the request
+thread's stack (``sys._current_frames``) every PROFILER_INTERVAL seconds.
+Nothing is traced, so the request itself runs at full speed. The samples are
+written to PROFILER_OUTPUT_DIR in the collapsed-stack format understood by
+flamegraph.pl, speedscope and inferno, and the file name is returned in the
+X-Profile-Id header. A request is profiled when its X-Profile header carries
+PROFILER_TOKEN, or at random with PROFILER_SAMPLE_RATE. With PROFILER_ENABLED
+off no hook is registered at all.
+"""
+import hmac
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+
+
+def collapse(frame):
+    """``outermost;...;innermost`` with one ``function (file:line)`` entry per frame."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class StackSampler:
+    """Samples the stacks of the given threads until stopped or ``max_seconds`` elapse."""
+
+    def __init__(self, thread_ids, interval=0.005, max_seconds=30.0):
+        self.thread_ids = thread_ids
+        self.interval = interval
+        self.max_samples = int(max_seconds / interval)
+        self.samples = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        taken = 0
+        while taken < self.max_samples and not self._stopped.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in self.thread_ids:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.samples[collapse(frame)] += 1
+            taken += 1
+
+
+def write_collapsed(samples, directory, label):
+    """Writes the samples as ``stack count`` lines; returns the file name."""
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', label).strip('-')[:80]
+    name = f'{stamp}-{slug}-{uuid.uuid4().hex[:8]}.collapsed'
+    with open(os.path.join(directory, name), 'w', encoding='utf-8') as output:
+        for stack, count in samples.most_common():
+            output.write(f'{stack} {count}\n')
+    return name
+
+
+class Profiler:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config['PROFILER_ENABLED']:
+            return # No hooks, no overhead
+        self.token = app.config['PROFILER_TOKEN']
+        self.sample_rate = app.config['PROFILER_SAMPLE_RATE']
+        self.interval = app.config['PROFILER_INTERVAL']
+        self.max_seconds = app.config['PROFILER_MAX_SECONDS']
+        self.output_dir = app.config['PROFILER_OUTPUT_DIR']
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._teardown)
+        app.extensions['profiler'] = self
+
+    def should_profile(self):
+        header = request.headers.get(PROFILE_HEADER)
+        if header and self.token and hmac.compare_digest(header.encode(), self.token.encode()):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _start(self):
+        if self.should_profile():
+            g._profiler = StackSampler([threading.get_ident()], self.interval, self.max_seconds).start()
+
+    def _finish(self, response):
+        sampler = g.pop('_profiler', None)
+        if sampler is None:
+            return response
+        samples = sampler.stop()
+        rule = request.url_rule.rule if request.url_rule is not None else request.path
+        try:
+            response.headers[PROFILE_ID_HEADER] = write_collapsed(samples, self.output_dir, f'{request.method} {rule}')
+        except OSError:
+            logger.warning('Could not store the request profile', exc_info=True)
+        return response
+
+    def _teardown(self, exc):
+        sampler = g.pop('_profiler', None)
+        if sampler is not None:
+            sampler.stop()
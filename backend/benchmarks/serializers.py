@@ -0,0 +1,85 @@
+"""Compares the compiled serializers with flask-restx marshal_list_with.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.serializers --rows 1000 --repeat 20
+
+Both endpoints are served by a bare Flask app through the test client, so
+the numbers include routing and JSON encoding but no database access.
+"""
+import argparse
+import time
+from datetime import datetime
+from flask import Flask
+from flask_restx import Api, Resource
+from backend.app.api.analyses import analysis_model
+from backend.app.api.orders import order_model
+from backend.app.config import TestingConfig
+from backend.app.models.analysis import Analysis
+from backend.app.models.order import Order
+from backend.app.models.payment import Payment # noqa: F401 (configures Order.payments)
+from backend.app.models.user import User # noqa: F401
+from backend.app.utils.serializers import serialize_list_with
+
+
+def build_rows(count):
+    now = datetime.utcnow()
+    orders = [Order(id=i, user_id=i % 50, status='pending', created_at=now, updated_at=now) for i in range(count)]
+    analyses = [
+        Analysis(id=i, order_id=i, analysis_type='summary', result_data={'pages': i % 7, 'score': 0.5},
+                 status='completed', created_at=now, completed_at=now)
+        for i in range(count)
+    ]
+    return {'orders': (order_model, orders), 'analyses': (analysis_model, analyses)}
+
+
+def build_app(datasets, encoder):
+    app = Flask(__name__)
+    app.config.from_object(TestingConfig)
+    app.config['RESPONSE_JSON_ENCODER'] = encoder
+    api = Api(app)
+    ns = api.namespace('bench')
+
+    for name, (model, rows) in datasets.items():
+        def marshalled(self, rows=rows):
+            return rows
+        def compiled(self, rows=rows):
+            return rows
+        ns.route(f'/{name}/marshal', endpoint=f'{name}_marshal')(
+            type(f'{name}Marshal', (Resource,), {'get': ns.marshal_list_with(model)(marshalled)}))
+        ns.route(f'/{name}/compiled', endpoint=f'{name}_compiled')(
+            type(f'{name}Compiled', (Resource,), {'get': serialize_list_with(model)(compiled)}))
+    return app
+
+
+def measure(client, url, repeat):
+    client.get(url) # warm-up, compiles the serializer on first use
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2], response.data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--encoder', choices=('restx', 'orjson'), default='restx')
+    args = parser.parse_args()
+
+    datasets = build_rows(args.rows)
+    client = build_app(datasets, args.encoder).test_client()
+    print(f'{args.rows} rows, median of {args.repeat} requests, encoder={args.encoder}')
+    for name in datasets:
+        baseline, expected = measure(client, f'/bench/{name}/marshal', args.repeat)
+        compiled, actual = measure(client, f'/bench/{name}/compiled', args.repeat)
+        identical = 'identical' if actual == expected else 'different bytes'
+        print(f'{name:>10}: marshal_list_with {baseline * 1000:8.2f} ms | compiled {compiled * 1000:8.2f} ms '
+              f'| {baseline / compiled:5.2f}x | {identical}')
+
+
+if __name__ == '__main__':
+    main()
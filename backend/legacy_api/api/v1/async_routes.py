@@ -0,0 +1,83 @@
+import inspect
+from functools import update_wrapper
+from typing import Any, Callable, Optional
+
+from fastapi import APIRouter, Depends
+from fastapi.params import Depends as DependsParam
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.async_session import get_async_db
+from app.db.session import get_db
+
+
+def async_endpoint(endpoint: Callable, response_model: Any = None) -> Callable:
+    """
+    Zamienia synchroniczny endpoint z `Depends(get_db)` na `async def` z sesją
+    asynchroniczną. Ciało endpointu wykonuje się w AsyncSession.run_sync (jedno
+    przejście na całe żądanie), więc nie zajmuje wątku z puli Starlette, a
+    oczekiwanie na bazę nie blokuje pętli zdarzeń.
+
+    Odpowiedź jest walidowana wg response_model jeszcze w run_sync, bo poza nim
+    leniwe ładowanie relacji nie jest możliwe.
+    """
+    signature = inspect.signature(endpoint)
+    db_params = [
+        name for name, parameter in signature.parameters.items()
+        if isinstance(parameter.default, DependsParam) and parameter.default.dependency is get_db
+    ]
+    if inspect.iscoroutinefunction(endpoint) or not db_params:
+        return endpoint
+    db_param = db_params[0]
+    adapter: Optional[TypeAdapter] = TypeAdapter(response_model) if response_model is not None else None
+
+    def call(session, kwargs: dict[str, Any]) -> Any:
+        result = endpoint(**kwargs, **{db_param: session})
+        if adapter is not None:
+            result = adapter.validate_python(result, from_attributes=True)
+        return result
+
+    async def wrapper(**kwargs: Any) -> Any:
+        db: AsyncSession = kwargs.pop(db_param)
+        return await db.run_sync(call, kwargs)
+
+    update_wrapper(wrapper, endpoint)
+    wrapper.__signature__ = signature.replace(parameters=[
+        parameter.replace(default=Depends(get_async_db), annotation=AsyncSession) if name == db_param else parameter
+        for name, parameter in signature.parameters.items()
+    ])
+    return wrapper
+
+
+def async_router(router: APIRouter) -> APIRouter:
+    """
+    Kopia routera z endpointami asynchronicznymi (ustawienie DB_ASYNC_ENDPOINTS).
+    Ścieżki, modele odpowiedzi i dokumentacja OpenAPI pozostają bez zmian.
+    """
+    converted = APIRouter()  # Trasy mają już prefiks, tagi i zależności routera
+    for route in router.routes:
+        if not isinstance(route, APIRoute):
+            converted.routes.append(route)
+            continue
+        converted.add_api_route(
+            route.path,
+            async_endpoint(route.endpoint, route.response_model),
+            response_model=route.response_model,
+            response_model_exclude_unset=route.response_model_exclude_unset,
+            status_code=route.status_code,
+            tags=route.tags,
+            dependencies=route.dependencies,
+            summary=route.summary,
+            description=route.description,
+            response_description=route.response_description,
+            responses=route.responses,
+            deprecated=route.deprecated,
+            methods=route.methods,
+            operation_id=route.operation_id,
+            include_in_schema=route.include_in_schema,
+            response_class=route.response_class,
+            name=route.name,
+            openapi_extra=route.openapi_extra,
+        )
+    return converted
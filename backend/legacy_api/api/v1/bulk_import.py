@@ -0,0 +1,55 @@
+from dataclasses import dataclass
+from tempfile import SpooledTemporaryFile
+from typing import IO, AsyncIterator, Optional
+
+from fastapi import HTTPException, Query, Request
+
+from app.api.v1.schemas.kancelaria import ImportFormat
+from app.core.config import settings
+
+CONTENT_TYPES = {
+    "text/csv": ImportFormat.csv,
+    "application/x-ndjson": ImportFormat.ndjson,
+    "application/ndjson": ImportFormat.ndjson,
+    "application/jsonl": ImportFormat.ndjson,
+}
+
+# Treść żądania importu w dokumentacji OpenAPI (endpoint czyta ją sam, bez parametru Body)
+IMPORT_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "text/csv": {"schema": {"type": "string"}},
+            "application/x-ndjson": {"schema": {"type": "string"}},
+        },
+    }
+}
+
+
+@dataclass
+class ImportUpload:
+    file: IO[bytes]
+    format: ImportFormat
+
+
+async def import_upload(
+    request: Request,
+    format: Optional[ImportFormat] = Query(None, description="csv lub ndjson; domyślnie wg Content-Type"),
+) -> AsyncIterator[ImportUpload]:
+    """
+    Treść żądania importu (CSV lub NDJSON) przepisana strumieniowo do pliku
+    tymczasowego - w pamięci tylko do BULK_IMPORT_SPOOL_SIZE - i czytana
+    potem wiersz po wierszu przez synchroniczny endpoint.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    format = format or CONTENT_TYPES.get(content_type)
+    if format is None:
+        raise HTTPException(
+            status_code=415, detail="Obsługiwane formaty: text/csv, application/x-ndjson (lub parametr format)"
+        )
+
+    with SpooledTemporaryFile(max_size=settings.BULK_IMPORT_SPOOL_SIZE) as file:
+        async for chunk in request.stream():
+            file.write(chunk)
+        file.seek(0)
+        yield ImportUpload(file=file, format=format)
@@ -1,12 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, sessionmaker
 from uuid import UUID
 
-from app.db.session import get_db
+from app.api.v1.bulk_import import IMPORT_OPENAPI, ImportUpload, import_upload
+from app.api.v1.pagination import page_params
+from app.db.pagination import PageParams
+from app.db.session import get_db, get_sessionmaker
+from app.services.export_service import LawFirmExportService
+from app.services.import_service import BulkImportService
 from app.services.kancelaria_service import LawFirmService
 from app.api.v1.schemas.kancelaria import (
-    LawFirm, LawFirmCreate, LawFirmUpdate, LawFirmWithStats
+    BulkImportResult, ExportFormat, LawFirm, LawFirmCreate, LawFirmUpdate, LawFirmWithStats, PaginatedResponse
 )
 
 router = APIRouter()
@@ -33,17 +38,18 @@ def create_law_firm(
     return service.create_law_firm(law_firm_data)
 
 
-@router.get("/", response_model=List[LawFirm])
+@router.get("/", response_model=PaginatedResponse[LawFirm])
 def get_law_firms(
-    skip: int = Query(0, ge=0, description="Liczba rekordów do pominięcia"),
-    limit: int = Query(100, ge=1, le=1000, description="Maksymalna liczba rekordów"),
+    page: PageParams = Depends(page_params),
     db: Session = Depends(get_db)
 ):
     """
-    Pobiera listę wszystkich kancelarii z paginacją.
+    Pobiera listę wszystkich kancelarii z paginacją kursorem (od najnowszych).
+    
+    Kolejną stronę zwraca wywołanie z `cursor` równym `next_cursor` poprzedniej odpowiedzi.
     """
     service = LawFirmService(db)
-    return service.get_law_firms(skip=skip, limit=limit)
+    return service.get_law_firms(page)
 
 
 @router.get("/{kancelaria_id}", response_model=LawFirmWithStats)
@@ -60,19 +66,12 @@ def get_law_firm(
     - Liczba aktywnych spraw
     """
     service = LawFirmService(db)
-    law_firm = service.get_law_firm(kancelaria_id)
+    law_firm = service.get_law_firm_with_stats(kancelaria_id)
     
     if not law_firm:
         raise HTTPException(status_code=404, detail="Kancelaria nie została znaleziona")
     
-    # Pobierz statystyki
-    stats = service.get_law_firm_stats(kancelaria_id)
-    
-    # Połącz dane kancelarii ze statystykami
-    law_firm_dict = law_firm.__dict__.copy()
-    law_firm_dict.update(stats)
-    
-    return law_firm_dict
+    return law_firm
 
 
 @router.put("/{kancelaria_id}", response_model=LawFirm)
@@ -111,4 +110,80 @@ def delete_law_firm(
     if not success:
         raise HTTPException(status_code=404, detail="Kancelaria nie została znaleziona")
     
-    return None
\ No newline at end of file
+    return None
+
+
+# Import danych kancelarii
+@router.post("/{kancelaria_id}/import/clients", response_model=BulkImportResult, openapi_extra=IMPORT_OPENAPI)
+def import_clients(
+    kancelaria_id: UUID,
+    upload: ImportUpload = Depends(import_upload),
+    db: Session = Depends(get_db)
+):
+    """
+    Importuje klientów kancelarii z pliku CSV (nagłówek z nazwami pól) lub NDJSON.
+    
+    Pola jak przy tworzeniu klienta; `law_firm_id` wynika z adresu. Błędne wiersze
+    są pomijane i opisane w raporcie (**errors**, numer linii), pozostałe zapisywane
+    partiami. Raport podaje też czas i przepustowość (**rows_per_second**).
+    """
+    return _run_import(db, kancelaria_id, upload, BulkImportService.import_clients)
+
+
+@router.post("/{kancelaria_id}/import/cases", response_model=BulkImportResult, openapi_extra=IMPORT_OPENAPI)
+def import_cases(
+    kancelaria_id: UUID,
+    upload: ImportUpload = Depends(import_upload),
+    db: Session = Depends(get_db)
+):
+    """
+    Importuje sprawy kancelarii z pliku CSV lub NDJSON.
+    
+    Pola jak przy tworzeniu sprawy; `client_id` i `assigned_lawyer_id` muszą
+    należeć do tej kancelarii. Raport jak przy imporcie klientów.
+    """
+    return _run_import(db, kancelaria_id, upload, BulkImportService.import_cases)
+
+
+@router.get(
+    "/{kancelaria_id}/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}, "application/zip": {}}}}
+)
+def export_law_firm(
+    kancelaria_id: UUID,
+    format: ExportFormat = Query(ExportFormat.ndjson, description="ndjson lub zip (plik CSV na tabelę)"),
+    sessions: sessionmaker = Depends(get_sessionmaker)
+):
+    """
+    Eksportuje wszystkie dane kancelarii: klientów, sprawy, metadane dokumentów i notatki.
+    
+    Odpowiedź jest wysyłana strumieniowo. **ndjson**: pierwsza linia
+    `{"type": "export", "snapshot_at": ...}`, dalej rekordy `{"type": "client", "data": {...}}`
+    (client, case, document, case_note). **zip**: clients.csv, cases.csv, documents.csv,
+    case_notes.csv oraz export.json z chwilą snapshotu i liczbą wierszy.
+    Wszystkie tabele pochodzą z jednego spójnego snapshotu bazy.
+    """
+    with sessions() as db:
+        if not LawFirmService(db).law_firm_exists(kancelaria_id):
+            raise HTTPException(status_code=404, detail="Kancelaria nie została znaleziona")
+
+    def stream():
+        # Własna sesja na czas wysyłania odpowiedzi - sesja żądania kończy się wcześniej
+        with sessions() as db:
+            yield from LawFirmExportService(db).export(kancelaria_id, format)
+
+    extension, media_type = ("zip", "application/zip") if format is ExportFormat.zip else ("ndjson", "application/x-ndjson")
+    return StreamingResponse(stream(), media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="kancelaria-{kancelaria_id}.{extension}"',
+    })
+
+
+def _run_import(db: Session, kancelaria_id: UUID, upload: ImportUpload, method) -> dict:
+    if not LawFirmService(db).law_firm_exists(kancelaria_id):
+        raise HTTPException(status_code=404, detail="Kancelaria nie została znaleziona")
+    try:
+        return method(BulkImportService(db), kancelaria_id, upload.file, upload.format)
+    except UnicodeDecodeError:
+        # Partie zapisane przed błędnym fragmentem pozostają w bazie
+        raise HTTPException(status_code=400, detail="Plik musi być zapisany w kodowaniu UTF-8")
@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Optional
 from uuid import UUID
 
+from app.api.v1.pagination import page_params
+from app.db.pagination import PageParams
 from app.db.session import get_db
 from app.services.kancelaria_service import ClientService
 from app.api.v1.schemas.kancelaria import (
-    Client, ClientCreate, ClientUpdate, ClientWithCases
+    Client, ClientCreate, ClientUpdate, PaginatedResponse
 )
 
 router = APIRouter()
@@ -34,25 +36,27 @@ def create_client(
     return service.create_client(client_data)
 
 
-@router.get("/", response_model=List[Client])
+@router.get("/", response_model=PaginatedResponse[Client])
 def get_clients(
     law_firm_id: Optional[UUID] = Query(None, description="Filtruj po ID kancelarii"),
-    search: Optional[str] = Query(None, description="Wyszukaj po imieniu, nazwisku lub emailu"),
-    skip: int = Query(0, ge=0, description="Liczba rekordów do pominięcia"),
-    limit: int = Query(100, ge=1, le=1000, description="Maksymalna liczba rekordów"),
+    search: Optional[str] = Query(None, description="Wyszukaj po imieniu, nazwisku, emailu, telefonie lub PESEL"),
+    page: PageParams = Depends(page_params),
     db: Session = Depends(get_db)
 ):
     """
     Pobiera listę klientów z opcjonalnym filtrowaniem i wyszukiwaniem.
     
-    Można filtrować po kancelarii i wyszukiwać po imieniu, nazwisku lub emailu.
+    Można filtrować po kancelarii i wyszukiwać po imieniu, nazwisku, emailu,
+    telefonie lub numerze PESEL (bez względu na wielkość liter i polskie znaki).
+    Wyniki wyszukiwania są posortowane od najtrafniejszych, pozostałe listy od najnowszych.
+    Kolejną stronę zwraca wywołanie z `cursor` równym `next_cursor` poprzedniej odpowiedzi.
     """
     service = ClientService(db)
     
     if search and law_firm_id:
-        return service.search_clients(law_firm_id, search, skip=skip, limit=limit)
+        return service.search_clients(law_firm_id, search, page)
     else:
-        return service.get_clients(law_firm_id=law_firm_id, skip=skip, limit=limit)
+        return service.get_clients(law_firm_id=law_firm_id, page=page)
 
 
 @router.get("/{klient_id}", response_model=Client)
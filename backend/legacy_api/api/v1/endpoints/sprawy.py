@@ -3,18 +3,40 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import UUID
 
+from app.api.v1.pagination import page_params
+from app.core.config import settings
+from app.db.pagination import PageParams
 from app.db.session import get_db
-from app.services.kancelaria_service import CaseService, DocumentService, CaseNoteService
+from app.services.kancelaria_service import CASE_DETAIL_RELATIONS, CaseService, DocumentService, CaseNoteService
 from app.api.v1.schemas.kancelaria import (
-    Case, CaseCreate, CaseUpdate, CaseWithDetails,
+    Case, CaseCreate, CaseUpdate, CaseWithDetails, CaseSearchResult,
     Document, DocumentCreate,
     CaseNote, CaseNoteCreate,
-    CaseStatus, CasePriority
+    CaseStatus, CasePriority, PaginatedResponse
 )
 
 router = APIRouter()
 
 
+def case_detail_include(
+    include: Optional[str] = Query(
+        None,
+        description="Relacje do dołączenia, rozdzielone przecinkami: " + ", ".join(CASE_DETAIL_RELATIONS)
+        + " (domyślnie wszystkie; pusty = tylko dane sprawy)"
+    ),
+) -> frozenset:
+    """
+    Zbiór relacji dołączanych do szczegółów sprawy.
+    """
+    if include is None:
+        return frozenset(CASE_DETAIL_RELATIONS)
+    names = frozenset(name.strip() for name in include.split(",") if name.strip())
+    unknown = names - set(CASE_DETAIL_RELATIONS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Nieznane relacje: {', '.join(sorted(unknown))}")
+    return names
+
+
 @router.post("/", response_model=Case, status_code=201)
 def create_case(
     case_data: CaseCreate,
@@ -41,20 +63,20 @@ def create_case(
     return service.create_case(case_data)
 
 
-@router.get("/", response_model=List[Case])
+@router.get("/", response_model=PaginatedResponse[Case])
 def get_cases(
     law_firm_id: Optional[UUID] = Query(None, description="Filtruj po ID kancelarii"),
     client_id: Optional[UUID] = Query(None, description="Filtruj po ID klienta"),
     status: Optional[CaseStatus] = Query(None, description="Filtruj po statusie"),
     priority: Optional[CasePriority] = Query(None, description="Filtruj po priorytecie"),
-    skip: int = Query(0, ge=0, description="Liczba rekordów do pominięcia"),
-    limit: int = Query(100, ge=1, le=1000, description="Maksymalna liczba rekordów"),
+    page: PageParams = Depends(page_params),
     db: Session = Depends(get_db)
 ):
     """
-    Pobiera listę spraw z opcjonalnym filtrowaniem.
+    Pobiera listę spraw z opcjonalnym filtrowaniem, od najnowszych.
     
     Można filtrować po kancelarii, kliencie, statusie i priorytecie.
+    Kolejną stronę zwraca wywołanie z `cursor` równym `next_cursor` poprzedniej odpowiedzi.
     """
     service = CaseService(db)
     return service.get_cases(
@@ -62,11 +84,29 @@ def get_cases(
         client_id=client_id,
         status=status,
         priority=priority,
-        skip=skip,
-        limit=limit
+        page=page
     )
 
 
+@router.get("/search", response_model=List[CaseSearchResult])
+def search_cases(
+    law_firm_id: UUID = Query(..., description="ID kancelarii"),
+    q: str = Query(..., min_length=1, max_length=200, description="Szukane słowa; w PostgreSQL także \"fraza\", -wykluczenie, OR"),
+    skip: int = Query(0, ge=0, description="Liczba rekordów do pominięcia"),
+    limit: int = Query(20, ge=1, le=100, description="Maksymalna liczba rekordów"),
+    db: Session = Depends(get_db)
+):
+    """
+    Wyszukuje sprawy kancelarii po numerze, tytule, opisie i jawnych notatkach.
+    
+    Wyniki są posortowane wg trafności (**rank**) i zawierają fragment tekstu
+    z zaznaczonymi słowami (**headline**, znaczniki `<mark>`). Bez PostgreSQL
+    zapytanie jest szukane jako podciąg, bez operatorów i z rank = 0.
+    """
+    service = CaseService(db)
+    return service.search_cases(law_firm_id, q, skip=skip, limit=limit)
+
+
 @router.get("/statistics")
 def get_case_statistics(
     law_firm_id: UUID = Query(..., description="ID kancelarii"),
@@ -80,27 +120,37 @@ def get_case_statistics(
     - Liczbę aktywnych spraw
     - Liczbę oczekujących spraw
     - Liczbę pilnych spraw
+    - Podział na typy spraw, priorytety i przypisanych prawników
     """
     service = CaseService(db)
     return service.get_case_statistics(law_firm_id)
 
 
-@router.get("/{sprawa_id}", response_model=CaseWithDetails)
+@router.get("/{sprawa_id}", response_model=CaseWithDetails, response_model_exclude_unset=True)
 def get_case(
     sprawa_id: UUID,
+    include: frozenset = Depends(case_detail_include),
+    children_limit: int = Query(
+        settings.CASE_DETAIL_CHILDREN_LIMIT, ge=0, le=500,
+        description="Maksymalna liczba najnowszych dokumentów i notatek"
+    ),
     db: Session = Depends(get_db)
 ):
     """
     Pobiera szczegóły sprawy wraz z powiązanymi danymi.
     
-    Zwraca sprawę wraz z:
-    - Danymi klienta
-    - Informacjami o przypisanym prawniku
-    - Listą dokumentów
-    - Notatkami do sprawy
+    Zwraca sprawę wraz z (wg parametru `include`):
+    - Danymi klienta (**client**)
+    - Informacjami o przypisanym prawniku (**assigned_lawyer**)
+    - Najnowszymi dokumentami (**documents**)
+    - Najnowszymi notatkami do sprawy (**case_notes**)
+    
+    Relacje spoza `include` są pomijane w odpowiedzi. Gdy dokumentów lub notatek
+    jest więcej niż `children_limit`, `documents_has_more` / `case_notes_has_more`
+    mają wartość true, a pełne listy zwracają `/documents` i `/notes`.
     """
     service = CaseService(db)
-    case = service.get_case(sprawa_id)
+    case = service.get_case_details(sprawa_id, include, children_limit)
     
     if not case:
         raise HTTPException(status_code=404, detail="Sprawa nie została znaleziona")
@@ -159,8 +209,7 @@ def add_document_to_case(
     """
     # Sprawdź czy sprawa istnieje
     case_service = CaseService(db)
-    case = case_service.get_case(sprawa_id)
-    if not case:
+    if not case_service.case_exists(sprawa_id):
         raise HTTPException(status_code=404, detail="Sprawa nie została znaleziona")
     
     # Ustaw case_id
@@ -211,8 +260,7 @@ def add_note_to_case(
     """
     # Sprawdź czy sprawa istnieje
     case_service = CaseService(db)
-    case = case_service.get_case(sprawa_id)
-    if not case:
+    if not case_service.case_exists(sprawa_id):
         raise HTTPException(status_code=404, detail="Sprawa nie została znaleziona")
     
     # Ustaw case_id
@@ -222,17 +270,18 @@ def add_note_to_case(
     return service.create_case_note(note_data)
 
 
-@router.get("/{sprawa_id}/notes", response_model=List[CaseNote])
+@router.get("/{sprawa_id}/notes", response_model=PaginatedResponse[CaseNote])
 def get_case_notes(
     sprawa_id: UUID,
     include_private: bool = Query(True, description="Czy uwzględnić prywatne notatki"),
+    page: PageParams = Depends(page_params),
     db: Session = Depends(get_db)
 ):
     """
-    Pobiera wszystkie notatki powiązane ze sprawą.
+    Pobiera notatki powiązane ze sprawą, od najnowszych, z paginacją kursorem.
     """
     service = CaseNoteService(db)
-    return service.get_case_notes(sprawa_id, include_private=include_private)
+    return service.get_case_notes(sprawa_id, include_private=include_private, page=page)
 
 
 @router.delete("/notes/{note_id}", status_code=204)
@@ -0,0 +1,22 @@
+from fastapi import HTTPException, Query
+from typing import Optional
+
+from app.db.pagination import CountMode, InvalidCursor, PageParams, decode_cursor
+
+
+def page_params(
+    cursor: Optional[str] = Query(None, description="Kursor kolejnej strony (next_cursor z poprzedniej odpowiedzi)"),
+    limit: int = Query(100, ge=1, le=1000, description="Maksymalna liczba rekordów"),
+    count: CountMode = Query(
+        CountMode.auto,
+        description="Liczenie wszystkich rekordów: exact, estimate (szacunek planera), auto lub none"
+    ),
+) -> PageParams:
+    """
+    Parametry paginacji kursorem wspólne dla endpointów list.
+    """
+    try:
+        decoded = decode_cursor(cursor) if cursor else None
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return PageParams(cursor=decoded, limit=limit, count=count)
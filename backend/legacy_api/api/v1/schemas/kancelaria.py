@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
-from typing import Optional, List
+from typing import Generic, Optional, List, TypeVar
 from datetime import datetime, date
 from uuid import UUID
 from enum import Enum
@@ -27,6 +27,16 @@ class UserRole(str, Enum):
     staff = "staff"
 
 
+class ImportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    zip = "zip"  # archiwum plików CSV
+
+
 # Base schemas
 class LawFirmBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
@@ -235,17 +245,44 @@ class ClientWithCases(Client):
     cases: List[Case] = []
 
 
+class CaseSearchResult(Case):
+    rank: float
+    headline: str = ""
+
+
 class CaseWithDetails(Case):
-    client: Client
+    client: Optional[Client] = None
     assigned_lawyer: Optional[Profile] = None
     documents: List[Document] = []
     case_notes: List[CaseNote] = []
+    documents_has_more: bool = False  # starsze dokumenty poza limitem
+    case_notes_has_more: bool = False
+
+
+# Bulk import
+class ImportRowError(BaseModel):
+    line: int  # numer linii w pliku (w CSV nagłówek to linia 1)
+    field: Optional[str] = None
+    message: str
+
+
+class BulkImportResult(BaseModel):
+    format: ImportFormat
+    rows: int
+    inserted: int
+    failed: int
+    errors: List[ImportRowError] = []  # najwyżej BULK_IMPORT_MAX_ERRORS pierwszych
+    duration_seconds: float
+    rows_per_second: float
 
 
 # Pagination
-class PaginatedResponse(BaseModel):
-    items: List[BaseModel]
-    total: int
-    page: int
-    size: int
-    pages: int
\ No newline at end of file
+T = TypeVar("T")
+
+
+class PaginatedResponse(BaseModel, Generic[T]):
+    items: List[T]
+    total: Optional[int] = None  # None dla count=none
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None  # None = ostatnia strona
+    size: int
\ No newline at end of file
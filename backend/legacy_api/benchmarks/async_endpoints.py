@@ -0,0 +1,139 @@
+"""
+Porównuje endpointy synchroniczne (pula wątków Starlette) z asynchronicznymi (DB_ASYNC_ENDPOINTS).
+
+Uruchomienie z katalogu, w którym pakiet legacy_api jest widoczny jako `app` (jak testy):
+
+    DATABASE_URL=sqlite:///./bench.db SECRET_KEY=x python -m app.benchmarks.async_endpoints \\
+        --requests 2000 --concurrency 200
+
+Domyślnie używany jest plik SQLite, więc wynik nie zawiera opóźnień sieci;
+dla miarodajnego porównania wskaż PostgreSQL przez --database-url.
+
+W trybie sync pula połączeń nie powinna być mniejsza niż pula wątków: wątki
+czekające na połączenie blokują wtedy zamknięcie sesji (get_db), które też
+potrzebuje wątku, i żądania kończą się po pool_timeout.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import anyio.to_thread
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1.async_routes import async_router
+from app.api.v1.endpoints import kancelarie, sprawy
+from app.db.async_session import async_database_url, get_async_db
+from app.db.session import Base, get_db
+from app.models.kancelaria import Case, Client, LawFirm
+
+ENDPOINTS = ("/api/v1/sprawy/?law_firm_id={law_firm_id}&limit=20", "/api/v1/sprawy/statistics?law_firm_id={law_firm_id}")
+
+
+def seed(database_url: str, cases: int) -> str:
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        law_firm = LawFirm(name="Kancelaria Benchmark")
+        db.add(law_firm)
+        db.flush()
+        client = Client(law_firm_id=law_firm.id, first_name="Jan", last_name="Kowalski")
+        db.add(client)
+        db.flush()
+        db.add_all([
+            Case(law_firm_id=law_firm.id, client_id=client.id, case_number=f"I C {i}/24", title=f"Sprawa {i}",
+                 status="active" if i % 2 else "pending", priority="medium")
+            for i in range(cases)
+        ])
+        db.commit()
+        law_firm_id = str(law_firm.id)
+    engine.dispose()
+    return law_firm_id
+
+
+def build_app(database_url: str, mode: str, pool_size: int) -> tuple[FastAPI, object]:
+    app = FastAPI()
+    if mode == "async":
+        engine = create_async_engine(async_database_url(database_url), pool_size=pool_size, max_overflow=0)
+        sessions = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+
+        async def override():
+            async with sessions() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = override
+        convert = async_router
+    else:
+        engine = create_engine(database_url, pool_size=pool_size, max_overflow=0,
+                               connect_args={"check_same_thread": False} if database_url.startswith("sqlite") else {})
+        sessions = sessionmaker(bind=engine, autoflush=False)
+
+        def override():
+            with sessions() as db:
+                yield db
+
+        app.dependency_overrides[get_db] = override
+        convert = lambda router: router  # noqa: E731
+    app.include_router(convert(kancelarie.router), prefix="/api/v1/kancelarie")
+    app.include_router(convert(sprawy.router), prefix="/api/v1/sprawy")
+    return app, engine
+
+
+async def run(app: FastAPI, urls: list[str], requests: int, concurrency: int) -> tuple[float, list[float]]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        await client.get(urls[0])  # rozgrzanie puli
+
+        async def one(index: int) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(urls[index % len(urls)])
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(index) for index in range(requests)))
+        elapsed = time.perf_counter() - start
+    return elapsed, sorted(latencies)
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    law_firm_id = seed(args.database_url, args.cases)
+    urls = [endpoint.format(law_firm_id=law_firm_id) for endpoint in ENDPOINTS]
+    threads = anyio.to_thread.current_default_thread_limiter().total_tokens
+    print(f"{args.requests} requests, concurrency {args.concurrency}, pool {args.pool_size}, "
+          f"Starlette threadpool {threads} threads")
+    for mode in ("sync", "async"):
+        app, engine = build_app(args.database_url, mode, args.pool_size)
+        elapsed, latencies = await run(app, urls, args.requests, args.concurrency)
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f"{mode:>6}: {args.requests / elapsed:8.1f} req/s | p50 {statistics.median(latencies) * 1000:7.2f} ms "
+              f"| p99 {p99 * 1000:7.2f} ms")
+        result = engine.dispose()
+        if asyncio.iscoroutine(result):
+            await result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=None, help="domyślnie tymczasowy plik SQLite")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--pool-size", type=int, default=40)
+    parser.add_argument("--cases", type=int, default=200)
+    args = parser.parse_args()
+    if args.database_url is None:
+        args.database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Porównuje zapis klientów pojedynczo (ClientService.create_client) z importem partiami (BulkImportService).
+
+Uruchomienie z katalogu, w którym pakiet legacy_api jest widoczny jako `app` (jak testy):
+
+    DATABASE_URL=sqlite:///./bench.db SECRET_KEY=x python -m app.benchmarks.bulk_import --rows 20000
+
+Domyślnie używany jest plik SQLite; dla miarodajnego wyniku (triggery law_firm_stats,
+search_text, wektory wyszukiwania, opóźnienia sieci) wskaż PostgreSQL przez --database-url.
+"""
+import argparse
+import io
+import json
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1.schemas.kancelaria import ClientCreate, ImportFormat
+from app.db.session import Base
+from app.models.kancelaria import LawFirm
+from app.services.import_service import BulkImportService
+from app.services.kancelaria_service import ClientService
+
+
+def client_rows(rows: int) -> list[dict]:
+    return [
+        {"first_name": "Jan", "last_name": f"Kowalski {i}", "email": f"jan{i}@example.com", "phone": f"600{i:06d}"}
+        for i in range(rows)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=None, help="domyślnie tymczasowy plik SQLite")
+    parser.add_argument("--rows", type=int, default=20000, help="wiersze importu partiami")
+    parser.add_argument("--single-rows", type=int, default=1000, help="wiersze zapisu pojedynczo")
+    args = parser.parse_args()
+    if args.database_url is None:
+        args.database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(engine)
+    sessions = sessionmaker(bind=engine, autoflush=False)
+    with sessions() as db:
+        law_firm = LawFirm(name="Kancelaria Benchmark")
+        db.add(law_firm)
+        db.commit()
+        law_firm_id = law_firm.id
+
+    with sessions() as db:
+        service = ClientService(db)
+        start = time.perf_counter()
+        for row in client_rows(args.single_rows):
+            service.create_client(ClientCreate(**row, law_firm_id=law_firm_id))
+        elapsed = time.perf_counter() - start
+    print(f"{'single':>6}: {args.single_rows / elapsed:10.1f} rows/s ({args.single_rows} rows)")
+
+    ndjson = "".join(json.dumps(row) + "\n" for row in client_rows(args.rows)).encode()
+    with sessions() as db:
+        report = BulkImportService(db).import_clients(law_firm_id, io.BytesIO(ndjson), ImportFormat.ndjson)
+    print(f"{'bulk':>6}: {report['rows_per_second']:10.1f} rows/s ({report['inserted']} rows, "
+          f"{report['failed']} failed)")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
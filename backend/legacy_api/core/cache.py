@@ -0,0 +1,101 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, Optional
+
+from sqlalchemy.util.concurrency import await_only, in_greenlet
+
+
+class SingleFlight:
+    """
+    Jedno wykonanie `fn` na klucz naraz: równoległe wywołania z tym samym
+    kluczem czekają na wynik (albo wyjątek) pierwszego zamiast liczyć go ponownie.
+
+    Działa w wątkach puli Starlette i w AsyncSession.run_sync (endpointy async):
+    tam czekanie odbywa się przez pętlę zdarzeń, bo zablokowanie jej wątku
+    zatrzymałoby także wykonanie, na które czekamy.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            if in_greenlet():
+                return await_only(asyncio.wrap_future(future))
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class VersionedCache:
+    """
+    Pamięć podręczna procesu (LRU) z wpisami ważnymi dla jednej wersji danych.
+
+    Wpis z inną wersją niż bieżąca jest traktowany jak brak, więc unieważnienie
+    to podbicie wersji w bazie - bez komunikacji między workerami.
+    `max_entries` = 0 wyłącza pamięć podręczną.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.flight = SingleFlight()
+        self._entries: OrderedDict[Hashable, tuple[Hashable, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: Hashable, version: Hashable, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, version: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Wartość dla (key, version); przy braku liczona raz dla wszystkich
+        równoległych żądań.
+        """
+        value = self.get(key, version)
+        if value is not None:
+            return value
+
+        def load() -> Any:
+            value = self.get(key, version)  # mogła zostać policzona w międzyczasie
+            if value is None:
+                value = compute()
+                self.set(key, version, value)
+            return value
+
+        return self.flight.do((key, version), load)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,208 @@
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Opcjonalne; bez pakietu brotli dostępny jest tylko gzip
+    brotli = None
+
+
+# PDF, obrazy i archiwa są już skompresowane
+COMPRESSIBLE_TYPES = frozenset({
+    "application/json",
+    "application/x-ndjson",
+    "application/xml",
+    "application/javascript",
+    "text/html",
+    "text/plain",
+    "text/css",
+    "text/csv",
+    "text/xml",
+    "text/javascript",
+})
+
+
+class _GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.process(chunk)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def negotiate_encoding(accept_encoding: str, available: tuple[str, ...]) -> Optional[str]:
+    """
+    Wybiera kodowanie z nagłówka Accept-Encoding (z uwzględnieniem wag q).
+    Przy równej wadze wygrywa kolejność z `available`.
+    """
+    qualities = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI kompresujące odpowiedzi (br/gzip) wg nagłówka Accept-Encoding.
+
+    Kompresowane są tylko typy z COMPRESSIBLE_TYPES o rozmiarze co najmniej
+    `minimum_size` bajtów. Odpowiedzi strumieniowe są kompresowane fragment
+    po fragmencie, więc nie są buforowane w całości; flush (kosztem stopnia
+    kompresji) następuje co `flush_size` bajtów treści i na końcu strumienia.
+    flush_size=0 wysyła każdy fragment od razu.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_level: int = 4,
+        flush_size: int = 64 * 1024,
+        compressible_types: frozenset[str] = COMPRESSIBLE_TYPES,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.flush_size = flush_size
+        self.compressible_types = compressible_types
+        self.levels = {"gzip": gzip_level}
+        if brotli is not None:
+            self.levels["br"] = brotli_level
+        self.available = tuple(name for name in ("br", "gzip") if name in self.levels)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.available)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def encoder(self, encoding: str):
+        if encoding == "br":
+            return _BrotliEncoder(self.levels["br"])
+        return _GzipEncoder(self.levels["gzip"])
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.downstream = send
+        self.start_message: Optional[Message] = None
+        self.encoder = None
+        self.passthrough = False
+        self.unflushed = 0  # bajty treści przekazane do kompresora od ostatniego flush
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Wstrzymane do pierwszego fragmentu treści, kiedy wiadomo, czy kompresować
+            self.start_message = message
+            return
+        if message_type != "http.response.body" or self.passthrough:
+            await self._flush_start()
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.encoder is None:
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            if not self._is_compressible(headers):
+                self.passthrough = True
+                await self._flush_start()
+                await self.downstream(message)
+                return
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                await self._flush_start()
+                await self.downstream(message)
+                return
+
+            self.encoder = self.middleware.encoder(self.encoding)
+            headers["Content-Encoding"] = self.encoding
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                body = self.encoder.compress(body) + self.encoder.finish()
+                headers["Content-Length"] = str(len(body))
+                await self._flush_start()
+                await self.downstream({"type": "http.response.body", "body": body, "more_body": False})
+                return
+            await self._flush_start()
+
+        if not more_body:
+            chunk = self.encoder.compress(body) + self.encoder.finish()
+        else:
+            chunk = self.encoder.compress(body)
+            self.unflushed += len(body)
+            if self.unflushed >= self.middleware.flush_size:
+                chunk += self.encoder.flush()
+                self.unflushed = 0
+            if not chunk:
+                return  # kompresor buforuje, nie ma czego wysłać
+        await self.downstream({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    def _is_compressible(self, headers: MutableHeaders) -> bool:
+        status = self.start_message["status"]
+        media_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+        return (
+            200 <= status < 300
+            and status != 204
+            and "content-encoding" not in headers
+            and media_type in self.middleware.compressible_types
+        )
+
+    async def _flush_start(self) -> None:
+        if self.start_message is not None:
+            await self.downstream(self.start_message)
+            self.start_message = None
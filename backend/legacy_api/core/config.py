@@ -1,8 +1,26 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Any, Optional
 import os
 
 
+# Domyślne parametry puli połączeń dla poszczególnych środowisk.
+# Per proces: (pool_size + max_overflow) x liczba workerów < max_connections.
+DB_POOL_PROFILES: dict[str, dict[str, Any]] = {
+    "development": {
+        "pool_size": 5, "max_overflow": 5, "pool_timeout": 10.0,
+        "statement_timeout_ms": 60000, "idle_in_transaction_timeout_ms": 120000, "pool_prewarm": 0,
+    },
+    "test": {
+        "pool_size": 2, "max_overflow": 2, "pool_timeout": 5.0,
+        "statement_timeout_ms": 30000, "idle_in_transaction_timeout_ms": 30000, "pool_prewarm": 0,
+    },
+    "production": {
+        "pool_size": 10, "max_overflow": 10, "pool_timeout": 5.0,
+        "statement_timeout_ms": 15000, "idle_in_transaction_timeout_ms": 30000, "pool_prewarm": 5,
+    },
+}
+
+
 class Settings(BaseSettings):
     # API Configuration
     API_V1_STR: str = "/api/v1"
@@ -12,6 +30,42 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    DB_ECHO: bool = False  # Logowanie SQL niezależne od DEBUG
+
+    # Connection pool (None = wartość z DB_POOL_PROFILES dla ENVIRONMENT)
+    DB_POOL_SIZE: Optional[int] = None
+    DB_MAX_OVERFLOW: Optional[int] = None
+    DB_POOL_TIMEOUT: Optional[float] = None  # sekundy oczekiwania na wolne połączenie
+    DB_POOL_RECYCLE: int = 1800  # sekundy
+    DB_STATEMENT_TIMEOUT_MS: Optional[int] = None
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS: Optional[int] = None
+    DB_POOL_PREWARM: Optional[int] = None  # liczba połączeń otwieranych przy starcie
+    # Endpointy async z sesją asyncpg/aiosqlite zamiast wątków z puli Starlette
+    DB_ASYNC_ENDPOINTS: bool = False
+
+    # Read replicas (JSON list); pusta lista = wszystko na serwerze głównym
+    DATABASE_REPLICA_URLS: list[str] = []
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0  # bardziej opóźnione repliki są pomijane
+    DB_REPLICA_LAG_CHECK_INTERVAL: float = 5.0  # sekundy między pomiarami opóźnienia
+
+    # Statystyki spraw w pamięci procesu, unieważniane wersją z law_firm_stats (0 = wyłączone)
+    CASE_STATS_CACHE_SIZE: int = 1024  # liczba kancelarii
+    # Konfiguracja wyszukiwania pełnotekstowego spraw (case_search, migracja Supabase)
+    CASE_SEARCH_TS_CONFIG: str = "public.polish"
+
+    # Paginacja list: count=auto liczy dokładnie do tej liczby wierszy, powyżej szacuje (EXPLAIN)
+    PAGINATION_EXACT_COUNT_LIMIT: int = 10000
+    # Domyślna liczba najnowszych dokumentów i notatek osadzanych w szczegółach sprawy
+    CASE_DETAIL_CHILDREN_LIMIT: int = 50
+
+    # Import klientów i spraw z CSV/NDJSON: wiersze w jednym INSERT i transakcji
+    BULK_IMPORT_BATCH_SIZE: int = 1000
+    BULK_IMPORT_MAX_ERRORS: int = 1000  # błędy wierszy zwracane w raporcie
+    BULK_IMPORT_SPOOL_SIZE: int = 16 * 1024 * 1024  # treść żądania powyżej trafia do pliku tymczasowego
+    # Eksport danych kancelarii: wiersze pobierane naraz z kursora po stronie serwera
+    EXPORT_BATCH_SIZE: int = 1000
+    # Transakcja eksportu czeka na wolnego klienta, więc ma własny, wyższy limit bezczynności
+    EXPORT_IDLE_IN_TRANSACTION_TIMEOUT_MS: int = 600000
     
     # Supabase (optional)
     SUPABASE_URL: Optional[str] = None
@@ -27,6 +81,24 @@ class Settings(BaseSettings):
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
     
+    # Kompresja odpowiedzi (gzip; brotli, gdy zainstalowany jest pakiet brotli)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bajty; mniejsze odpowiedzi są wysyłane bez kompresji
+    COMPRESSION_GZIP_LEVEL: int = 6  # 1-9
+    COMPRESSION_BROTLI_LEVEL: int = 4  # 0-11
+    COMPRESSION_FLUSH_SIZE: int = 64 * 1024  # bajty treści strumienia między flush; 0 = po każdym fragmencie
+
+    # Prometheus metrics (/metrics); przy wielu workerach ustaw PROMETHEUS_MULTIPROC_DIR
+    METRICS_ENABLED: bool = True
+
+    # Profilowanie żądań na żądanie: nagłówek X-Profile: <PROFILER_TOKEN> lub losowo PROFILER_SAMPLE_RATE
+    PROFILER_ENABLED: bool = False  # wyłączone = middleware nie jest dodawane
+    PROFILER_TOKEN: Optional[str] = None
+    PROFILER_SAMPLE_RATE: float = 0.0  # 0-1
+    PROFILER_INTERVAL: float = 0.005  # sekundy między próbkami stosu
+    PROFILER_MAX_SECONDS: float = 30.0  # po tym czasie próbkowanie jest przerywane
+    PROFILER_OUTPUT_DIR: str = "profiles"
+
     # CORS
     BACKEND_CORS_ORIGINS: list[str] = [
         "http://localhost:3000",
@@ -35,6 +107,16 @@ class Settings(BaseSettings):
         "http://127.0.0.1:8080",
     ]
 
+    def db_pool_option(self, name: str) -> Any:
+        """
+        Zwraca parametr puli: jawne ustawienie DB_<NAZWA> albo domyślną wartość dla środowiska.
+        """
+        explicit = getattr(self, f"DB_{name.upper()}", None)
+        if explicit is not None:
+            return explicit
+        profile = DB_POOL_PROFILES.get(self.ENVIRONMENT, DB_POOL_PROFILES["development"])
+        return profile[name]
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,128 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from prometheus_client import REGISTRY, CollectorRegistry, Gauge, Histogram, multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Przy wielu procesach (workery uvicorn/gunicorn) PROMETHEUS_MULTIPROC_DIR musi
+# wskazywać pusty katalog przed startem procesów; /metrics sumuje wtedy próbki
+# wszystkich workerów.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Czas obsługi żądania wg trasy",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+# Trasa jest znana dopiero po routingu, więc żądania w toku liczone są wg metody
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Żądania w trakcie obsługi",
+    ["method"], multiprocess_mode="livesum",
+)
+DB_QUERIES = Histogram(
+    "db_queries_per_request", "Liczba zapytań SQL na żądanie",
+    ["method", "route"], buckets=QUERY_COUNT_BUCKETS,
+)
+DB_TIME = Histogram(
+    "db_time_per_request_seconds", "Czas zapytań SQL na żądanie",
+    ["method", "route"], buckets=LATENCY_BUCKETS,
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class QueryStats:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+# Zapytania poza żądaniem (skrypty, zadania) nie są nigdzie przypisywane
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info["query_started_at"].pop()
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += time.perf_counter() - started
+
+
+def instrument_engines() -> None:
+    """
+    Podpina liczniki zapytań pod wszystkie silniki (główny i repliki), raz na proces.
+    """
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def metrics_registry() -> CollectorRegistry:
+    """
+    Rejestr do eksportu: w trybie wieloprocesowym zbiorczy dla wszystkich workerów.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI mierzące czas żądań, żądania w toku oraz liczbę i czas
+    zapytań SQL na żądanie. Trasy etykietowane są szablonem ścieżki
+    (np. /api/v1/sprawy/{case_id}), nie konkretnym adresem.
+    """
+
+    def __init__(self, app: ASGIApp, excluded_paths: tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.excluded_paths = excluded_paths
+        instrument_engines()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500  # Wyjątek przed wysłaniem nagłówków
+        stats = QueryStats()
+        token = _query_stats.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            _query_stats.reset(token)
+            route = _route_template(scope)
+            REQUEST_LATENCY.labels(method, route, str(status)).observe(elapsed)
+            DB_QUERIES.labels(method, route).observe(stats.count)
+            DB_TIME.labels(method, route).observe(stats.seconds)
+
+
+def _route_template(scope: dict[str, Any]) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
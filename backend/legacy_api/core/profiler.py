@@ -0,0 +1,155 @@
+import hmac
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from types import FrameType
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+def collapse(frame: Optional[FrameType]) -> str:
+    """
+    Stos w formacie `zewnętrzna;...;wewnętrzna`, po jednym `funkcja (plik:linia)` na ramkę.
+    """
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _runs(frame: Optional[FrameType], code) -> bool:
+    while frame is not None:
+        if frame.f_code is code:
+            return True
+        frame = frame.f_back
+    return False
+
+
+class EndpointSampler:
+    """
+    Próbkuje stosy wszystkich wątków i zachowuje te, które wykonują endpoint
+    obsługujący żądanie (pętla zdarzeń dla endpointów async, wątek z puli dla
+    synchronicznych). Endpoint jest odczytywany ze `scope["route"]` po routingu.
+    Równoległe żądania do tego samego endpointu trafiają do tego samego profilu.
+    """
+
+    def __init__(self, scope: Scope, interval: float = 0.005, max_seconds: float = 30.0):
+        self.scope = scope
+        self.interval = interval
+        self.max_samples = int(max_seconds / interval)
+        self.samples: Counter[str] = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> "EndpointSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter[str]:
+        self._stopped.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self) -> None:
+        taken = 0
+        own_id = threading.get_ident()
+        while taken < self.max_samples and not self._stopped.wait(self.interval):
+            taken += 1
+            endpoint = getattr(self.scope.get("route"), "endpoint", None)
+            code = getattr(endpoint, "__code__", None)
+            if code is None:
+                continue  # Jeszcze przed routingiem
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id and _runs(frame, code):
+                    self.samples[collapse(frame)] += 1
+
+
+def profile_name(label: str) -> str:
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", label).strip("-")[:80]
+    return f"{stamp}-{slug}-{uuid.uuid4().hex[:8]}.collapsed"
+
+
+def write_collapsed(samples: Counter[str], directory: str, name: str) -> None:
+    """
+    Zapisuje próbki jako linie `stos liczba` (flamegraph.pl, speedscope, inferno).
+    """
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, name), "w", encoding="utf-8") as output:
+        for stack, count in samples.most_common():
+            output.write(f"{stack} {count}\n")
+
+
+class ProfilerMiddleware:
+    """
+    Middleware ASGI profilujące wybrane żądania przez próbkowanie stosów.
+
+    Żądanie jest profilowane, gdy nagłówek X-Profile zawiera `token` albo
+    losowo z prawdopodobieństwem `sample_rate`. Nazwa pliku z profilem
+    zwracana jest w nagłówku X-Profile-Id. Middleware dodawane jest tylko
+    przy włączonym PROFILER_ENABLED, więc wyłączone nie kosztuje nic.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        output_dir: str,
+        token: Optional[str] = None,
+        sample_rate: float = 0.0,
+        interval: float = 0.005,
+        max_seconds: float = 30.0,
+    ):
+        self.app = app
+        self.output_dir = output_dir
+        self.token = token
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.max_seconds = max_seconds
+
+    def should_profile(self, scope: Scope) -> bool:
+        header = Headers(scope=scope).get(PROFILE_HEADER)
+        if header and self.token and hmac.compare_digest(header.encode(), self.token.encode()):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        name = None
+        sampler = EndpointSampler(scope, self.interval, self.max_seconds).start()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal name
+            if message["type"] == "http.response.start":
+                route = getattr(scope.get("route"), "path", scope["path"])
+                name = profile_name(f"{scope['method']} {route}")
+                MutableHeaders(raw=message["headers"])[PROFILE_ID_HEADER] = name
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            samples = await run_in_threadpool(sampler.stop)
+            if name is not None:
+                try:
+                    await run_in_threadpool(write_collapsed, samples, self.output_dir, name)
+                except OSError:
+                    logger.warning("Could not store the request profile", exc_info=True)
@@ -0,0 +1,96 @@
+import re
+import unicodedata
+from typing import Iterable, List, Optional
+
+# Litery, których NFKD nie rozkłada na literę bazową i znak diakrytyczny
+_FOLD_EXTRA = str.maketrans({"ł": "l", "đ": "d", "ø": "o", "ß": "ss"})
+_NON_DIGITS = re.compile(r"\D")
+_PHONE_LIKE = re.compile(r"^[\d\s()+./-]+$")
+_WHITESPACE = re.compile(r"\s+")
+_WORD = re.compile(r"\w+")
+
+
+def search_fold(value: Optional[str]) -> str:
+    """
+    Postać tekstu do wyszukiwania: małe litery bez znaków diakrytycznych
+    ("Łukasz Żółć" -> "lukasz zolc"). Odpowiednik public.search_fold w PostgreSQL.
+    """
+    if not value:
+        return ""
+    value = unicodedata.normalize("NFKD", value.lower().translate(_FOLD_EXTRA))
+    value = "".join(char for char in value if not unicodedata.combining(char))
+    return _WHITESPACE.sub(" ", value).strip()
+
+
+def normalize_search_term(value: str) -> str:
+    """
+    Fraza wyszukiwania w postaci zgodnej z clients.search_text; numer telefonu
+    wpisany z odstępami lub myślnikami jest sprowadzany do samych cyfr.
+    """
+    if _PHONE_LIKE.match(value) and _NON_DIGITS.sub("", value):
+        return _NON_DIGITS.sub("", value)
+    return search_fold(value)
+
+
+def client_search_text(
+    first_name: Optional[str],
+    last_name: Optional[str],
+    email: Optional[str] = None,
+    phone: Optional[str] = None,
+    pesel: Optional[str] = None,
+) -> str:
+    """
+    Zawartość kolumny clients.search_text (jak public.client_search_text w migracji).
+    """
+    parts = [
+        search_fold(first_name),
+        search_fold(last_name),
+        search_fold(email),
+        _NON_DIGITS.sub("", phone or ""),
+        (pesel or "").strip(),
+    ]
+    return " ".join(part for part in parts if part)
+
+
+def like_pattern(term: str) -> str:
+    """
+    Wzorzec LIKE '%fraza%' ze znakami specjalnymi poprzedzonymi '\\'. Cały wzorzec
+    jest jednym parametrem, więc planer PostgreSQL może użyć indeksu pg_trgm.
+    """
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def search_words(value: Optional[str]) -> List[str]:
+    """Słowa tekstu w postaci search_fold"""
+    return _WORD.findall(search_fold(value))
+
+
+def highlight(
+    value: Optional[str], words: Iterable[str], context: int = 60, start: str = "<mark>", stop: str = "</mark>"
+) -> str:
+    """
+    Fragment tekstu wokół pierwszego trafienia z zaznaczonymi słowami
+    (odpowiednik ts_headline dla baz bez wyszukiwania pełnotekstowego).
+    """
+    value = value or ""
+    words = list(words)
+    spans = [
+        match.span() for match in _WORD.finditer(value)
+        if any(search_fold(match.group()).startswith(word) for word in words)
+    ]
+    if not spans:
+        return value[:2 * context]
+
+    begin = max(0, spans[0][0] - context)
+    end = min(len(value), spans[0][1] + context)
+    parts = ["…" if begin else ""]
+    position = begin
+    for span_start, span_end in spans:
+        if span_end > end:
+            break
+        parts += [value[position:span_start], start, value[span_start:span_end], stop]
+        position = span_end
+    parts += [value[position:end], "…" if end < len(value) else ""]
+    return "".join(parts)
+
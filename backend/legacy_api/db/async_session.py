@@ -0,0 +1,130 @@
+import logging
+from functools import lru_cache
+from typing import Any, AsyncIterator
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.db.pool import InstrumentedAsyncQueuePool
+from app.db.routing import ReplicaRouter, RoutingSession
+
+logger = logging.getLogger(__name__)
+
+
+def async_database_url(database_url: str) -> str:
+    """
+    Adres bazy ze sterownikiem asynchronicznym: asyncpg dla PostgreSQL,
+    aiosqlite dla SQLite (testy).
+    """
+    scheme, separator, rest = database_url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    if dialect in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg://{rest}"
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    return database_url
+
+
+def async_engine_options(database_url: str) -> dict[str, Any]:
+    """
+    Parametry silnika asynchronicznego; te same limity puli co w app.db.session.
+    """
+    options: dict[str, Any] = {
+        "pool_pre_ping": True,
+        "echo": settings.DB_ECHO,
+    }
+    if not database_url.startswith("postgresql"):
+        return options
+
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.db_pool_option("pool_size"),
+        max_overflow=settings.db_pool_option("max_overflow"),
+        pool_timeout=settings.db_pool_option("pool_timeout"),
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        connect_args={
+            # asyncpg nie obsługuje "options"; parametry sesji przekazywane są osobno
+            "server_settings": {
+                "statement_timeout": str(settings.db_pool_option("statement_timeout_ms")),
+                "idle_in_transaction_session_timeout": str(settings.db_pool_option("idle_in_transaction_timeout_ms")),
+            },
+        },
+    )
+    return options
+
+
+def create_async_engine_for(database_url: str) -> AsyncEngine:
+    url = async_database_url(database_url)
+    return create_async_engine(url, **async_engine_options(url))
+
+
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    """
+    Silnik tworzony przy pierwszym użyciu, więc tryb synchroniczny nie wymaga asyncpg.
+    """
+    return create_async_engine_for(settings.DATABASE_URL)
+
+
+@lru_cache
+def get_async_replica_engines() -> dict[str, AsyncEngine]:
+    return {
+        f"replica_{index}": create_async_engine_for(url)
+        for index, url in enumerate(settings.DATABASE_REPLICA_URLS)
+    }
+
+
+@lru_cache
+def get_async_replica_router() -> ReplicaRouter:
+    """
+    Router replik dla sesji asynchronicznych. RoutingSession wybiera silnik
+    synchroniczny (`sync_engine`) - zapytania i pomiar opóźnienia wykonują się
+    w AsyncSession.run_sync, więc korzystają ze sterownika asynchronicznego.
+    """
+    return ReplicaRouter(
+        {name: engine.sync_engine for name, engine in get_async_replica_engines().items()},
+        max_lag=settings.DB_REPLICA_MAX_LAG_SECONDS,
+        check_interval=settings.DB_REPLICA_LAG_CHECK_INTERVAL,
+    )
+
+
+@lru_cache
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    # Bez wygaszania po commit: obiekty są serializowane już po zamknięciu sesji
+    return async_sessionmaker(
+        get_async_engine(),
+        sync_session_class=RoutingSession,
+        router=get_async_replica_router(),
+        expire_on_commit=False,
+        autoflush=False,
+    )
+
+
+async def prewarm_async_pool(engine: AsyncEngine, count: int) -> int:
+    """
+    Odpowiednik app.db.pool.prewarm_pool dla silnika asynchronicznego.
+    """
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(await engine.connect())
+    except SQLAlchemyError:
+        logger.warning("Pool prewarm stopped after %d of %d connections", len(connections), count, exc_info=True)
+    finally:
+        for connection in connections:
+            await connection.close()  # Zwraca połączenie do puli
+    return len(connections)
+
+
+async def dispose_async_engines() -> None:
+    for engine in (get_async_engine(), *get_async_replica_engines().values()):
+        await engine.dispose()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    Dependency to get async database session
+    """
+    async with get_async_sessionmaker()() as db:
+        yield db
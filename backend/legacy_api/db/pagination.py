@@ -0,0 +1,160 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import bindparam, func, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.core.config import settings
+
+
+class CountMode(str, Enum):
+    exact = "exact"  # COUNT(*) całego zbioru
+    estimate = "estimate"  # szacunek planera PostgreSQL (EXPLAIN)
+    auto = "auto"  # dokładnie do PAGINATION_EXACT_COUNT_LIMIT, powyżej szacunek
+    none = "none"  # bez liczenia
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass
+class PageParams:
+    cursor: Optional[dict[str, Any]] = None
+    limit: int = 100
+    count: CountMode = CountMode.auto
+
+
+def encode_cursor(position: dict[str, Any]) -> str:
+    data = json.dumps(position, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    """
+    Odwrotność encode_cursor; uszkodzony kursor zgłasza InvalidCursor.
+    """
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError as exc:
+        raise InvalidCursor("Nieprawidłowy kursor") from exc
+    if not isinstance(position, dict):
+        raise InvalidCursor("Nieprawidłowy kursor")
+    return position
+
+
+def page_response(
+    items: list, params: PageParams, next_cursor: Optional[str], total: Optional[int], estimated: bool
+) -> dict[str, Any]:
+    """Treść PaginatedResponse"""
+    return {
+        "items": items,
+        "total": total,
+        "total_is_estimate": estimated,
+        "next_cursor": next_cursor,
+        "size": params.limit,
+    }
+
+
+def keyset_paginate(query: Query, model: Any, params: PageParams, *options: Any) -> dict[str, Any]:
+    """
+    Strona wyników od najnowszych wg (created_at, id). Kolejna strona zaczyna się
+    warunkiem (created_at, id) < kursor, więc jej koszt nie zależy od liczby
+    wcześniejszych stron (w przeciwieństwie do OFFSET), a przy indeksie
+    (..., created_at, id) zapytanie czyta tylko `limit` + 1 wierszy.
+    Opcje ładowania (`options`) dotyczą tylko pobrania strony, nie liczenia.
+    """
+    created_at = _sortable(query, model.created_at)
+    total, estimated = count_rows(query.with_entities(model.id), params.count)
+
+    if params.cursor is not None:
+        try:
+            position = (datetime.fromisoformat(params.cursor["created_at"]), UUID(params.cursor["id"]))
+        except (KeyError, TypeError, ValueError) as exc:
+            raise InvalidCursor("Nieprawidłowy kursor") from exc
+        query = query.filter(tuple_(created_at, model.id) < tuple_(
+            _sortable(query, bindparam("cursor_created_at", position[0], type_=model.created_at.type)),
+            bindparam("cursor_id", position[1], type_=model.id.type),
+        ))
+
+    rows = query.options(*options).order_by(created_at.desc(), model.id.desc()).limit(params.limit + 1).all()
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        next_cursor = encode_cursor({"created_at": rows[-1].created_at.isoformat(), "id": str(rows[-1].id)})
+    return page_response(rows, params, next_cursor, total, estimated)
+
+
+def offset_position(params: PageParams) -> int:
+    """
+    Pozycja w wynikach sortowanych wg trafności (wyszukiwanie), gdzie kolejność
+    nie wynika z kolumn; kursor pozostaje nieprzezroczysty dla klienta.
+    """
+    if params.cursor is None:
+        return 0
+    offset = params.cursor.get("offset")
+    if not isinstance(offset, int) or offset < 0:
+        raise InvalidCursor("Nieprawidłowy kursor")
+    return offset
+
+
+def offset_cursor(offset: int, params: PageParams, returned: int, total: Optional[int] = None) -> Optional[str]:
+    if returned < params.limit or (total is not None and offset + returned >= total):
+        return None
+    return encode_cursor({"offset": offset + returned})
+
+
+def count_rows(query: Query, mode: CountMode) -> tuple[Optional[int], bool]:
+    """
+    Liczba wierszy zapytania i informacja, czy to szacunek. Poza PostgreSQL
+    szacunek nie jest dostępny i zawsze liczone jest dokładnie.
+    """
+    if mode is CountMode.none:
+        return None, False
+
+    query = query.order_by(None)
+    postgresql = query.session.get_bind().dialect.name == "postgresql"
+    if mode is CountMode.exact or not postgresql:
+        return query.count(), False
+
+    if mode is CountMode.auto:
+        limit = settings.PAGINATION_EXACT_COUNT_LIMIT
+        capped = query.session.query(func.count()).select_from(query.limit(limit + 1).subquery()).scalar()
+        if capped <= limit:
+            return capped, False
+    return estimate_rows(query), True
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: Any):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler: Any, **kwargs: Any) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kwargs)
+
+
+def estimate_rows(query: Query) -> int:
+    """Liczba wierszy wg planu zapytania (statystyki ANALYZE), bez jego wykonania"""
+    plan = query.session.execute(Explain(query.statement)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _sortable(query: Query, column: Any) -> Any:
+    # SQLite zapisuje CURRENT_TIMESTAMP bez ułamków sekund, a SQLAlchemy wiąże
+    # datetime z mikrosekundami - porównanie tekstowe wymaga wspólnego formatu
+    if query.session.get_bind().dialect.name == "sqlite":
+        return func.strftime("%Y-%m-%d %H:%M:%f", column)
+    return column
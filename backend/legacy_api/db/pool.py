@@ -0,0 +1,127 @@
+import logging
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import exc, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.overflow_connections = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_checkout(self, elapsed: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += int(timed_out)
+            self.wait_seconds_total += elapsed
+            self.wait_seconds_max = max(self.wait_seconds_max, elapsed)
+
+    def record_overflow(self) -> None:
+        with self._lock:
+            self.overflow_connections += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "overflow_connections": self.overflow_connections,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool rejestrujący czasy oczekiwania na połączenie, połączenia
+    ponad pool_size (overflow) i przekroczenia pool_timeout.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.record_checkout(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record_checkout(time.perf_counter() - start)
+        return connection
+
+    def _inc_overflow(self) -> bool:
+        created = super()._inc_overflow()
+        if created and self._overflow > 0:  # Ponad pool_size
+            self.stats.record_overflow()
+        return created
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.stats = self.stats  # Liczniki przetrwają dispose()
+        return pool
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """
+    InstrumentedQueuePool dla silnika asynchronicznego (DB_ASYNC_ENDPOINTS).
+    """
+
+
+def pool_status(engine: Engine) -> dict[str, Any]:
+    """
+    Stan puli połączeń silnika (dla endpointu /health/db).
+    """
+    pool = engine.pool
+    status: dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+        })
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
+
+
+def prewarm_pool(engine: Engine, count: int) -> int:
+    """
+    Otwiera `count` połączeń przy starcie, aby pierwsze żądania nie czekały na connect.
+    """
+    connections = []
+    try:
+        for _ in range(count):
+            connections.append(engine.raw_connection())
+    except exc.SQLAlchemyError:
+        logger.warning("Pool prewarm stopped after %d of %d connections", len(connections), count, exc_info=True)
+    finally:
+        for connection in connections:
+            connection.close()  # Zwraca połączenie do puli
+    return len(connections)
+
+
+def set_idle_in_transaction_timeout(db: Session, timeout_ms: int) -> None:
+    """
+    Zmienia idle_in_transaction_session_timeout tylko dla bieżącej transakcji
+    sesji (PostgreSQL) - dla transakcji bezczynnych z założenia, np. eksportu
+    czekającego, aż wolny klient odbierze kolejną porcję odpowiedzi. Po
+    commit/rollback połączenie z puli wraca do limitu z engine_options.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    db.execute(select(func.set_config("idle_in_transaction_session_timeout", str(timeout_ms), True)))
@@ -0,0 +1,163 @@
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Iterator, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import ORMExecuteState, Session
+
+logger = logging.getLogger(__name__)
+
+
+def replication_lag(engine: Engine) -> float:
+    """
+    Opóźnienie repliki względem serwera głównego w sekundach.
+
+    Replika, która odtworzyła wszystko, co otrzymała, zwraca 0 także wtedy,
+    gdy na serwerze głównym od dawna nic się nie zmieniło. Silniki inne niż
+    PostgreSQL (pliki SQLite w testach) nie mają replikacji i zwracają 0.
+    """
+    if engine.dialect.name != "postgresql":
+        return 0.0
+    with engine.connect() as connection:
+        lag = connection.execute(text(
+            "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+            "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+        )).scalar()
+    return float(lag or 0.0)
+
+
+class ReplicaRouter:
+    """
+    Wybiera silnik repliki dla zapytań tylko do odczytu (None = serwer główny).
+
+    Repliki opóźnione o więcej niż `max_lag` sekund albo nieosiągalne są
+    pomijane do następnego pomiaru (co `check_interval` sekund).
+    """
+
+    def __init__(
+        self,
+        engines: dict[str, Engine],
+        max_lag: float = 5.0,
+        check_interval: float = 5.0,
+        lag_probe: Callable[[Engine], float] = replication_lag,
+    ):
+        self.engines = engines
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag_probe = lag_probe
+        self._lags: dict[str, tuple[Optional[float], float]] = {}  # opóźnienie (None = nieosiągalna), czas pomiaru
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+
+    def replica_engine(self) -> Optional[Engine]:
+        healthy = [name for name, engine in self.engines.items() if self._within_lag(name, engine)]
+        if not healthy:
+            return None
+        return self.engines[healthy[next(self._counter) % len(healthy)]]
+
+    def status(self) -> dict[str, Optional[float]]:
+        """
+        Ostatnio zmierzone opóźnienie każdej repliki (dla endpointu /health/db).
+        """
+        return {name: self._lags.get(name, (None, 0.0))[0] for name in self.engines}
+
+    def _within_lag(self, name: str, engine: Engine) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            lag, checked_at = self._lags.get(name, (None, None))
+            stale = checked_at is None or now - checked_at >= self.check_interval
+            if stale:
+                # Pomiar "zajęty": równoległe żądania korzystają z poprzedniego wyniku
+                self._lags[name] = (lag, now)
+        if stale:
+            try:
+                lag = self.lag_probe(engine)
+            except SQLAlchemyError:
+                logger.warning("Replica %s is unreachable, reading from the primary", name, exc_info=True)
+                lag = None
+            with self._lock:
+                self._lags[name] = (lag, now)
+        return lag is not None and lag <= self.max_lag
+
+
+class RoutingSession(Session):
+    """
+    Sesja kierująca zapytania z bloku `replica_reads()` do repliki.
+
+    Flush i wszystkie zapytania sesji, która już coś zapisała, trafiają do
+    serwera głównego, więc żądanie zawsze odczytuje własne zapisy. Replika
+    jest wybierana raz na sesję (do close()), więc powiązane odczyty - np.
+    COUNT i strona listy albo sprawa i jej dokumenty - widzą ten sam stan.
+
+    Zapisem jest flush albo INSERT/UPDATE/DELETE wykonany przez
+    `session.execute` (np. `query.delete()`). Ograniczenie: przekierowanie
+    na serwer główny obejmuje tylko sesję, która zapisała - API nie zna
+    użytkownika, więc kolejne żądania (nowe sesje) mogą czytać z repliki
+    sprzed zapisu, dopóki ta go nie odtworzy (najwyżej `max_lag` sekund).
+    """
+
+    def __init__(self, *args: Any, router: Optional[ReplicaRouter] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.router = router
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and self.router is not None
+            and self.info.get("replica_reads")
+            and not self._flushing
+            and not self.info.get("wrote")
+        ):
+            if "replica" not in self.info:
+                self.info["replica"] = self.router.replica_engine()  # None = serwer główny
+            engine = self.info["replica"]
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def close(self) -> None:
+        self.info.pop("wrote", None)
+        self.info.pop("replica", None)
+        super().close()
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _record_write(session: Session, flush_context: Any) -> None:
+    session.info["wrote"] = True  # Odczyt własnych zapisów do końca sesji
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _record_dml(orm_execute_state: ORMExecuteState) -> None:
+    # Masowe UPDATE/DELETE i INSERT omijają flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@contextmanager
+def replica_reads(session: Session) -> Iterator[None]:
+    """
+    Kieruje zapytania bloku do repliki, jeśli któraś jest dostatecznie aktualna.
+    """
+    outer = session.info.get("replica_reads", 0)
+    session.info["replica_reads"] = outer + 1
+    try:
+        yield
+    finally:
+        session.info["replica_reads"] = outer
+
+
+def replica_read(method: Callable) -> Callable:
+    """
+    Wykonuje metodę serwisu (tylko odczyt, sesja w `self.db`) w `replica_reads()`.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with replica_reads(self.db):
+            return method(self, *args, **kwargs)
+    return wrapper
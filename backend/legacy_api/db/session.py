@@ -1,17 +1,60 @@
+from typing import Any
+
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.pool import InstrumentedQueuePool
+from app.db.routing import ReplicaRouter, RoutingSession
+
+
+def engine_options(database_url: str) -> dict[str, Any]:
+    """
+    Parametry silnika dla bieżącego środowiska (ENVIRONMENT i zmienne DB_*).
+    """
+    options: dict[str, Any] = {
+        "pool_pre_ping": True,
+        "echo": settings.DB_ECHO,
+    }
+    if not database_url.startswith("postgresql"):
+        return options  # np. SQLite w testach: domyślna pula SQLAlchemy
+
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.db_pool_option("pool_size"),
+        max_overflow=settings.db_pool_option("max_overflow"),
+        pool_timeout=settings.db_pool_option("pool_timeout"),
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        connect_args={
+            # Limity po stronie serwera: długie zapytanie ani porzucona transakcja
+            # nie zablokują połączenia z puli (ani blokad) bez końca.
+            "options": (
+                f"-c statement_timeout={settings.db_pool_option('statement_timeout_ms')} "
+                f"-c idle_in_transaction_session_timeout={settings.db_pool_option('idle_in_transaction_timeout_ms')}"
+            ),
+        },
+    )
+    return options
+
 
 # Create SQLAlchemy engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    echo=settings.DEBUG
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+
+# Read replicas dla zapytań tylko do odczytu (app.db.routing)
+replica_engines = {
+    f"replica_{index}": create_engine(url, **engine_options(url))
+    for index, url in enumerate(settings.DATABASE_REPLICA_URLS)
+}
+replica_router = ReplicaRouter(
+    replica_engines,
+    max_lag=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.DB_REPLICA_LAG_CHECK_INTERVAL,
 )
 
 # Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, bind=engine, router=replica_router
+)
 
 # Create Base class for models
 Base = declarative_base()
@@ -25,4 +68,12 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_sessionmaker() -> sessionmaker:
+    """
+    Dependency to get the session factory, for streaming responses that open
+    their own session for as long as the body is being sent
+    """
+    return SessionLocal
@@ -0,0 +1,48 @@
+"""
+Okresowa naprawa liczników law_firm_stats (utrzymywanych przez triggery).
+
+Uruchomienie z katalogu, w którym pakiet legacy_api jest widoczny jako `app`:
+
+    python -m app.jobs.repair_law_firm_stats                 # jednorazowo (np. z crona)
+    python -m app.jobs.repair_law_firm_stats --interval 3600 # w pętli
+"""
+import argparse
+import logging
+import time
+from typing import Optional
+from uuid import UUID
+
+from app.db.session import SessionLocal
+from app.services.kancelaria_service import LawFirmService
+
+logger = logging.getLogger(__name__)
+
+
+def repair(law_firm_id: Optional[UUID] = None) -> int:
+    with SessionLocal() as db:
+        repaired = LawFirmService(db).repair_law_firm_stats(law_firm_id)
+    logger.info("Repaired law_firm_stats for %d law firms", repaired)
+    return repaired
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--law-firm-id", type=UUID, default=None, help="domyślnie wszystkie kancelarie")
+    parser.add_argument("--interval", type=float, default=None, help="odstęp w sekundach między przebiegami")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    while True:
+        try:
+            repair(args.law_firm_id)
+        except Exception:
+            if args.interval is None:
+                raise
+            logger.exception("law_firm_stats repair failed")
+        if args.interval is None:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,49 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.openapi.utils import get_openapi
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 import time
 import logging
 
 from app.core.config import settings
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import MetricsMiddleware, metrics_registry
+from app.core.profiler import ProfilerMiddleware
+from app.db.async_session import (
+    dispose_async_engines, get_async_engine, get_async_replica_router, prewarm_async_pool
+)
+from app.db.pagination import InvalidCursor
+from app.db.pool import pool_status, prewarm_pool
+from app.db.session import engine, replica_router
+from app.api.v1.async_routes import async_router
 from app.api.v1.endpoints import kancelarie, klienci, sprawy
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pool prewarming: pierwsze żądania nie czekają na nawiązanie połączeń
+    prewarm = settings.db_pool_option("pool_prewarm")
+    if prewarm and settings.DB_ASYNC_ENDPOINTS:
+        opened = await prewarm_async_pool(get_async_engine(), prewarm)
+        logger.info(f"Prewarmed {opened} async database connections")
+    elif prewarm:
+        opened = await run_in_threadpool(prewarm_pool, engine, prewarm)
+        logger.info(f"Prewarmed {opened} database connections")
+    yield
+    if settings.DB_ASYNC_ENDPOINTS:
+        await dispose_async_engines()
+
+
 # Create FastAPI application
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -19,7 +51,8 @@ app = FastAPI(
     description=settings.DESCRIPTION,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -31,17 +64,48 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Response compression
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_level=settings.COMPRESSION_BROTLI_LEVEL,
+        flush_size=settings.COMPRESSION_FLUSH_SIZE,
+    )
+
+# Metryki żądań i zapytań SQL (obejmują też czas kompresji)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Profilowanie wybranych żądań (bez narzutu, gdy wyłączone)
+if settings.PROFILER_ENABLED:
+    app.add_middleware(
+        ProfilerMiddleware,
+        output_dir=settings.PROFILER_OUTPUT_DIR,
+        token=settings.PROFILER_TOKEN,
+        sample_rate=settings.PROFILER_SAMPLE_RATE,
+        interval=settings.PROFILER_INTERVAL,
+        max_seconds=settings.PROFILER_MAX_SECONDS,
+    )
+
 
 # Request timing middleware
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
-    start_time = time.time()
+    start_time = time.perf_counter()
     response = await call_next(request)
-    process_time = time.time() - start_time
+    process_time = time.perf_counter() - start_time
     response.headers["X-Process-Time"] = str(process_time)
     return response
 
 
+# Kursor paginacji niepasujący do listy (np. z wyszukiwania)
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -68,6 +132,42 @@ async def health_check():
     }
 
 
+@app.get("/health/db")
+def database_health_check():
+    """
+    Endpoint sprawdzający połączenie z bazą i stan puli połączeń.
+    """
+    start_time = time.perf_counter()
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        status, status_code = "healthy", 200
+    except SQLAlchemyError:
+        logger.warning("Database health check failed", exc_info=True)
+        status, status_code = "unavailable", 503
+    content = {
+        "status": status,
+        "latency_ms": round((time.perf_counter() - start_time) * 1000, 2),
+        "pool": pool_status(engine),
+        "replica_lag_seconds": replica_router.status(),
+    }
+    if settings.DB_ASYNC_ENDPOINTS:
+        # Endpointy API korzystają wtedy z osobnej puli i własnych pomiarów opóźnienia replik
+        content["async_pool"] = pool_status(get_async_engine().sync_engine)
+        content["async_replica_lag_seconds"] = get_async_replica_router().status()
+    return JSONResponse(status_code=status_code, content=content)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Metryki w formacie tekstowym Prometheus.
+    """
+    if not settings.METRICS_ENABLED:
+        return JSONResponse(status_code=404, content={"detail": "Not Found"})
+    return Response(generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
+
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -83,23 +183,30 @@ async def root():
     }
 
 
+def api_router(router):
+    """
+    Router w trybie wybranym przez DB_ASYNC_ENDPOINTS (sync: pula wątków, async: asyncpg/aiosqlite).
+    """
+    return async_router(router) if settings.DB_ASYNC_ENDPOINTS else router
+
+
 # Include API routers
 app.include_router(
-    kancelarie.router,
+    api_router(kancelarie.router),
     prefix=f"{settings.API_V1_STR}/kancelarie",
     tags=["Kancelarie"],
     responses={404: {"description": "Nie znaleziono"}}
 )
 
 app.include_router(
-    klienci.router,
+    api_router(klienci.router),
     prefix=f"{settings.API_V1_STR}/klienci",
     tags=["Klienci"],
     responses={404: {"description": "Nie znaleziono"}}
 )
 
 app.include_router(
-    sprawy.router,
+    api_router(sprawy.router),
     prefix=f"{settings.API_V1_STR}/sprawy",
     tags=["Sprawy"],
     responses={404: {"description": "Nie znaleziono"}}
@@ -1,8 +1,9 @@
-from sqlalchemy import Column, String, Text, DateTime, Boolean, Integer, Numeric, Date, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID, ENUM
+from sqlalchemy import Column, String, Text, DateTime, Boolean, Integer, BigInteger, Numeric, Date, ForeignKey, DDL, event
+from sqlalchemy.dialects.postgresql import UUID, ENUM, TSVECTOR
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
+from app.core.search import client_search_text
 from app.db.session import Base
 
 # Enums matching Supabase schema
@@ -32,6 +33,23 @@ class LawFirm(Base):
     cases = relationship("Case", back_populates="law_firm")
 
 
+class LawFirmStats(Base):
+    """
+    Liczniki kancelarii utrzymywane przyrostowo przez triggery na clients i cases
+    (supabase/migrations, dla SQLite poniżej) - również przy zapisach z frontendu
+    bezpośrednio do Supabase. Rozbieżności naprawia LawFirmService.repair_law_firm_stats.
+    """
+    __tablename__ = "law_firm_stats"
+
+    law_firm_id = Column(UUID(as_uuid=True), ForeignKey('law_firms.id', ondelete='CASCADE'), primary_key=True)
+    clients_count = Column(Integer, nullable=False, default=0, server_default='0')
+    cases_count = Column(Integer, nullable=False, default=0, server_default='0')
+    active_cases_count = Column(Integer, nullable=False, default=0, server_default='0')
+    # Podbijana przy każdym zapisie do cases kancelarii; klucz pamięci podręcznej statystyk spraw
+    cases_version = Column(BigInteger, nullable=False, default=0, server_default='0')
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
 class Profile(Base):
     __tablename__ = "profiles"
 
@@ -51,7 +69,7 @@ class Profile(Base):
     law_firm = relationship("LawFirm", back_populates="profiles")
     assigned_cases = relationship("Case", back_populates="assigned_lawyer")
     case_notes = relationship("CaseNote", back_populates="author")
-    uploaded_documents = relationship("Document", back_populates="uploaded_by")
+    uploaded_documents = relationship("Document", back_populates="uploader")
 
 
 class Client(Base):
@@ -68,6 +86,9 @@ class Client(Base):
     date_of_birth = Column(Date)
     pesel = Column(String(11))
     notes = Column(Text)
+    # Imię, nazwisko, email, cyfry telefonu i PESEL bez diakrytyków (app.core.search);
+    # w PostgreSQL ustawiana triggerem i objęta indeksem GIN pg_trgm
+    search_text = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -76,6 +97,14 @@ class Client(Base):
     cases = relationship("Case", back_populates="client")
 
 
+@event.listens_for(Client, "before_insert")
+@event.listens_for(Client, "before_update")
+def _set_client_search_text(mapper, connection, target: Client) -> None:
+    target.search_text = client_search_text(
+        target.first_name, target.last_name, target.email, target.phone, target.pesel
+    )
+
+
 class Case(Base):
     __tablename__ = "cases"
 
@@ -104,6 +133,18 @@ class Case(Base):
     case_notes = relationship("CaseNote", back_populates="case")
 
 
+class CaseSearch(Base):
+    """
+    Wektor wyszukiwania pełnotekstowego sprawy (numer, tytuł, opis, jawne notatki).
+    Tylko PostgreSQL: wiersze zakładają i aktualizują triggery z migracji Supabase.
+    """
+    __tablename__ = "case_search"
+
+    case_id = Column(UUID(as_uuid=True), ForeignKey('cases.id', ondelete='CASCADE'), primary_key=True)
+    law_firm_id = Column(UUID(as_uuid=True), ForeignKey('law_firms.id', ondelete='CASCADE'), nullable=False)
+    search_vector = Column(TSVECTOR().with_variant(Text(), 'sqlite'), nullable=False)
+
+
 class Document(Base):
     __tablename__ = "documents"
 
@@ -119,7 +160,7 @@ class Document(Base):
 
     # Relationships
     case = relationship("Case", back_populates="documents")
-    uploaded_by = relationship("Profile", back_populates="uploaded_documents")
+    uploader = relationship("Profile", back_populates="uploaded_documents")
 
 
 class CaseNote(Base):
@@ -135,4 +176,99 @@ class CaseNote(Base):
 
     # Relationships
     case = relationship("Case", back_populates="case_notes")
-    author = relationship("Profile", back_populates="case_notes")
\ No newline at end of file
+    author = relationship("Profile", back_populates="case_notes")
+
+
+# Odpowiedniki triggerów law_firm_stats z migracji Supabase dla baz SQLite (testy, dev).
+# Na PostgreSQL schemat i triggery zakłada wyłącznie migracja.
+_SQLITE_STATS_TRIGGERS = {
+    LawFirm.__table__: [
+        """
+        CREATE TRIGGER law_firms_stats_insert AFTER INSERT ON law_firms
+        BEGIN
+            INSERT OR IGNORE INTO law_firm_stats (law_firm_id) VALUES (NEW.id);
+        END
+        """,
+    ],
+    Client.__table__: [
+        """
+        CREATE TRIGGER clients_stats_insert AFTER INSERT ON clients
+        BEGIN
+            INSERT OR IGNORE INTO law_firm_stats (law_firm_id) VALUES (NEW.law_firm_id);
+            UPDATE law_firm_stats SET clients_count = clients_count + 1 WHERE law_firm_id = NEW.law_firm_id;
+        END
+        """,
+        """
+        CREATE TRIGGER clients_stats_delete AFTER DELETE ON clients
+        BEGIN
+            UPDATE law_firm_stats SET clients_count = clients_count - 1 WHERE law_firm_id = OLD.law_firm_id;
+        END
+        """,
+        """
+        CREATE TRIGGER clients_stats_update AFTER UPDATE OF law_firm_id ON clients
+        WHEN OLD.law_firm_id IS NOT NEW.law_firm_id
+        BEGIN
+            UPDATE law_firm_stats SET clients_count = clients_count - 1 WHERE law_firm_id = OLD.law_firm_id;
+            INSERT OR IGNORE INTO law_firm_stats (law_firm_id) VALUES (NEW.law_firm_id);
+            UPDATE law_firm_stats SET clients_count = clients_count + 1 WHERE law_firm_id = NEW.law_firm_id;
+        END
+        """,
+    ],
+    Case.__table__: [
+        """
+        CREATE TRIGGER cases_stats_insert AFTER INSERT ON cases
+        BEGIN
+            INSERT OR IGNORE INTO law_firm_stats (law_firm_id) VALUES (NEW.law_firm_id);
+            UPDATE law_firm_stats
+            SET cases_count = cases_count + 1, active_cases_count = active_cases_count + (NEW.status = 'active')
+            WHERE law_firm_id = NEW.law_firm_id;
+        END
+        """,
+        """
+        CREATE TRIGGER cases_stats_delete AFTER DELETE ON cases
+        BEGIN
+            UPDATE law_firm_stats
+            SET cases_count = cases_count - 1, active_cases_count = active_cases_count - (OLD.status = 'active')
+            WHERE law_firm_id = OLD.law_firm_id;
+        END
+        """,
+        """
+        CREATE TRIGGER cases_stats_update AFTER UPDATE OF status, law_firm_id ON cases
+        WHEN OLD.law_firm_id IS NOT NEW.law_firm_id OR OLD.status IS NOT NEW.status
+        BEGIN
+            UPDATE law_firm_stats
+            SET cases_count = cases_count - 1, active_cases_count = active_cases_count - (OLD.status = 'active')
+            WHERE law_firm_id = OLD.law_firm_id;
+            INSERT OR IGNORE INTO law_firm_stats (law_firm_id) VALUES (NEW.law_firm_id);
+            UPDATE law_firm_stats
+            SET cases_count = cases_count + 1, active_cases_count = active_cases_count + (NEW.status = 'active')
+            WHERE law_firm_id = NEW.law_firm_id;
+        END
+        """,
+        """
+        CREATE TRIGGER cases_version_insert AFTER INSERT ON cases
+        BEGIN
+            INSERT OR IGNORE INTO law_firm_stats (law_firm_id) VALUES (NEW.law_firm_id);
+            UPDATE law_firm_stats SET cases_version = cases_version + 1 WHERE law_firm_id = NEW.law_firm_id;
+        END
+        """,
+        """
+        CREATE TRIGGER cases_version_update AFTER UPDATE ON cases
+        BEGIN
+            INSERT OR IGNORE INTO law_firm_stats (law_firm_id) VALUES (NEW.law_firm_id);
+            UPDATE law_firm_stats SET cases_version = cases_version + 1
+            WHERE law_firm_id IN (OLD.law_firm_id, NEW.law_firm_id);
+        END
+        """,
+        """
+        CREATE TRIGGER cases_version_delete AFTER DELETE ON cases
+        BEGIN
+            UPDATE law_firm_stats SET cases_version = cases_version + 1 WHERE law_firm_id = OLD.law_firm_id;
+        END
+        """,
+    ],
+}
+
+for _table, _statements in _SQLITE_STATS_TRIGGERS.items():
+    for _statement in _statements:
+        event.listen(_table, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
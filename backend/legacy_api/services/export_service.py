@@ -0,0 +1,132 @@
+import csv
+import io
+import json
+import zipfile
+from datetime import date, datetime
+from typing import Any, Iterator, List
+from uuid import UUID
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.pool import set_idle_in_transaction_timeout
+from app.models.kancelaria import Case, CaseNote, Client, Document
+from app.api.v1.schemas.kancelaria import ExportFormat
+
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)  # UUID, Decimal
+
+
+class _ArchiveStream:
+    """
+    Plik, do którego zipfile zapisuje archiwum; zapisane bajty odbiera take().
+    Brak tell() i seek() przełącza zipfile w tryb strumieniowy (data descriptors).
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class LawFirmExportService:
+    """
+    Eksport wszystkich danych kancelarii (klienci, sprawy, metadane dokumentów,
+    notatki) jako NDJSON albo archiwum ZIP z plikiem CSV na tabelę.
+
+    Tabele są czytane kursorem po stronie serwera (yield_per) porcjami po
+    EXPORT_BATCH_SIZE wierszy i wysyłane na bieżąco, więc zużycie pamięci nie
+    zależy od wielkości kancelarii. W PostgreSQL całość czyta jedna transakcja
+    REPEATABLE READ tylko do odczytu - wszystkie tabele pochodzą z tego samego
+    snapshotu, którego chwila (snapshot_at) jest zapisywana w eksporcie.
+    Transakcja jest bezczynna, gdy klient wolno odbiera odpowiedź, więc
+    dostaje limit EXPORT_IDLE_IN_TRANSACTION_TIMEOUT_MS zamiast domyślnego.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def export(self, law_firm_id: UUID, format: ExportFormat) -> Iterator[bytes]:
+        snapshot_at = self._begin_snapshot()
+        if format is ExportFormat.zip:
+            return self._zip(law_firm_id, snapshot_at)
+        return self._ndjson(law_firm_id, snapshot_at)
+
+    def _begin_snapshot(self) -> datetime:
+        if self.db.get_bind().dialect.name == "postgresql":
+            self.db.connection(execution_options={"isolation_level": "REPEATABLE READ", "postgresql_readonly": True})
+            set_idle_in_transaction_timeout(self.db, settings.EXPORT_IDLE_IN_TRANSACTION_TIMEOUT_MS)
+        # now() w PostgreSQL to początek transakcji, czyli chwila snapshotu
+        return self.db.execute(select(func.now())).scalar()
+
+    @staticmethod
+    def _tables(law_firm_id: UUID) -> List[tuple[str, str, Select]]:
+        """(tabela, typ rekordu NDJSON, zapytanie) w kolejności eksportu"""
+        client_columns = [column for column in Client.__table__.columns if column.key != "search_text"]
+        return [
+            ("clients", "client", select(*client_columns).where(
+                Client.law_firm_id == law_firm_id
+            ).order_by(Client.created_at, Client.id)),
+            ("cases", "case", select(*Case.__table__.columns).where(
+                Case.law_firm_id == law_firm_id
+            ).order_by(Case.created_at, Case.id)),
+            ("documents", "document", select(*Document.__table__.columns).join(Case, Document.case_id == Case.id).where(
+                Case.law_firm_id == law_firm_id
+            ).order_by(Document.created_at, Document.id)),
+            ("case_notes", "case_note", select(*CaseNote.__table__.columns).join(Case, CaseNote.case_id == Case.id).where(
+                Case.law_firm_id == law_firm_id
+            ).order_by(CaseNote.created_at, CaseNote.id)),
+        ]
+
+    def _batches(self, statement: Select) -> Iterator[List[tuple]]:
+        result = self.db.execute(statement, execution_options={"yield_per": settings.EXPORT_BATCH_SIZE})
+        for rows in result.partitions():
+            yield [tuple(_export_value(value) for value in row) for row in rows]
+
+    def _ndjson(self, law_firm_id: UUID, snapshot_at: datetime) -> Iterator[bytes]:
+        def line(record: dict) -> bytes:
+            return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+
+        yield line({"type": "export", "law_firm_id": str(law_firm_id), "snapshot_at": snapshot_at.isoformat()})
+        for _, record_type, statement in self._tables(law_firm_id):
+            keys = list(statement.selected_columns.keys())
+            for rows in self._batches(statement):
+                yield b"".join(line({"type": record_type, "data": dict(zip(keys, row))}) for row in rows)
+
+    def _zip(self, law_firm_id: UUID, snapshot_at: datetime) -> Iterator[bytes]:
+        stream = _ArchiveStream()
+        counts = {}
+        with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for table, _, statement in self._tables(law_firm_id):
+                counts[table] = 0
+                # force_zip64: rozmiar pliku nie jest znany przed jego zapisaniem
+                with io.TextIOWrapper(
+                    archive.open(f"{table}.csv", "w", force_zip64=True), encoding="utf-8", newline=""
+                ) as entry:
+                    writer = csv.writer(entry)
+                    writer.writerow(statement.selected_columns.keys())
+                    for rows in self._batches(statement):
+                        writer.writerows(rows)
+                        entry.flush()
+                        counts[table] += len(rows)
+                        yield stream.take()
+            archive.writestr("export.json", json.dumps({
+                "law_firm_id": str(law_firm_id), "snapshot_at": snapshot_at.isoformat(), "rows": counts,
+            }, indent=2))
+        yield stream.take()
@@ -0,0 +1,165 @@
+import csv
+import io
+import json
+import time
+from typing import IO, Any, Callable, Iterator, List, Optional, Type
+from uuid import UUID
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.search import client_search_text
+from app.models.kancelaria import Case, Client, Profile
+from app.api.v1.schemas.kancelaria import CaseCreate, ClientCreate, ImportFormat
+
+
+def read_rows(source: IO[bytes], format: ImportFormat) -> Iterator[tuple[int, Optional[dict], Optional[str]]]:
+    """
+    Wiersze pliku CSV (z nagłówkiem) lub NDJSON jako (numer linii, dane, błąd),
+    czytane strumieniowo. W CSV pusta wartość oznacza brak wartości (None).
+    """
+    text = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+    try:
+        if format is ImportFormat.csv:
+            reader = csv.DictReader(text)
+            for row in reader:
+                if None in row:
+                    yield reader.line_num, None, "Więcej wartości niż kolumn w nagłówku"
+                    continue
+                yield reader.line_num, {key: value if value != "" else None for key, value in row.items()}, None
+        else:
+            for line_number, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    data = json.loads(line)
+                except ValueError as exc:
+                    yield line_number, None, f"Nieprawidłowy JSON: {exc}"
+                    continue
+                if not isinstance(data, dict):
+                    yield line_number, None, "Wiersz musi być obiektem JSON"
+                    continue
+                yield line_number, data, None
+    finally:
+        text.detach()  # zamknięcie pliku należy do wywołującego
+
+
+class BulkImportService:
+    """
+    Import klientów i spraw kancelarii z pliku CSV lub NDJSON.
+
+    Wiersze są walidowane schematami *Create i zapisywane partiami po
+    BULK_IMPORT_BATCH_SIZE: jeden INSERT z wieloma zestawami parametrów
+    (executemany / insertmanyvalues) i commit na partię, bez obiektów ORM
+    i odczytu po zapisie. Błędny wiersz trafia do raportu i nie przerywa
+    importu. Liczniki law_firm_stats, wersje i wektory wyszukiwania
+    aktualizują triggery, jak przy zapisie pojedynczych wierszy.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def import_clients(self, law_firm_id: UUID, source: IO[bytes], format: ImportFormat) -> dict:
+        return self._import(Client, ClientCreate, law_firm_id, source, format, self._prepare_clients)
+
+    def import_cases(self, law_firm_id: UUID, source: IO[bytes], format: ImportFormat) -> dict:
+        return self._import(Case, CaseCreate, law_firm_id, source, format, self._prepare_cases)
+
+    def _import(
+        self,
+        model: Any,
+        schema: Type[BaseModel],
+        law_firm_id: UUID,
+        source: IO[bytes],
+        format: ImportFormat,
+        prepare: Callable[[UUID, List[tuple[int, dict]], dict], List[tuple[int, dict]]]
+    ) -> dict:
+        started = time.perf_counter()
+        report = {"format": format, "rows": 0, "inserted": 0, "failed": 0, "errors": []}
+        batch: List[tuple[int, dict]] = []
+
+        for line, data, error in read_rows(source, format):
+            report["rows"] += 1
+            if error is not None:
+                self._fail(report, line, [(None, error)])
+                continue
+            try:
+                # Kancelaria wynika z adresu endpointu, nie z treści pliku
+                values = schema.model_validate({**data, "law_firm_id": law_firm_id}).model_dump()
+            except ValidationError as exc:
+                self._fail(report, line, [
+                    (".".join(str(part) for part in detail["loc"]) or None, detail["msg"]) for detail in exc.errors()
+                ])
+                continue
+            batch.append((line, values))
+            if len(batch) >= settings.BULK_IMPORT_BATCH_SIZE:
+                self._insert(model, prepare(law_firm_id, batch, report), report)
+                batch = []
+        if batch:
+            self._insert(model, prepare(law_firm_id, batch, report), report)
+
+        elapsed = time.perf_counter() - started
+        report["duration_seconds"] = round(elapsed, 3)
+        report["rows_per_second"] = round(report["rows"] / elapsed, 1) if elapsed > 0 else 0.0
+        return report
+
+    def _prepare_clients(self, law_firm_id: UUID, batch: List[tuple[int, dict]], report: dict) -> List[tuple[int, dict]]:
+        # INSERT z pominięciem ORM nie wywołuje zdarzenia ustawiającego search_text
+        for _, values in batch:
+            values["search_text"] = client_search_text(
+                values["first_name"], values["last_name"], values["email"], values["phone"], values["pesel"]
+            )
+        return batch
+
+    def _prepare_cases(self, law_firm_id: UUID, batch: List[tuple[int, dict]], report: dict) -> List[tuple[int, dict]]:
+        """
+        Klient i prawnik muszą należeć do importującej kancelarii - sprawdzane
+        jednym zapytaniem na partię zamiast polegać na kluczach obcych.
+        """
+        client_ids = {values["client_id"] for _, values in batch}
+        lawyer_ids = {values["assigned_lawyer_id"] for _, values in batch if values["assigned_lawyer_id"]}
+        clients = set(self.db.scalars(
+            select(Client.id).where(Client.law_firm_id == law_firm_id, Client.id.in_(client_ids))
+        ))
+        lawyers = set(self.db.scalars(
+            select(Profile.id).where(Profile.law_firm_id == law_firm_id, Profile.id.in_(lawyer_ids))
+        )) if lawyer_ids else set()
+
+        valid = []
+        for line, values in batch:
+            if values["client_id"] not in clients:
+                self._fail(report, line, [("client_id", "Klient nie istnieje w tej kancelarii")])
+            elif values["assigned_lawyer_id"] and values["assigned_lawyer_id"] not in lawyers:
+                self._fail(report, line, [("assigned_lawyer_id", "Prawnik nie należy do tej kancelarii")])
+            else:
+                valid.append((line, values))
+        return valid
+
+    def _insert(self, model: Any, batch: List[tuple[int, dict]], report: dict) -> None:
+        if not batch:
+            return
+        try:
+            with self.db.begin_nested():
+                self.db.execute(insert(model), [values for _, values in batch])
+            report["inserted"] += len(batch)
+        except IntegrityError:
+            # Naruszenie ograniczenia w partii: zapis wiersz po wierszu, żeby wskazać błędne
+            for line, values in batch:
+                try:
+                    with self.db.begin_nested():
+                        self.db.execute(insert(model), [values])
+                    report["inserted"] += 1
+                except IntegrityError as exc:
+                    self._fail(report, line, [(None, str(exc.orig).strip())])
+        self.db.commit()
+
+    @staticmethod
+    def _fail(report: dict, line: int, errors: List[tuple[Optional[str], str]]) -> None:
+        """Odrzucony wiersz; jego błędy (pole, komunikat) trafiają do raportu do limitu"""
+        report["failed"] += 1
+        for field, message in errors:
+            if len(report["errors"]) < settings.BULK_IMPORT_MAX_ERRORS:
+                report["errors"].append({"line": line, "field": field, "message": message})
@@ -1,9 +1,20 @@
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, and_
-from typing import List, Optional
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload
+from sqlalchemy import func, cast, exists, or_, select
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from collections import Counter
+from typing import Iterable, List, Optional
 from uuid import UUID
 
-from app.models.kancelaria import LawFirm, Profile, Client, Case, Document, CaseNote
+from app.core.cache import VersionedCache
+from app.core.config import settings
+from app.core.search import (
+    highlight, like_pattern, normalize_search_term, search_words
+)
+from app.db.pagination import (
+    PageParams, count_rows, keyset_paginate, offset_cursor, offset_position, page_response
+)
+from app.db.routing import replica_read
+from app.models.kancelaria import LawFirm, LawFirmStats, Profile, Client, Case, CaseSearch, Document, CaseNote
 from app.api.v1.schemas.kancelaria import (
     LawFirmCreate, LawFirmUpdate,
     ProfileCreate, ProfileUpdate,
@@ -14,6 +25,12 @@ from app.api.v1.schemas.kancelaria import (
     CaseStatus, CasePriority
 )
 
+# Statystyki spraw per kancelaria, ważne dopóki nie zmieni się law_firm_stats.cases_version
+case_statistics_cache = VersionedCache(settings.CASE_STATS_CACHE_SIZE)
+
+# Relacje, które można dołączyć do szczegółów sprawy (parametr include)
+CASE_DETAIL_RELATIONS = ('client', 'assigned_lawyer', 'documents', 'case_notes')
+
 
 class LawFirmService:
     def __init__(self, db: Session):
@@ -31,9 +48,14 @@ class LawFirmService:
         """Pobiera kancelarię po ID"""
         return self.db.query(LawFirm).filter(LawFirm.id == law_firm_id).first()
 
-    def get_law_firms(self, skip: int = 0, limit: int = 100) -> List[LawFirm]:
-        """Pobiera listę kancelarii z paginacją"""
-        return self.db.query(LawFirm).offset(skip).limit(limit).all()
+    def law_firm_exists(self, law_firm_id: UUID) -> bool:
+        """Sprawdza istnienie kancelarii (SELECT EXISTS) bez ładowania wiersza"""
+        return self.db.query(exists().where(LawFirm.id == law_firm_id)).scalar()
+
+    @replica_read
+    def get_law_firms(self, page: PageParams = PageParams()) -> dict:
+        """Pobiera stronę listy kancelarii (paginacja kursorem)"""
+        return keyset_paginate(self.db.query(LawFirm), LawFirm, page)
 
     def update_law_firm(self, law_firm_id: UUID, law_firm_data: LawFirmUpdate) -> Optional[LawFirm]:
         """Aktualizuje dane kancelarii"""
@@ -59,16 +81,71 @@ class LawFirmService:
         self.db.commit()
         return True
 
+    @replica_read
+    def get_law_firm_with_stats(self, law_firm_id: UUID) -> Optional[dict]:
+        """Pobiera kancelarię wraz z licznikami jednym zapytaniem"""
+        row = self.db.query(LawFirm, LawFirmStats).outerjoin(
+            LawFirmStats, LawFirmStats.law_firm_id == LawFirm.id
+        ).filter(LawFirm.id == law_firm_id).first()
+        if row is None:
+            return None
+
+        law_firm, stats = row
+        law_firm_dict = {column.key: getattr(law_firm, column.key) for column in LawFirm.__table__.columns}
+        law_firm_dict.update(self._stats_dict(stats))
+        return law_firm_dict
+
+    @replica_read
     def get_law_firm_stats(self, law_firm_id: UUID) -> dict:
-        """Pobiera statystyki kancelarii"""
-        stats = self.db.query(
-            func.count(Client.id).label('clients_count'),
-            func.count(Case.id).label('cases_count'),
-            func.count(Case.id).filter(Case.status == 'active').label('active_cases_count')
-        ).select_from(LawFirm).outerjoin(Client).outerjoin(Case).filter(
-            LawFirm.id == law_firm_id
-        ).first()
-        
+        """Pobiera statystyki kancelarii (jeden wiersz law_firm_stats)"""
+        return self._stats_dict(self.db.get(LawFirmStats, law_firm_id))
+
+    def repair_law_firm_stats(self, law_firm_id: Optional[UUID] = None) -> int:
+        """
+        Przelicza liczniki law_firm_stats od zera i poprawia rozbieżne wiersze.
+        Zwraca liczbę poprawionych kancelarii.
+
+        Każda kancelaria w osobnej transakcji: wiersz liczników jest blokowany przed
+        liczeniem, więc równoległe zapisy (triggery) albo są już widoczne w wyniku,
+        albo czekają i doliczają się po naprawie - nic nie ginie.
+        """
+        query = self.db.query(LawFirm.id)
+        if law_firm_id:
+            query = query.filter(LawFirm.id == law_firm_id)
+        law_firm_ids = [row.id for row in query.all()]
+        self.db.commit()
+
+        repaired = 0
+        for firm_id in law_firm_ids:
+            stats = self.db.execute(
+                select(LawFirmStats).where(LawFirmStats.law_firm_id == firm_id).with_for_update()
+            ).scalar_one_or_none()
+            if stats is None:
+                stats = LawFirmStats(law_firm_id=firm_id)
+                self.db.add(stats)
+
+            counts = {
+                'clients_count': self.db.query(func.count(Client.id)).filter(
+                    Client.law_firm_id == firm_id
+                ).scalar(),
+                'cases_count': self.db.query(func.count(Case.id)).filter(
+                    Case.law_firm_id == firm_id
+                ).scalar(),
+                'active_cases_count': self.db.query(func.count(Case.id)).filter(
+                    Case.law_firm_id == firm_id, Case.status == 'active'
+                ).scalar(),
+            }
+            if self._stats_dict(stats) != counts or stats.clients_count is None:
+                for field, value in counts.items():
+                    setattr(stats, field, value)
+                repaired += 1
+            self.db.commit()
+        return repaired
+
+    @staticmethod
+    def _stats_dict(stats: Optional[LawFirmStats]) -> dict:
+        if stats is None:
+            return {'clients_count': 0, 'cases_count': 0, 'active_cases_count': 0}
         return {
             'clients_count': stats.clients_count or 0,
             'cases_count': stats.cases_count or 0,
@@ -92,12 +169,13 @@ class ClientService:
         """Pobiera klienta po ID"""
         return self.db.query(Client).filter(Client.id == client_id).first()
 
-    def get_clients(self, law_firm_id: Optional[UUID] = None, skip: int = 0, limit: int = 100) -> List[Client]:
-        """Pobiera listę klientów z opcjonalnym filtrowaniem po kancelarii"""
+    @replica_read
+    def get_clients(self, law_firm_id: Optional[UUID] = None, page: PageParams = PageParams()) -> dict:
+        """Pobiera stronę listy klientów z opcjonalnym filtrowaniem po kancelarii"""
         query = self.db.query(Client)
         if law_firm_id:
             query = query.filter(Client.law_firm_id == law_firm_id)
-        return query.offset(skip).limit(limit).all()
+        return keyset_paginate(query, Client, page)
 
     def update_client(self, client_id: UUID, client_data: ClientUpdate) -> Optional[Client]:
         """Aktualizuje dane klienta"""
@@ -123,14 +201,29 @@ class ClientService:
         self.db.commit()
         return True
 
-    def search_clients(self, law_firm_id: UUID, search_term: str, skip: int = 0, limit: int = 100) -> List[Client]:
-        """Wyszukuje klientów po imieniu, nazwisku lub emailu"""
-        return self.db.query(Client).filter(
-            and_(
-                Client.law_firm_id == law_firm_id,
-                func.concat(Client.first_name, ' ', Client.last_name, ' ', Client.email).ilike(f'%{search_term}%')
-            )
-        ).offset(skip).limit(limit).all()
+    @replica_read
+    def search_clients(self, law_firm_id: UUID, search_term: str, page: PageParams = PageParams()) -> dict:
+        """
+        Wyszukuje klientów po imieniu, nazwisku, emailu, telefonie lub numerze PESEL.
+
+        Fraza jest dopasowywana jako podciąg kolumny search_text (bez diakrytyków).
+        W PostgreSQL dopasowanie obsługuje indeks GIN pg_trgm, a wyniki są
+        sortowane od najtrafniejszych (word_similarity); w pozostałych bazach
+        (SQLite w testach) alfabetycznie.
+        """
+        term = normalize_search_term(search_term)
+        offset = offset_position(page)
+        query = self.db.query(Client).filter(
+            Client.law_firm_id == law_firm_id,
+            Client.search_text.like(like_pattern(term), escape='\\')
+        )
+        total, estimated = count_rows(query.with_entities(Client.id), page.count)
+        if term and self.db.get_bind().dialect.name == 'postgresql':
+            query = query.order_by(func.word_similarity(term, Client.search_text).desc())
+        clients = query.order_by(
+            Client.last_name, Client.first_name, Client.id
+        ).offset(offset).limit(page.limit).all()
+        return page_response(clients, page, offset_cursor(offset, page, len(clients)), total, estimated)
 
 
 class CaseService:
@@ -146,25 +239,74 @@ class CaseService:
         return db_case
 
     def get_case(self, case_id: UUID) -> Optional[Case]:
-        """Pobiera sprawę po ID z powiązanymi danymi"""
+        """
+        Pobiera sprawę po ID z powiązanymi danymi. Kolekcje są ładowane osobnymi
+        zapytaniami (selectinload): JOIN dokumentów i notatek w jednym zapytaniu
+        zwracałby iloczyn ich liczby wierszy.
+        """
         return self.db.query(Case).options(
             joinedload(Case.client),
             joinedload(Case.assigned_lawyer),
-            joinedload(Case.documents),
-            joinedload(Case.case_notes)
+            selectinload(Case.documents),
+            selectinload(Case.case_notes)
+        ).filter(Case.id == case_id).first()
+
+    def case_exists(self, case_id: UUID) -> bool:
+        """
+        Sprawdza istnienie sprawy (SELECT EXISTS po kluczu głównym) przed zapisem
+        powiązanego wiersza, bez ładowania sprawy i jej relacji.
+        """
+        return self.db.query(exists().where(Case.id == case_id)).scalar()
+
+    def get_case_details(
+        self,
+        case_id: UUID,
+        include: Iterable[str] = CASE_DETAIL_RELATIONS,
+        children_limit: Optional[int] = None
+    ) -> Optional[dict]:
+        """
+        Szczegóły sprawy tylko z relacjami wymienionymi w `include`.
+
+        Klient i prawnik są dołączane JOIN-em, a dokumenty i notatki pobierane
+        osobno: najwyżej `children_limit` najnowszych (domyślnie
+        CASE_DETAIL_CHILDREN_LIMIT), z `<relacja>_has_more`, gdy jest ich więcej.
+        Pozostałych relacji nie ładuje ani nie zwraca.
+        """
+        include = set(include)
+        if children_limit is None:
+            children_limit = settings.CASE_DETAIL_CHILDREN_LIMIT
+
+        case = self.db.query(Case).options(
+            *(joinedload(getattr(Case, name)) for name in ('client', 'assigned_lawyer') if name in include),
+            raiseload('*')
         ).filter(Case.id == case_id).first()
+        if not case:
+            return None
 
+        details = self._case_columns(case)
+        for name in ('client', 'assigned_lawyer'):
+            if name in include:
+                details[name] = getattr(case, name)
+        for name, model in (('documents', Document), ('case_notes', CaseNote)):
+            if name in include:
+                rows = self.db.query(model).filter(model.case_id == case_id).order_by(
+                    model.created_at.desc(), model.id.desc()
+                ).limit(children_limit + 1).all()
+                details[name] = rows[:children_limit]
+                details[f'{name}_has_more'] = len(rows) > children_limit
+        return details
+
+    @replica_read
     def get_cases(
         self, 
         law_firm_id: Optional[UUID] = None,
         client_id: Optional[UUID] = None,
         status: Optional[CaseStatus] = None,
         priority: Optional[CasePriority] = None,
-        skip: int = 0, 
-        limit: int = 100
-    ) -> List[Case]:
-        """Pobiera listę spraw z filtrowaniem"""
-        query = self.db.query(Case).options(joinedload(Case.client))
+        page: PageParams = PageParams()
+    ) -> dict:
+        """Pobiera stronę listy spraw z filtrowaniem"""
+        query = self.db.query(Case)
         
         if law_firm_id:
             query = query.filter(Case.law_firm_id == law_firm_id)
@@ -175,7 +317,89 @@ class CaseService:
         if priority:
             query = query.filter(Case.priority == priority)
         
-        return query.offset(skip).limit(limit).all()
+        return keyset_paginate(query, Case, page, joinedload(Case.client))
+
+    @replica_read
+    def search_cases(self, law_firm_id: UUID, query: str, skip: int = 0, limit: int = 20) -> List[dict]:
+        """
+        Wyszukiwanie pełnotekstowe spraw kancelarii po numerze, tytule, opisie
+        i jawnych notatkach. Zwraca dane sprawy z trafnością (rank) i fragmentem
+        tekstu z zaznaczonymi słowami (headline), od najtrafniejszych.
+        Składnia websearch_to_tsquery ("fraza", -wykluczenie, OR) działa tylko
+        w PostgreSQL; inne bazy szukają całego zapytania jako podciągu (LIKE).
+        """
+        if self.db.get_bind().dialect.name != 'postgresql':
+            return self._search_cases_like(law_firm_id, query, skip, limit)
+
+        config = cast(settings.CASE_SEARCH_TS_CONFIG, REGCONFIG)
+        ts_query = func.websearch_to_tsquery(config, query)
+        rank = func.ts_rank(CaseSearch.search_vector, ts_query)
+        page = select(CaseSearch.case_id, rank.label('rank')).where(
+            CaseSearch.law_firm_id == law_firm_id,
+            CaseSearch.search_vector.bool_op('@@')(ts_query)
+        ).order_by(rank.desc(), CaseSearch.case_id).offset(skip).limit(limit).subquery()
+
+        # ts_headline jest kosztowne, więc liczone tylko dla wierszy ze strony wyników
+        notes = select(func.string_agg(CaseNote.content, ' ')).where(
+            CaseNote.case_id == Case.id, CaseNote.is_private.isnot(True)
+        ).scalar_subquery()
+        headline = func.ts_headline(
+            config, func.concat_ws(' ', Case.title, Case.description, notes), ts_query,
+            'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=25, MinWords=8'
+        )
+        rows = self.db.query(Case, page.c.rank, headline.label('headline')).join(
+            page, page.c.case_id == Case.id
+        ).order_by(page.c.rank.desc(), Case.id).all()
+        return [self._search_result(case, rank, headline) for case, rank, headline in rows]
+
+    def _search_cases_like(self, law_firm_id: UUID, query: str, skip: int, limit: int) -> List[dict]:
+        """
+        Zastępstwo search_cases dla baz bez tsvector (SQLite w testach i dev):
+        zapytanie jako podciąg numeru, tytułu, opisu lub jawnej notatki, bez
+        trafności (rank = 0) i operatorów, w kolejności numerów spraw.
+        """
+        query = query.strip()
+        if not query:
+            return []
+
+        pattern = like_pattern(query)
+        cases = self.db.query(Case).filter(
+            Case.law_firm_id == law_firm_id,
+            or_(
+                Case.case_number.like(pattern, escape='\\'),
+                Case.title.like(pattern, escape='\\'),
+                Case.description.like(pattern, escape='\\'),
+                exists().where(
+                    CaseNote.case_id == Case.id, CaseNote.is_private.isnot(True),
+                    CaseNote.content.like(pattern, escape='\\')
+                ),
+            )
+        ).order_by(Case.case_number, Case.id).offset(skip).limit(limit).all()
+
+        notes: dict[UUID, List[str]] = {}
+        if cases:
+            for note in self.db.query(CaseNote.case_id, CaseNote.content).filter(
+                CaseNote.case_id.in_([case.id for case in cases]), CaseNote.is_private.isnot(True)
+            ).order_by(CaseNote.created_at):
+                notes.setdefault(note.case_id, []).append(note.content)
+
+        words = search_words(query)
+        return [
+            self._search_result(case, 0.0, highlight(
+                ' '.join(value for value in (case.title, case.description, *notes.get(case.id, [])) if value), words
+            ))
+            for case in cases
+        ]
+
+    @staticmethod
+    def _search_result(case: Case, rank: float, headline: Optional[str]) -> dict:
+        result = CaseService._case_columns(case)
+        result.update(rank=float(rank), headline=headline or '')
+        return result
+
+    @staticmethod
+    def _case_columns(case: Case) -> dict:
+        return {column.key: getattr(case, column.key) for column in Case.__table__.columns}
 
     def update_case(self, case_id: UUID, case_data: CaseUpdate) -> Optional[Case]:
         """Aktualizuje dane sprawy"""
@@ -202,20 +426,52 @@ class CaseService:
         self.db.commit()
         return True
 
+    @replica_read
     def get_case_statistics(self, law_firm_id: UUID) -> dict:
-        """Pobiera statystyki spraw dla kancelarii"""
-        stats = self.db.query(
-            func.count(Case.id).label('total_cases'),
-            func.count(Case.id).filter(Case.status == 'active').label('active_cases'),
-            func.count(Case.id).filter(Case.status == 'pending').label('pending_cases'),
-            func.count(Case.id).filter(Case.priority == 'urgent').label('urgent_cases')
-        ).filter(Case.law_firm_id == law_firm_id).first()
-        
+        """
+        Pobiera statystyki spraw dla kancelarii.
+
+        Wynik jest przechowywany w pamięci procesu pod wersją spraw kancelarii
+        (law_firm_stats.cases_version, podbijaną przez triggery przy każdym
+        zapisie do cases), więc trafienie kosztuje odczyt jednego wiersza.
+        """
+        version = self.db.query(LawFirmStats.cases_version).filter(
+            LawFirmStats.law_firm_id == law_firm_id
+        ).scalar()
+        return case_statistics_cache.get_or_compute(
+            law_firm_id, version, lambda: self._compute_case_statistics(law_firm_id)
+        )
+
+    def _compute_case_statistics(self, law_firm_id: UUID) -> dict:
+        """Liczy statystyki i zestawienia jednym zapytaniem grupującym"""
+        rows = self.db.query(
+            Case.status, Case.priority, Case.case_type, Case.assigned_lawyer_id,
+            func.count(Case.id).label('count')
+        ).filter(Case.law_firm_id == law_firm_id).group_by(
+            Case.status, Case.priority, Case.case_type, Case.assigned_lawyer_id
+        ).all()
+
+        statuses, priorities, case_types, lawyers = Counter(), Counter(), Counter(), Counter()
+        for row in rows:
+            statuses[row.status] += row.count
+            priorities[row.priority] += row.count
+            case_types[row.case_type] += row.count
+            lawyers[row.assigned_lawyer_id] += row.count
+
+        def breakdown(counter: Counter, field: str) -> List[dict]:
+            return [
+                {field: value, 'count': count}
+                for value, count in sorted(counter.items(), key=lambda item: (-item[1], str(item[0])))
+            ]
+
         return {
-            'total_cases': stats.total_cases or 0,
-            'active_cases': stats.active_cases or 0,
-            'pending_cases': stats.pending_cases or 0,
-            'urgent_cases': stats.urgent_cases or 0
+            'total_cases': sum(statuses.values()),
+            'active_cases': statuses['active'],
+            'pending_cases': statuses['pending'],
+            'urgent_cases': priorities['urgent'],
+            'by_case_type': breakdown(case_types, 'case_type'),
+            'by_priority': breakdown(priorities, 'priority'),
+            'by_assigned_lawyer': breakdown(lawyers, 'assigned_lawyer_id'),
         }
 
 
@@ -236,14 +492,10 @@ class DocumentService:
         return self.db.query(Document).filter(Document.case_id == case_id).all()
 
     def delete_document(self, document_id: UUID) -> bool:
-        """Usuwa dokument"""
-        db_document = self.db.query(Document).filter(Document.id == document_id).first()
-        if not db_document:
-            return False
-        
-        self.db.delete(db_document)
+        """Usuwa dokument jednym poleceniem DELETE; False, gdy go nie ma"""
+        deleted = self.db.query(Document).filter(Document.id == document_id).delete(synchronize_session=False)
         self.db.commit()
-        return True
+        return deleted > 0
 
 
 class CaseNoteService:
@@ -258,19 +510,17 @@ class CaseNoteService:
         self.db.refresh(db_note)
         return db_note
 
-    def get_case_notes(self, case_id: UUID, include_private: bool = True) -> List[CaseNote]:
-        """Pobiera notatki dla sprawy"""
+    def get_case_notes(
+        self, case_id: UUID, include_private: bool = True, page: PageParams = PageParams()
+    ) -> dict:
+        """Pobiera stronę notatek sprawy, od najnowszych"""
         query = self.db.query(CaseNote).filter(CaseNote.case_id == case_id)
         if not include_private:
             query = query.filter(CaseNote.is_private == False)
-        return query.order_by(CaseNote.created_at.desc()).all()
+        return keyset_paginate(query, CaseNote, page)
 
     def delete_case_note(self, note_id: UUID) -> bool:
-        """Usuwa notatkę"""
-        db_note = self.db.query(CaseNote).filter(CaseNote.id == note_id).first()
-        if not db_note:
-            return False
-        
-        self.db.delete(db_note)
+        """Usuwa notatkę jednym poleceniem DELETE; False, gdy jej nie ma"""
+        deleted = self.db.query(CaseNote).filter(CaseNote.id == note_id).delete(synchronize_session=False)
         self.db.commit()
-        return True
\ No newline at end of file
+        return deleted > 0
\ No newline at end of file
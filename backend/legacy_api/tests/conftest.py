@@ -0,0 +1,113 @@
+import os
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.session import Base, get_db, get_sessionmaker
+from app.models.kancelaria import Case, CaseNote, Client, Document, LawFirm
+
+# PostgreSQL ze schematem z migracji Supabase, dla testów zapytań tylko dla PostgreSQL
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL", "")
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """
+    Plik SQLite z pełnym schematem; check_same_thread=False, bo TestClient
+    wykonuje endpointy w innym wątku.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path}/test.db", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def sessions(engine):
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+@pytest.fixture
+def db(sessions):
+    with sessions() as session:
+        yield session
+
+
+@pytest.fixture
+def pg_db():
+    """
+    Sesja na bazie z TEST_DATABASE_URL; commit tworzy tylko savepoint, a na
+    końcu testu wszystko jest wycofywane. Bez PostgreSQL test jest pomijany.
+    """
+    if not TEST_DATABASE_URL.startswith("postgresql"):
+        pytest.skip("Wymaga PostgreSQL z migracjami Supabase (TEST_DATABASE_URL)")
+    engine = create_engine(TEST_DATABASE_URL)
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        with Session(bind=connection, join_transaction_mode="create_savepoint", autoflush=False) as session:
+            yield session
+        transaction.rollback()
+    engine.dispose()
+
+
+@pytest.fixture
+def routers():
+    """
+    Moduły endpointów aplikacji z fixture `client`; plik testów nadpisuje tę fixture.
+    """
+    return []
+
+
+@pytest.fixture
+def client(sessions, routers):
+    """
+    TestClient z routerami z `routers` pod /api/v1/<nazwa modułu>, na sesjach z `sessions`.
+    """
+    app = FastAPI()
+    for module in routers:
+        app.include_router(module.router, prefix=f"/api/v1/{module.__name__.rsplit('.', 1)[-1]}")
+
+    def override_get_db():
+        with sessions() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_sessionmaker] = lambda: sessions
+    return TestClient(app)
+
+
+@pytest.fixture
+def seed(sessions):
+    """
+    Fabryka danych: `seed(cases=0, documents=0, notes=0)` tworzy kancelarię,
+    a dla cases > 0 także klienta z tyloma sprawami ("I C 1/24", "Sprawa 1"...),
+    każdą z `documents` dokumentami i `notes` notatkami. Zwraca identyfikatory.
+    """
+    def make(cases: int = 0, documents: int = 0, notes: int = 0) -> SimpleNamespace:
+        with sessions() as db:
+            law_firm = LawFirm(name="Kancelaria")
+            db.add(law_firm)
+            db.flush()
+            client_id, case_ids = None, []
+            if cases:
+                client = Client(law_firm_id=law_firm.id, first_name="Jan", last_name="Kowalski")
+                db.add(client)
+                db.flush()
+                client_id = client.id
+            for number in range(1, cases + 1):
+                case = Case(law_firm_id=law_firm.id, client_id=client_id, case_number=f"I C {number}/24",
+                            title=f"Sprawa {number}")
+                db.add(case)
+                db.flush()
+                db.add_all([Document(case_id=case.id, name=f"Dokument {i}") for i in range(documents)])
+                db.add_all([CaseNote(case_id=case.id, author_id=uuid4(), content=f"Notatka {i}") for i in range(notes)])
+                case_ids.append(case.id)
+            db.commit()
+            return SimpleNamespace(law_firm_id=law_firm.id, client_id=client_id, case_ids=case_ids)
+
+    return make
@@ -0,0 +1,125 @@
+import asyncio
+import inspect
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1.async_routes import async_router
+from app.api.v1.endpoints import kancelarie, klienci, sprawy
+from app.core.config import settings
+from app.db.async_session import (
+    async_database_url, dispose_async_engines, get_async_db, get_async_engine, get_async_replica_engines,
+    get_async_replica_router, get_async_sessionmaker,
+)
+from app.db.session import Base
+from app.models.kancelaria import LawFirm
+from app.services.kancelaria_service import LawFirmService
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    url = f"sqlite:///{tmp_path}/async.db"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return url
+
+
+@pytest.fixture
+def async_sessions(database_url):
+    engine = create_async_engine(async_database_url(database_url))
+    yield async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def client(async_sessions):
+    test_app = FastAPI()
+    test_app.include_router(async_router(kancelarie.router), prefix="/api/v1/kancelarie")
+    test_app.include_router(async_router(klienci.router), prefix="/api/v1/klienci")
+    test_app.include_router(async_router(sprawy.router), prefix="/api/v1/sprawy")
+
+    async def override_get_async_db():
+        async with async_sessions() as db:
+            yield db
+
+    test_app.dependency_overrides[get_async_db] = override_get_async_db
+    with TestClient(test_app) as test_client:
+        yield test_client
+
+
+def test_async_database_url():
+    """Test doboru sterownika asynchronicznego"""
+    assert async_database_url("postgresql://u:p@db:5432/kancelaria") == "postgresql+asyncpg://u:p@db:5432/kancelaria"
+    assert async_database_url("postgresql+psycopg2://u@db/k") == "postgresql+asyncpg://u@db/k"
+    assert async_database_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+
+
+def test_endpoints_are_coroutines():
+    """Test, że endpointy z bazą nie trafiają do puli wątków"""
+    for route in async_router(sprawy.router).routes:
+        assert inspect.iscoroutinefunction(route.endpoint), route.path
+
+
+def test_case_lifecycle_on_async_session(client):
+    """Test tworzenia i odczytu danych przez endpointy async"""
+    law_firm = client.post("/api/v1/kancelarie/", json={"name": "Kancelaria Async"}).json()
+    klient = client.post("/api/v1/klienci/", json={
+        "first_name": "Anna", "last_name": "Nowak", "law_firm_id": law_firm["id"],
+    }).json()
+    response = client.post("/api/v1/sprawy/", json={
+        "case_number": "I C 1/24", "title": "Sprawa testowa", "law_firm_id": law_firm["id"],
+        "client_id": klient["id"], "priority": "urgent",
+    })
+    assert response.status_code == 201
+    case = response.json()
+
+    details = client.get(f"/api/v1/sprawy/{case['id']}")
+    assert details.status_code == 200
+    assert details.json()["client"]["last_name"] == "Nowak"  # relacja załadowana w run_sync
+    assert details.json()["documents"] == []
+
+    listed = client.get("/api/v1/sprawy/", params={"law_firm_id": law_firm["id"]}).json()
+    assert [item["id"] for item in listed["items"]] == [case["id"]]
+    stats = client.get("/api/v1/sprawy/statistics", params={"law_firm_id": law_firm["id"]}).json()
+    assert stats["total_cases"] == 1 and stats["urgent_cases"] == 1
+
+    assert client.delete(f"/api/v1/sprawy/{case['id']}").status_code == 204
+    assert client.get(f"/api/v1/sprawy/{klient['id']}").status_code == 404
+
+
+def test_async_sessions_read_from_replicas(tmp_path, monkeypatch):
+    """Test kierowania odczytów sesji asynchronicznych do repliki z ustawień"""
+    urls = {}
+    for name, law_firms in (("primary", 2), ("replica", 1)):
+        urls[name] = f"sqlite:///{tmp_path}/{name}.db"
+        engine = create_engine(urls[name])
+        Base.metadata.create_all(engine)
+        with sessionmaker(bind=engine)() as db:
+            db.add_all([LawFirm(name=f"Kancelaria {i}") for i in range(law_firms)])
+            db.commit()
+        engine.dispose()
+    monkeypatch.setattr(settings, "DATABASE_URL", urls["primary"])
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_URLS", [urls["replica"]])
+    cached = (get_async_engine, get_async_replica_engines, get_async_replica_router, get_async_sessionmaker)
+    for function in cached:
+        function.cache_clear()
+
+    async def law_firm_counts():
+        try:
+            async with get_async_sessionmaker()() as db:
+                listed = await db.run_sync(lambda session: LawFirmService(session).get_law_firms())
+                total = await db.scalar(select(func.count(LawFirm.id)))  # poza @replica_read
+            return len(listed["items"]), total
+        finally:
+            await dispose_async_engines()
+
+    try:
+        assert asyncio.run(law_firm_counts()) == (1, 2)
+    finally:
+        for function in cached:
+            function.cache_clear()
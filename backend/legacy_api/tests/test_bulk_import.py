@@ -0,0 +1,121 @@
+import io
+import json
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+
+from app.api.v1.endpoints import kancelarie
+from app.api.v1.schemas.kancelaria import ImportFormat
+from app.core.config import settings
+from app.models.kancelaria import Case, Client, LawFirm, LawFirmStats
+from app.services.import_service import BulkImportService, read_rows
+
+CLIENTS_CSV = (
+    "first_name,last_name,email,phone,pesel\n"
+    "Łukasz,Żółć,lukasz@example.com,+48 600 100 200,\n"
+    "Anna,,anna@example.com,,\n"
+    "Jan,Kowalski,niepoprawny,,\n"
+    "Ewa,Nowak,,,90010112345\n"
+)
+
+
+@pytest.fixture
+def law_firm_id(seed):
+    return seed().law_firm_id
+
+
+@pytest.fixture
+def routers():
+    return [kancelarie]
+
+
+def test_read_rows_formats():
+    """Test odczytu wierszy CSV i NDJSON z numerami linii"""
+    rows = list(read_rows(io.BytesIO("\ufeffa,b\n1,\n2,3,4\n".encode()), ImportFormat.csv))
+    assert rows[0] == (2, {"a": "1", "b": None}, None)
+    assert rows[1][0] == 3 and rows[1][2]
+
+    ndjson = b'{"a": 1}\n\n[1]\n{zepsuty\n'
+    rows = list(read_rows(io.BytesIO(ndjson), ImportFormat.ndjson))
+    assert rows[0] == (1, {"a": 1}, None)
+    assert [(line, error is not None) for line, _, error in rows[1:]] == [(3, True), (4, True)]
+
+
+def test_import_clients_reports_invalid_rows(sessions, law_firm_id):
+    """Test importu klientów z błędnymi wierszami pominiętymi w raporcie"""
+    with sessions() as db:
+        report = BulkImportService(db).import_clients(law_firm_id, io.BytesIO(CLIENTS_CSV.encode()), ImportFormat.csv)
+
+    assert (report["rows"], report["inserted"], report["failed"]) == (4, 2, 2)
+    assert [(error["line"], error["field"]) for error in report["errors"]] == [(3, "last_name"), (4, "email")]
+    assert report["rows_per_second"] > 0
+
+    with sessions() as db:
+        clients = {client.last_name: client for client in db.query(Client)}
+        assert set(clients) == {"Żółć", "Nowak"}
+        assert clients["Żółć"].search_text == "lukasz zolc lukasz@example.com 48600100200"
+        assert all(client.law_firm_id == law_firm_id for client in clients.values())
+        assert db.get(LawFirmStats, law_firm_id).clients_count == 2  # triggery jak przy pojedynczym zapisie
+
+
+def test_import_inserts_in_batches(sessions, law_firm_id, monkeypatch):
+    """Test zapisu partiami: jeden INSERT i commit na partię"""
+    monkeypatch.setattr(settings, "BULK_IMPORT_BATCH_SIZE", 4)
+    lines = "".join(json.dumps({"first_name": "Jan", "last_name": f"Klient {i}"}) + "\n" for i in range(10))
+
+    with sessions() as db:
+        statements = []
+        event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+        report = BulkImportService(db).import_clients(law_firm_id, io.BytesIO(lines.encode()), ImportFormat.ndjson)
+
+    assert report["inserted"] == 10 and report["failed"] == 0
+    assert len([statement for statement in statements if statement.startswith("INSERT INTO clients")]) == 3
+    with sessions() as db:
+        assert db.query(Client).count() == 10
+
+
+def test_import_cases_checks_client_law_firm(sessions, law_firm_id):
+    """Test odrzucenia spraw klientów spoza kancelarii"""
+    with sessions() as db:
+        other = LawFirm(name="Inna kancelaria")
+        db.add(other)
+        db.flush()
+        own_client = Client(law_firm_id=law_firm_id, first_name="Jan", last_name="Kowalski")
+        foreign_client = Client(law_firm_id=other.id, first_name="Anna", last_name="Nowak")
+        db.add_all([own_client, foreign_client])
+        db.commit()
+        rows = [
+            {"case_number": "I C 1/24", "title": "Sprawa", "client_id": str(own_client.id), "priority": "urgent"},
+            {"case_number": "I C 2/24", "title": "Obca", "client_id": str(foreign_client.id)},
+            {"case_number": "I C 3/24", "title": "Brak klienta", "client_id": str(uuid4())},
+            {"case_number": "I C 4/24", "title": "Zły status", "client_id": str(own_client.id), "status": "x"},
+        ]
+        source = io.BytesIO("".join(json.dumps(row) + "\n" for row in rows).encode())
+        report = BulkImportService(db).import_cases(law_firm_id, source, ImportFormat.ndjson)
+
+    assert (report["inserted"], report["failed"]) == (1, 3)
+    assert sorted((error["line"], error["field"]) for error in report["errors"]) == [
+        (2, "client_id"), (3, "client_id"), (4, "status"),
+    ]
+    with sessions() as db:
+        assert [case.case_number for case in db.query(Case)] == ["I C 1/24"]
+        stats = db.get(LawFirmStats, law_firm_id)
+        assert stats.cases_count == 1 and stats.active_cases_count == 0
+
+
+def test_import_endpoint(client, law_firm_id):
+    """Test endpointu importu z formatem wg Content-Type"""
+    url = f"/api/v1/kancelarie/{law_firm_id}/import/clients"
+    response = client.post(url, content=CLIENTS_CSV.encode(), headers={"Content-Type": "text/csv; charset=utf-8"})
+    assert response.status_code == 200
+    assert response.json()["format"] == "csv" and response.json()["inserted"] == 2
+
+    ndjson = json.dumps({"first_name": "Ewa", "last_name": "Lis"}) + "\n"
+    response = client.post(url, content=ndjson, params={"format": "ndjson"}, headers={"Content-Type": "text/plain"})
+    assert response.json()["inserted"] == 1
+
+    assert client.post(url, content=ndjson, headers={"Content-Type": "text/plain"}).status_code == 415
+    assert client.post(url, content="a\n\xff\n".encode("latin-1"), headers={"Content-Type": "text/csv"}).status_code == 400
+    assert client.post(f"/api/v1/kancelarie/{uuid4()}/import/cases", content=ndjson,
+                       headers={"Content-Type": "application/x-ndjson"}).status_code == 404
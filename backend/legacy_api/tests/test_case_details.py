@@ -0,0 +1,80 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+
+from app.api.v1.endpoints import sprawy
+from app.services.kancelaria_service import CaseService
+
+
+@pytest.fixture
+def case_id(seed):
+    return seed(cases=1, documents=20, notes=30).case_ids[0]
+
+
+@pytest.fixture
+def routers():
+    return [sprawy]
+
+
+def capture_queries(sessions, load):
+    """Wynik `load(db)` i wykonane przy tym zapytania SQL"""
+    queries = []
+    with sessions() as db:
+        engine = db.get_bind()
+        on_execute = lambda *args: queries.append(args[2])  # noqa: E731
+        event.listen(engine, "before_cursor_execute", on_execute)
+        result = load(db)
+        event.remove(engine, "before_cursor_execute", on_execute)
+    return result, queries
+
+
+def test_get_case_loads_collections_without_joining_them(sessions, case_id):
+    """Test, że dokumenty i notatki nie są łączone JOIN-em w jednym zapytaniu"""
+    case, queries = capture_queries(sessions, lambda db: CaseService(db).get_case(case_id))
+
+    assert len(case.documents) == 20 and len(case.case_notes) == 30
+    assert len(queries) == 3  # sprawa z klientem i prawnikiem, dokumenty, notatki
+    assert not any("documents" in query and "case_notes" in query for query in queries)
+
+
+def test_case_details_limit_children(sessions, case_id):
+    """Test limitu osadzonych dokumentów i notatek"""
+    details, queries = capture_queries(sessions, lambda db: CaseService(db).get_case_details(case_id, children_limit=5))
+
+    assert len(queries) == 3
+    assert len(details["documents"]) == 5 and details["documents_has_more"] is True
+    assert len(details["case_notes"]) == 5 and details["case_notes_has_more"] is True
+    assert details["client"].last_name == "Kowalski"
+
+    details = CaseService(sessions()).get_case_details(case_id, children_limit=30)
+    assert len(details["case_notes"]) == 30 and details["case_notes_has_more"] is False
+
+
+def test_case_details_load_only_included_relations(sessions, case_id):
+    """Test, że relacje spoza include nie są pobierane"""
+    details, queries = capture_queries(sessions, lambda db: CaseService(db).get_case_details(case_id, {"documents"}))
+
+    assert len(queries) == 2
+    assert "clients" not in queries[0] and "case_notes" not in " ".join(queries)
+    assert set(details) >= {"documents", "documents_has_more"}
+    assert "client" not in details and "case_notes" not in details
+
+
+def test_details_endpoint_include(client, case_id):
+    """Test parametru include w szczegółach sprawy"""
+    full = client.get(f"/api/v1/sprawy/{case_id}", params={"children_limit": 2}).json()
+    assert full["client"]["last_name"] == "Kowalski" and full["assigned_lawyer"] is None
+    assert len(full["documents"]) == 2 and full["documents_has_more"] is True
+    assert len(full["case_notes"]) == 2 and full["case_notes_has_more"] is True
+
+    sparse = client.get(f"/api/v1/sprawy/{case_id}", params={"include": "client"}).json()
+    assert sparse["client"]["first_name"] == "Jan" and sparse["title"] == "Sprawa 1"
+    assert not {"assigned_lawyer", "documents", "case_notes", "documents_has_more"} & set(sparse)
+
+    bare = client.get(f"/api/v1/sprawy/{case_id}", params={"include": ""}).json()
+    assert bare["case_number"] == "I C 1/24" and "client" not in bare
+
+    response = client.get(f"/api/v1/sprawy/{case_id}", params={"include": "client,invoices"})
+    assert response.status_code == 400
+    assert client.get(f"/api/v1/sprawy/{uuid4()}", params={"include": "client"}).status_code == 404
@@ -0,0 +1,149 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1.endpoints import sprawy
+from app.api.v1.schemas.kancelaria import CaseCreate, CaseNoteCreate, ClientCreate, LawFirmCreate
+from app.core.search import highlight
+from app.models.kancelaria import Profile
+from app.services.kancelaria_service import CaseNoteService, CaseService, ClientService, LawFirmService
+
+
+@pytest.fixture
+def routers():
+    return [sprawy]
+
+
+def add_cases(db):
+    law_firm = LawFirmService(db).create_law_firm(LawFirmCreate(name="Kancelaria"))
+    client = ClientService(db).create_client(
+        ClientCreate(first_name="Jan", last_name="Kowalski", law_firm_id=law_firm.id)
+    )
+    cases = CaseService(db)
+    for number, (title, description) in enumerate([
+        ("Rozwód z orzeczeniem o winie", "Podział majątku wspólnego i alimenty"),
+        ("Spór o zapłatę", "Umowa dostawy, faktury nieopłacone od 2023 roku"),
+        ("Zasiedzenie nieruchomości", None),
+    ]):
+        cases.create_case(CaseCreate(
+            case_number=f"I C {number + 100}/24", title=title, description=description,
+            law_firm_id=law_firm.id, client_id=client.id,
+        ))
+    return law_firm
+
+
+@pytest.fixture
+def law_firm(db):
+    return add_cases(db)
+
+
+def case_titles(results):
+    return [result["title"] for result in results]
+
+
+def test_search_without_postgresql_matches_substring(db, law_firm):
+    """Test wyszukiwania podciągu bez PostgreSQL: bez operatorów i bez trafności"""
+    service = CaseService(db)
+    assert case_titles(service.search_cases(law_firm.id, "rozwód")) == ["Rozwód z orzeczeniem o winie"]
+    assert case_titles(service.search_cases(law_firm.id, "zapłat")) == ["Spór o zapłatę"]
+    assert case_titles(service.search_cases(law_firm.id, "I C 10")) == [
+        "Rozwód z orzeczeniem o winie", "Spór o zapłatę", "Zasiedzenie nieruchomości",
+    ]
+    assert case_titles(service.search_cases(law_firm.id, "I C 10", skip=1, limit=1)) == ["Spór o zapłatę"]
+    assert service.search_cases(law_firm.id, "rozwód zapłata") == []
+    assert service.search_cases(law_firm.id, "-umowa") == []
+    assert service.search_cases(law_firm.id, "100%") == []
+
+    results = service.search_cases(law_firm.id, "majątku")
+    assert results[0]["headline"] == "Rozwód z orzeczeniem o winie Podział <mark>majątku</mark> wspólnego i alimenty"
+    assert results[0]["rank"] == 0
+
+
+def test_search_includes_public_notes_only(db, law_firm):
+    """Test wyszukiwania w jawnych notatkach"""
+    case = CaseService(db).search_cases(law_firm.id, "zasiedzenie")[0]
+    author = Profile(user_id=uuid4(), first_name="Anna", last_name="Nowak", role="lawyer")
+    db.add(author)
+    db.commit()
+
+    notes = CaseNoteService(db)
+    notes.create_case_note(CaseNoteCreate(case_id=case["id"], author_id=author.id, content="Opinia geodety"))
+    notes.create_case_note(CaseNoteCreate(
+        case_id=case["id"], author_id=author.id, content="Strategia ugody", is_private=True,
+    ))
+    results = CaseService(db).search_cases(law_firm.id, "geodety")
+    assert case_titles(results) == ["Zasiedzenie nieruchomości"]
+    assert "<mark>geodety</mark>" in results[0]["headline"]
+    assert CaseService(db).search_cases(law_firm.id, "ugody") == []
+
+
+def test_search_endpoint(client, law_firm):
+    """Test endpointu /sprawy/search"""
+    response = client.get("/api/v1/sprawy/search", params={"law_firm_id": str(law_firm.id), "q": "alimenty"})
+    assert response.status_code == 200
+    assert case_titles(response.json()) == ["Rozwód z orzeczeniem o winie"]
+    assert client.get("/api/v1/sprawy/search", params={"law_firm_id": str(law_firm.id)}).status_code == 422
+
+
+def test_postgresql_query_uses_case_search_index(db):
+    """Test zapytania PostgreSQL: dopasowanie @@ na case_search i ts_headline tylko dla strony wyników"""
+    captured = {}
+
+    class Query:
+        def __init__(self, *entities):
+            captured["entities"] = entities
+
+        def join(self, *args):
+            captured["join"] = args
+            return self
+
+        def order_by(self, *args):
+            return self
+
+        def all(self):
+            return []
+
+    service = CaseService(db)
+    service.db = type("PostgresSession", (), {
+        "get_bind": lambda self: type("Bind", (), {"dialect": postgresql.dialect()})(),
+        "query": lambda self, *entities: Query(*entities),
+        "info": {},
+    })()
+    assert service.search_cases(uuid4(), "umowa", limit=5) == []
+
+    page = captured["join"][0]
+    sql = str(page.compile(dialect=postgresql.dialect()))
+    assert "case_search.search_vector @@ websearch_to_tsquery(CAST(" in sql
+    assert "ts_headline" not in sql
+    assert "ts_headline" in str(captured["entities"][2].compile(dialect=postgresql.dialect()))
+
+
+def test_postgresql_full_text_search(pg_db):
+    """Test case_search w PostgreSQL: unaccent, fraza, wykluczenie, OR i ts_headline"""
+    law_firm = add_cases(pg_db)
+    service = CaseService(pg_db)
+
+    def titles(query):
+        return case_titles(service.search_cases(law_firm.id, query))
+
+    assert titles("rozwod") == ["Rozwód z orzeczeniem o winie"]
+    assert titles("\"podział majątku\"") == ["Rozwód z orzeczeniem o winie"]
+    assert titles("\"majątku podział\"") == []
+    assert titles("umowa -faktury") == []
+    assert titles("umowa -alimenty") == ["Spór o zapłatę"]
+    assert sorted(titles("rozwód OR zasiedzenie")) == ["Rozwód z orzeczeniem o winie", "Zasiedzenie nieruchomości"]
+
+    results = service.search_cases(law_firm.id, "majątku")
+    assert "<mark>majątku</mark>" in results[0]["headline"]
+    assert 0 < results[0]["rank"] < 1
+
+
+def test_highlight_fragment():
+    """Test zaznaczania słów i przycinania fragmentu"""
+    text = "Wstęp " * 20 + "Umowa najmu lokalu"
+    assert highlight(text, ["umow", "lokal"], context=20) == (
+        "…p Wstęp Wstęp Wstęp <mark>Umowa</mark> najmu <mark>lokalu</mark>"
+    )
+    assert highlight(text, ["umow", "lokal"], context=10).endswith("<mark>Umowa</mark> najmu lok…")
+    assert highlight("Bez trafień", ["xyz"]) == "Bez trafień"
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.v1.schemas.kancelaria import CaseCreate, CaseUpdate, ClientCreate, LawFirmCreate
+from app.core.cache import SingleFlight, VersionedCache
+from app.db.async_session import async_database_url
+from app.services.kancelaria_service import CaseService, ClientService, LawFirmService
+
+
+@pytest.fixture
+def law_firm(db):
+    law_firm = LawFirmService(db).create_law_firm(LawFirmCreate(name="Kancelaria"))
+    client = ClientService(db).create_client(
+        ClientCreate(first_name="Jan", last_name="Kowalski", law_firm_id=law_firm.id)
+    )
+    cases = CaseService(db)
+    for number, (case_type, priority, status) in enumerate([
+        ("cywilna", "urgent", "active"), ("cywilna", "medium", "pending"), ("karna", "urgent", "active"),
+    ]):
+        cases.create_case(CaseCreate(
+            case_number=f"I C {number}/24", title=f"Sprawa {number}", law_firm_id=law_firm.id,
+            client_id=client.id, case_type=case_type, priority=priority, status=status,
+        ))
+    return law_firm
+
+
+def count_statements(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def test_statistics_with_breakdowns(db, law_firm):
+    """Test statystyk i zestawień z jednego zapytania grupującego"""
+    stats = CaseService(db).get_case_statistics(law_firm.id)
+    assert stats["total_cases"] == 3
+    assert (stats["active_cases"], stats["pending_cases"], stats["urgent_cases"]) == (2, 1, 2)
+    assert stats["by_case_type"] == [{"case_type": "cywilna", "count": 2}, {"case_type": "karna", "count": 1}]
+    assert stats["by_priority"] == [{"priority": "urgent", "count": 2}, {"priority": "medium", "count": 1}]
+    assert stats["by_assigned_lawyer"] == [{"assigned_lawyer_id": None, "count": 3}]
+
+
+def test_statistics_cached_until_cases_change(db, engine, law_firm):
+    """Test trafienia w pamięć podręczną i unieważnienia po zapisie sprawy"""
+    service = CaseService(db)
+    service.get_case_statistics(law_firm.id)
+
+    statements = count_statements(engine)
+    assert service.get_case_statistics(law_firm.id)["total_cases"] == 3
+    assert len(statements) == 1  # tylko odczyt wersji
+
+    case = service.get_cases(law_firm_id=law_firm.id, status="pending")["items"][0]
+    service.update_case(case.id, CaseUpdate(status="active"))
+    assert service.get_case_statistics(law_firm.id)["active_cases"] == 3
+
+    service.delete_case(case.id)  # archiwizacja
+    stats = service.get_case_statistics(law_firm.id)
+    assert (stats["total_cases"], stats["active_cases"]) == (3, 2)
+
+
+def test_concurrent_misses_computed_once():
+    """Test single-flight dla równoległych wątków"""
+    cache = VersionedCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"total_cases": 1}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("firma", 1, compute)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1 and results == [{"total_cases": 1}] * 8
+    assert cache.get_or_compute("firma", 2, compute) == {"total_cases": 1} and len(calls) == 2
+
+
+def test_single_flight_propagates_errors():
+    """Test przekazania wyjątku i zwolnienia klucza po błędzie"""
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("błąd")
+
+    with pytest.raises(ValueError):
+        flight.do("klucz", fail)
+    assert flight.do("klucz", lambda: 42) == 42
+
+
+def test_async_sessions_share_one_computation(engine, law_firm, monkeypatch):
+    """Test single-flight dla endpointów async (run_sync na jednej pętli zdarzeń)"""
+    async_engine = create_async_engine(async_database_url(str(engine.url)))
+    sessions = async_sessionmaker(async_engine, expire_on_commit=False)
+    computed = []
+    original = CaseService._compute_case_statistics
+
+    def slow_compute(self, law_firm_id):
+        computed.append(law_firm_id)
+        self.db.execute(text("SELECT 1"))  # zapytanie oddaje sterowanie pętli zdarzeń
+        return original(self, law_firm_id)
+
+    async def statistics():
+        async with sessions() as db:
+            return await db.run_sync(lambda session: CaseService(session).get_case_statistics(law_firm.id))
+
+    async def main():
+        try:
+            return await asyncio.wait_for(asyncio.gather(*(statistics() for _ in range(5))), timeout=10)
+        finally:
+            await async_engine.dispose()
+
+    monkeypatch.setattr(CaseService, "_compute_case_statistics", slow_compute)
+    results = asyncio.run(main())
+
+    assert len(computed) == 1
+    assert all(result["total_cases"] == 3 for result in results)
+
@@ -0,0 +1,81 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+
+from app.api.v1.endpoints import sprawy
+from app.models.kancelaria import CaseNote, Document
+
+
+@pytest.fixture
+def case_id(seed):
+    return str(seed(cases=1, documents=5, notes=5).case_ids[0])
+
+
+@pytest.fixture
+def routers():
+    return [sprawy]
+
+
+@pytest.fixture
+def statements(engine):
+    statements = []
+    on_execute = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", on_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", on_execute)
+
+
+def selects_from(statements, table):
+    return [statement for statement in statements if statement.startswith("SELECT") and f"FROM {table}" in statement]
+
+
+def test_add_note_checks_case_with_exists(client, case_id, statements):
+    """Test, że dodanie notatki sprawdza sprawę jednym zapytaniem EXISTS"""
+    response = client.post(f"/api/v1/sprawy/{case_id}/notes", json={
+        "case_id": case_id, "author_id": str(uuid4()), "content": "Nowa notatka",
+    })
+    assert response.status_code == 201
+
+    case_queries = selects_from(statements, "cases")
+    assert len(case_queries) == 1 and "EXISTS" in case_queries[0]
+    assert not selects_from(statements, "documents")
+    assert len([statement for statement in statements if statement.startswith("INSERT")]) == 1
+
+
+def test_add_document_checks_case_with_exists(client, case_id, statements):
+    """Test, że dodanie dokumentu nie ładuje sprawy z relacjami"""
+    response = client.post(f"/api/v1/sprawy/{case_id}/documents", json={"case_id": case_id, "name": "Pozew"})
+    assert response.status_code == 201
+
+    case_queries = selects_from(statements, "cases")
+    assert len(case_queries) == 1 and "EXISTS" in case_queries[0]
+    assert not selects_from(statements, "case_notes") and not selects_from(statements, "clients")
+
+
+def test_add_to_missing_case(client, statements):
+    """Test odpowiedzi 404 bez zapisu dla nieistniejącej sprawy"""
+    missing = str(uuid4())
+    response = client.post(f"/api/v1/sprawy/{missing}/notes", json={
+        "case_id": missing, "author_id": str(uuid4()), "content": "Notatka",
+    })
+    assert response.status_code == 404
+    assert client.post(f"/api/v1/sprawy/{missing}/documents", json={
+        "case_id": missing, "name": "Pozew",
+    }).status_code == 404
+    assert not [statement for statement in statements if statement.startswith("INSERT")]
+
+
+def test_delete_children_with_single_statement(client, case_id, sessions, statements):
+    """Test usuwania dokumentu i notatki jednym poleceniem DELETE"""
+    with sessions() as db:
+        document_id = db.query(Document.id).first()[0]
+        note_id = db.query(CaseNote.id).first()[0]
+    statements.clear()
+
+    assert client.delete(f"/api/v1/sprawy/documents/{document_id}").status_code == 204
+    assert client.delete(f"/api/v1/sprawy/notes/{note_id}").status_code == 204
+    assert [statement.split()[0] for statement in statements] == ["DELETE", "DELETE"]
+
+    assert client.delete(f"/api/v1/sprawy/documents/{document_id}").status_code == 404
+    assert client.delete(f"/api/v1/sprawy/notes/{note_id}").status_code == 404
@@ -0,0 +1,74 @@
+import pytest
+
+from app.api.v1.schemas.kancelaria import ClientCreate, ClientUpdate, LawFirmCreate
+from app.core.search import client_search_text, normalize_search_term
+from app.db.pagination import PageParams
+from app.services.kancelaria_service import ClientService, LawFirmService
+
+
+@pytest.fixture
+def law_firm(db):
+    return LawFirmService(db).create_law_firm(LawFirmCreate(name="Kancelaria"))
+
+
+def add_client(db, law_firm, first_name, last_name, **fields):
+    return ClientService(db).create_client(
+        ClientCreate(first_name=first_name, last_name=last_name, law_firm_id=law_firm.id, **fields)
+    )
+
+
+def found(service, law_firm, term, **page):
+    return [client.id for client in service.search_clients(law_firm.id, term, PageParams(**page))["items"]]
+
+
+def test_search_text_normalization():
+    """Test postaci search_text bez diakrytyków i z cyframi telefonu"""
+    assert client_search_text("Łucja", "Źdźbło", "Lucja@Kancelaria.PL", "+48 600-100-200", "90010112345") == (
+        "lucja zdzblo lucja@kancelaria.pl 48600100200 90010112345"
+    )
+    assert normalize_search_term("  ŻÓŁW ") == "zolw"
+    assert normalize_search_term("600 100 200") == "600100200"
+
+
+def test_search_by_name_phone_and_pesel(db, law_firm):
+    """Test wyszukiwania po nazwisku bez polskich znaków, telefonie i PESEL"""
+    zolc = add_client(db, law_firm, "Łukasz", "Żółć", phone="+48 600 100 200")
+    nowak = add_client(db, law_firm, "Anna", "Nowak", pesel="85022812345", email="anna@nowak.pl")
+    add_client(db, law_firm, "Jan", "Kowalski")
+    other_firm = LawFirmService(db).create_law_firm(LawFirmCreate(name="Inna"))
+    add_client(db, other_firm, "Łukasz", "Żółć")
+
+    service = ClientService(db)
+    assert found(service, law_firm, "zolc") == [zolc.id]
+    assert found(service, law_firm, "ŁUKASZ ŻÓŁĆ") == [zolc.id]
+    assert found(service, law_firm, "600-100") == [zolc.id]
+    assert found(service, law_firm, "850228") == [nowak.id]
+    assert found(service, law_firm, "@nowak") == [nowak.id]
+    assert found(service, law_firm, "100%") == []
+
+
+def test_search_pages_and_sees_updates(db, law_firm):
+    """Test paginacji wyników i wyszukiwania po zmianie klienta"""
+    service = ClientService(db)
+    long_name = add_client(db, law_firm, "Jan", "Kowalczykowski-Nowakowski")
+    short_name = add_client(db, law_firm, "Jan", "Kowal")
+    assert found(service, law_firm, "kowal") == [short_name.id, long_name.id]
+    assert found(service, law_firm, "kowal", cursor={"offset": 1}, limit=1) == [long_name.id]
+
+    service.update_client(short_name.id, ClientUpdate(last_name="Zieliński"))
+    assert found(service, law_firm, "kowal") == [long_name.id]
+    assert found(service, law_firm, "zielinski") == [short_name.id]
+
+
+def test_postgresql_trigram_search(pg_db):
+    """Test zapytania pg_trgm: podciąg search_text i kolejność wg word_similarity"""
+    law_firm = LawFirmService(pg_db).create_law_firm(LawFirmCreate(name="Kancelaria"))
+    long_name = add_client(pg_db, law_firm, "Jan", "Abakowalski")
+    short_name = add_client(pg_db, law_firm, "Jan", "Kowal", phone="+48 600 100 200")
+    add_client(pg_db, law_firm, "Anna", "Nowak")
+
+    service = ClientService(pg_db)
+    assert found(service, law_firm, "kowal") == [short_name.id, long_name.id]  # alfabetycznie odwrotnie
+    assert found(service, law_firm, "KOWAL 600") == []
+    assert found(service, law_firm, "600-100") == [short_name.id]
+    assert found(service, law_firm, "kowal", cursor={"offset": 1}, limit=1) == [long_name.id]
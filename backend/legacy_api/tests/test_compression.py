@@ -0,0 +1,133 @@
+import asyncio
+import gzip
+import json
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, brotli, negotiate_encoding
+
+LARGE = {"items": [{"id": i, "status": "aktywna"} for i in range(500)]}
+
+test_app = FastAPI()
+test_app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+
+@test_app.get("/large")
+async def large():
+    return LARGE
+
+
+@test_app.get("/small")
+async def small():
+    return {"status": "ok"}
+
+
+@test_app.get("/pdf")
+async def pdf():
+    return Response(b"%PDF-1.4" + b"0" * 5000, media_type="application/pdf")
+
+
+client = TestClient(test_app)
+
+
+def test_gzip_when_requested():
+    """Test kompresji gzip"""
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert json.loads(response.content) == LARGE  # httpx dekoduje gzip
+    assert int(response.headers["content-length"]) < len(json.dumps(LARGE))
+
+
+@pytest.mark.skipif(brotli is None, reason="brotli nie jest zainstalowany")
+def test_brotli_preferred_when_accepted():
+    """Test wyboru brotli, gdy klient go akceptuje"""
+    response = client.get("/large", headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.headers["content-encoding"] == "br"
+
+
+def test_small_responses_are_not_compressed():
+    """Test progu minimalnego rozmiaru"""
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+
+
+def test_pdf_passes_through():
+    """Test pomijania treści już skompresowanych"""
+    response = client.get("/pdf", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.content.startswith(b"%PDF")
+
+
+def _stream_messages(flush_size):
+    """Wiadomości ASGI wysłane przez middleware dla odpowiedzi /stream"""
+    scope = {
+        "type": "http", "method": "GET", "path": "/stream", "raw_path": b"/stream", "root_path": "",
+        "scheme": "http", "query_string": b"", "http_version": "1.1",
+        "headers": [(b"accept-encoding", b"gzip")], "server": ("test", 80), "client": ("test", 1),
+    }
+    messages = []
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if requests:
+            return requests.pop()
+        await asyncio.Event().wait()  # klient nie rozłącza się
+
+    async def send(message):
+        messages.append(message)
+
+    stream_app = FastAPI()
+    stream_app.add_middleware(CompressionMiddleware, minimum_size=1024, flush_size=flush_size)
+
+    @stream_app.get("/stream")
+    async def stream():
+        async def rows():
+            for i in range(200):
+                yield json.dumps({"id": i}) + "\n"
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+    asyncio.run(stream_app(scope, receive, send))
+    return messages
+
+
+def test_streamed_responses_are_compressed_incrementally():
+    """Test kompresji odpowiedzi strumieniowej z flush co flush_size bajtów"""
+    messages = _stream_messages(flush_size=256)
+
+    headers = dict(messages[0]["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    chunks = [m["body"] for m in messages[1:]]
+    assert 1 < len(chunks) < 20  # 200 fragmentów po ~11 bajtów
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    first = decoder.decompress(chunks[0] + chunks[1])  # nagłówek gzip i pierwszy flush, przed końcem strumienia
+    assert len(first) >= 256 and first.endswith(b"\n")
+    body = gzip.decompress(b"".join(chunks)).decode()
+    assert body.splitlines()[-1] == '{"id": 199}'
+
+
+def test_short_streams_are_flushed_once():
+    """Test braku flush dla strumienia krótszego niż flush_size"""
+    chunks = [m["body"] for m in _stream_messages(flush_size=64 * 1024)[1:]]
+
+    assert len(chunks) == 2  # nagłówek gzip i cała treść przy zakończeniu
+    assert len(gzip.decompress(b"".join(chunks)).splitlines()) == 200
+
+
+def test_negotiate_encoding():
+    """Test negocjacji kodowania z wagami q"""
+    assert negotiate_encoding("gzip, br", ("br", "gzip")) == "br"
+    assert negotiate_encoding("br;q=0, gzip", ("br", "gzip")) == "gzip"
+    assert negotiate_encoding("gzip;q=0.5, br;q=0.8", ("br", "gzip")) == "br"
+    assert negotiate_encoding("*", ("br", "gzip")) == "br"
+    assert negotiate_encoding("identity", ("br", "gzip")) is None
+    assert negotiate_encoding("", ("br", "gzip")) is None
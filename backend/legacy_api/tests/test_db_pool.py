@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import DB_POOL_PROFILES, Settings
+from app.db.async_session import prewarm_async_pool
+from app.db.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, pool_status, prewarm_pool
+from app.main import app
+
+
+def test_pool_options_follow_environment():
+    """Test domyślnych parametrów puli dla środowiska i jawnych nadpisań"""
+    production = Settings(DATABASE_URL="postgresql://x", SECRET_KEY="x", ENVIRONMENT="production")
+    assert production.db_pool_option("pool_size") == 10
+    assert production.db_pool_option("pool_prewarm") == 5
+
+    overridden = Settings(
+        DATABASE_URL="postgresql://x", SECRET_KEY="x", ENVIRONMENT="production", DB_POOL_SIZE=3, DB_POOL_PREWARM=7
+    )
+    assert overridden.db_pool_option("pool_size") == 3
+    assert overridden.db_pool_option("pool_prewarm") == 7
+
+
+def test_every_pool_option_can_be_overridden():
+    """Test, że każdy parametr profilu ma odpowiadające mu ustawienie DB_*"""
+    for profile in DB_POOL_PROFILES.values():
+        for name in profile:
+            assert f"DB_{name.upper()}" in Settings.model_fields, name
+
+
+def test_echo_does_not_follow_debug():
+    """Test, że DEBUG nie włącza logowania każdego zapytania"""
+    settings = Settings(DATABASE_URL="sqlite://", SECRET_KEY="x", DEBUG=True)
+    assert settings.DB_ECHO is False
+
+
+def test_pool_telemetry(tmp_path):
+    """Test liczników puli: prewarm, overflow i timeout"""
+    engine = create_engine(f"sqlite:///{tmp_path}/pool.db", poolclass=InstrumentedQueuePool,
+                           pool_size=1, max_overflow=1, pool_timeout=0.1)
+    assert prewarm_pool(engine, 1) == 1
+
+    held = [engine.connect(), engine.connect()]
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+
+    status = pool_status(engine)
+    assert status["checked_out"] == 2
+    assert status["overflow_connections"] == 1
+    assert status["timeouts"] == 1
+    for connection in held:
+        connection.close()
+    engine.dispose()
+
+
+def test_async_pool_telemetry(tmp_path):
+    """Test liczników puli silnika asynchronicznego (DB_ASYNC_ENDPOINTS)"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/pool.db", poolclass=InstrumentedAsyncQueuePool,
+                                 pool_size=1, max_overflow=0, pool_timeout=0.1)
+
+    async def exercise():
+        assert await prewarm_async_pool(engine, 1) == 1
+        held = await engine.connect()
+        with pytest.raises(exc.TimeoutError):
+            await engine.connect()
+        await held.close()
+        await engine.dispose()
+
+    asyncio.run(exercise())
+    status = pool_status(engine.sync_engine)
+    assert status["checkouts"] == 3
+    assert status["timeouts"] == 1
+
+
+def test_health_db_endpoint():
+    """Test endpointu /health/db"""
+    response = TestClient(app).get("/health/db")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "healthy"
+    assert "pool_class" in data["pool"]
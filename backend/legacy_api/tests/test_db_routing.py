@@ -0,0 +1,118 @@
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine, exc, func, select
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from app.db.routing import ReplicaRouter, RoutingSession, replica_read
+
+Base = declarative_base()
+
+
+class Sprawa(Base):
+    __tablename__ = "sprawy_routing"
+
+    id = Column(Integer, primary_key=True)
+    title = Column(String(100))
+
+
+class SprawaService:
+    def __init__(self, db):
+        self.db = db
+
+    @replica_read
+    def count(self) -> int:
+        return self.db.scalar(select(func.count(Sprawa.id)))
+
+
+@pytest.fixture
+def routed(tmp_path):
+    """Dwa pliki SQLite: serwer główny i replika, która nie nadrobiła zapisów"""
+    primary = create_engine(f"sqlite:///{tmp_path}/primary.db")
+    replica = create_engine(f"sqlite:///{tmp_path}/replica.db")
+    for engine, rows in ((primary, 3), (replica, 1)):
+        Base.metadata.create_all(engine)
+        with engine.begin() as connection:
+            connection.execute(Sprawa.__table__.insert(), [{"title": "sprawa"}] * rows)
+
+    lag = {"seconds": 0.0, "calls": 0}
+
+    def probe(engine):
+        lag["calls"] += 1
+        if lag["seconds"] is None:
+            raise exc.OperationalError("SELECT 1", {}, Exception("connection refused"))
+        return lag["seconds"]
+
+    router = ReplicaRouter({"replica_0": replica}, max_lag=5.0, check_interval=0, lag_probe=probe)
+    factory = sessionmaker(class_=RoutingSession, autoflush=False, bind=primary, router=router)
+    yield factory, router, lag
+    primary.dispose()
+    replica.dispose()
+
+
+def test_read_only_methods_use_the_replica(routed):
+    """Test kierowania odczytów do repliki"""
+    factory, router, lag = routed
+    with factory() as db:
+        assert SprawaService(db).count() == 1
+        assert db.scalar(select(func.count(Sprawa.id))) == 3  # poza @replica_read
+
+
+def test_lagging_or_unreachable_replica_is_skipped(routed):
+    """Test pomijania opóźnionej lub nieosiągalnej repliki"""
+    factory, router, lag = routed
+    lag["seconds"] = 30.0
+    with factory() as db:
+        assert SprawaService(db).count() == 3
+    lag["seconds"] = None
+    with factory() as db:
+        assert SprawaService(db).count() == 3
+    assert router.status() == {"replica_0": None}
+    lag["seconds"] = 0.5
+    with factory() as db:
+        assert SprawaService(db).count() == 1
+
+
+def test_session_keeps_one_replica(routed, tmp_path):
+    """Test jednej repliki na sesję: kolejne odczyty widzą ten sam stan"""
+    factory, router, lag = routed
+    second = create_engine(f"sqlite:///{tmp_path}/replica_1.db")
+    Base.metadata.create_all(second)
+    with second.begin() as connection:
+        connection.execute(Sprawa.__table__.insert(), [{"title": "sprawa"}] * 2)
+    router.engines["replica_1"] = second
+
+    counts = []
+    for _ in range(2):
+        with factory() as db:
+            counts.append({SprawaService(db).count() for _ in range(4)})
+    assert sorted(counts, key=min) == [{1}, {2}]  # kolejna sesja może trafić na inną replikę
+    second.dispose()
+
+
+def test_session_reads_its_own_writes(routed):
+    """Test odczytu własnych zapisów z serwera głównego"""
+    factory, router, lag = routed
+    with factory() as db:
+        db.add(Sprawa(title="nowa"))
+        db.commit()
+        assert SprawaService(db).count() == 4
+    with factory() as db:
+        assert SprawaService(db).count() == 1
+
+
+def test_bulk_delete_reads_its_own_writes(routed):
+    """Test odczytu po DELETE wykonanym z pominięciem flush"""
+    factory, router, lag = routed
+    with factory() as db:
+        db.query(Sprawa).filter(Sprawa.id == 1).delete(synchronize_session=False)
+        db.commit()
+        assert SprawaService(db).count() == 2
+
+
+def test_lag_is_probed_once_per_interval(routed):
+    """Test buforowania pomiaru opóźnienia"""
+    factory, router, lag = routed
+    router.check_interval = 60
+    with factory() as db:
+        for _ in range(5):
+            SprawaService(db).count()
+    assert lag["calls"] == 1
@@ -66,7 +66,7 @@ def test_get_law_firms(setup_database):
     assert response.status_code == 200
     
     data = response.json()
-    assert isinstance(data, list)
+    assert isinstance(data["items"], list)
 
 
 def test_get_law_firm_not_found(setup_database):
@@ -89,7 +89,7 @@ def test_get_clients(sample_law_firm):
     response = client.get("/api/v1/klienci/")
     assert response.status_code == 200
     
-    data = response.json()
+    data = response.json()["items"]
     assert isinstance(data, list)
     assert len(data) >= 1
 
@@ -99,7 +99,7 @@ def test_get_clients_filtered_by_law_firm(sample_law_firm):
     response = client.get(f"/api/v1/klienci/?law_firm_id={sample_law_firm['id']}")
     assert response.status_code == 200
     
-    data = response.json()
+    data = response.json()["items"]
     assert isinstance(data, list)
 
 
@@ -198,6 +198,6 @@ def test_search_clients(sample_law_firm):
     response = client.get(f"/api/v1/klienci/?law_firm_id={sample_law_firm['id']}&search=Testowy")
     assert response.status_code == 200
     
-    data = response.json()
+    data = response.json()["items"]
     assert len(data) >= 1
     assert any("Testowy" in f"{c['first_name']} {c['last_name']}" for c in data)
\ No newline at end of file
@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+import zipfile
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+
+from app.api.v1.endpoints import kancelarie
+from app.api.v1.schemas.kancelaria import ExportFormat
+from app.core.config import settings
+from app.models.kancelaria import Case, CaseNote, Client, Document, LawFirm
+from app.services.export_service import LawFirmExportService
+
+
+@pytest.fixture
+def law_firm_id(sessions):
+    with sessions() as db:
+        law_firm, other = LawFirm(name="Kancelaria"), LawFirm(name="Inna kancelaria")
+        db.add_all([law_firm, other])
+        db.flush()
+        for firm, count in ((law_firm, 5), (other, 2)):
+            for i in range(count):
+                client = Client(law_firm_id=firm.id, first_name="Jan", last_name=f"Kowalski {i}")
+                db.add(client)
+                db.flush()
+                case = Case(law_firm_id=firm.id, client_id=client.id, case_number=f"I C {i}/24", title=f"Sprawa {i}",
+                            case_value=1500.5)
+                db.add(case)
+                db.flush()
+                db.add(Document(case_id=case.id, name=f"Pozew {i}.pdf", file_size=1024))
+                db.add(CaseNote(case_id=case.id, author_id=uuid4(), content=f"Notatka {i}", is_private=i % 2 == 0))
+        db.commit()
+        return law_firm.id
+
+
+@pytest.fixture
+def routers():
+    return [kancelarie]
+
+
+def test_ndjson_export_contains_only_law_firm_data(sessions, law_firm_id):
+    """Test eksportu NDJSON: snapshot na początku i dane tylko tej kancelarii"""
+    with sessions() as db:
+        records = [
+            json.loads(line)
+            for chunk in LawFirmExportService(db).export(law_firm_id, ExportFormat.ndjson)
+            for line in chunk.splitlines()
+        ]
+
+    assert records[0]["type"] == "export" and records[0]["law_firm_id"] == str(law_firm_id)
+    assert records[0]["snapshot_at"]
+    types = [record["type"] for record in records[1:]]
+    assert types == ["client"] * 5 + ["case"] * 5 + ["document"] * 5 + ["case_note"] * 5
+    clients = [record["data"] for record in records if record["type"] == "client"]
+    assert all(data["law_firm_id"] == str(law_firm_id) for data in clients)
+    assert "search_text" not in clients[0]
+    case = next(record["data"] for record in records if record["type"] == "case")
+    assert case["case_value"] == "1500.50" and case["status"] == "pending"
+
+
+def test_export_reads_tables_in_batches(sessions, law_firm_id, monkeypatch):
+    """Test pobierania wierszy porcjami i wysyłania ich na bieżąco"""
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+    with sessions() as db:
+        statements = []
+        event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+        chunks = list(LawFirmExportService(db).export(law_firm_id, ExportFormat.ndjson))
+
+    assert len(statements) == 5  # chwila snapshotu i jedno zapytanie na tabelę
+    assert len(chunks) == 1 + 4 * 3  # nagłówek i porcje po 2 z 5 wierszy każdej tabeli
+
+
+def test_zip_export(client, law_firm_id):
+    """Test eksportu ZIP z plikiem CSV na tabelę"""
+    response = client.get(f"/api/v1/kancelarie/{law_firm_id}/export", params={"format": "zip"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    assert f"kancelaria-{law_firm_id}.zip" in response.headers["content-disposition"]
+
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert archive.testzip() is None
+    assert set(archive.namelist()) == {"clients.csv", "cases.csv", "documents.csv", "case_notes.csv", "export.json"}
+    manifest = json.loads(archive.read("export.json"))
+    assert manifest["rows"] == {"clients": 5, "cases": 5, "documents": 5, "case_notes": 5}
+    assert manifest["snapshot_at"]
+
+    clients = list(csv.DictReader(io.TextIOWrapper(archive.open("clients.csv"), encoding="utf-8")))
+    assert sorted(row["last_name"] for row in clients) == [f"Kowalski {i}" for i in range(5)]
+    assert clients[0]["email"] == ""
+
+
+def test_export_endpoint_ndjson_and_missing_law_firm(client, law_firm_id):
+    """Test domyślnego formatu NDJSON i 404 dla nieistniejącej kancelarii"""
+    response = client.get(f"/api/v1/kancelarie/{law_firm_id}/export")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert len(response.text.splitlines()) == 21
+
+    assert client.get(f"/api/v1/kancelarie/{uuid4()}/export").status_code == 404
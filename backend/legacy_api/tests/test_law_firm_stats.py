@@ -0,0 +1,84 @@
+from uuid import uuid4
+
+from sqlalchemy import event
+
+from app.api.v1.schemas.kancelaria import CaseUpdate, ClientCreate, LawFirmCreate
+from app.models.kancelaria import Case, LawFirmStats
+from app.services.kancelaria_service import CaseService, ClientService, LawFirmService
+
+
+def add_case(db, law_firm_id, client_id, status="pending", number=1):
+    case = Case(law_firm_id=law_firm_id, client_id=client_id, case_number=f"I C {number}/24",
+                title=f"Sprawa {number}", status=status, priority="medium")
+    db.add(case)
+    db.commit()
+    return case
+
+
+def test_counters_follow_writes(db):
+    """Test przyrostowej aktualizacji liczników przy tworzeniu, zmianie i usuwaniu"""
+    service = LawFirmService(db)
+    law_firm = service.create_law_firm(LawFirmCreate(name="Kancelaria"))
+    other = service.create_law_firm(LawFirmCreate(name="Inna kancelaria"))
+    assert service.get_law_firm_stats(law_firm.id) == {
+        "clients_count": 0, "cases_count": 0, "active_cases_count": 0,
+    }
+
+    clients = ClientService(db)
+    jan = clients.create_client(ClientCreate(first_name="Jan", last_name="Kowalski", law_firm_id=law_firm.id))
+    clients.create_client(ClientCreate(first_name="Anna", last_name="Nowak", law_firm_id=law_firm.id))
+    active = add_case(db, law_firm.id, jan.id, status="active", number=1)
+    add_case(db, law_firm.id, jan.id, status="active", number=2)
+    add_case(db, law_firm.id, jan.id, number=3)
+
+    # Dawne złączenie clients x cases liczyło tu 3 klientów
+    assert service.get_law_firm_stats(law_firm.id) == {
+        "clients_count": 2, "cases_count": 3, "active_cases_count": 2,
+    }
+
+    CaseService(db).update_case(active.id, CaseUpdate(status="closed"))
+    assert CaseService(db).delete_case(add_case(db, law_firm.id, jan.id, status="active", number=4).id)
+    assert service.get_law_firm_stats(law_firm.id)["active_cases_count"] == 1
+
+    active.law_firm_id = other.id
+    db.commit()
+    assert service.get_law_firm_stats(law_firm.id)["cases_count"] == 3
+    assert service.get_law_firm_stats(other.id) == {
+        "clients_count": 0, "cases_count": 1, "active_cases_count": 0,
+    }
+
+
+def test_stats_read_is_single_query(db, engine):
+    """Test odczytu statystyk jednym zapytaniem"""
+    service = LawFirmService(db)
+    law_firm = service.create_law_firm(LawFirmCreate(name="Kancelaria"))
+    db.expunge_all()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    details = service.get_law_firm_with_stats(law_firm.id)
+    assert len(statements) == 1
+    assert details["name"] == "Kancelaria" and details["clients_count"] == 0
+    assert service.get_law_firm_with_stats(uuid4()) is None
+
+
+def test_repair_fixes_drifted_counters(db):
+    """Test naprawy rozbieżnych i brakujących liczników"""
+    service = LawFirmService(db)
+    law_firm = service.create_law_firm(LawFirmCreate(name="Kancelaria"))
+    other = service.create_law_firm(LawFirmCreate(name="Inna kancelaria"))
+    client = ClientService(db).create_client(
+        ClientCreate(first_name="Jan", last_name="Kowalski", law_firm_id=law_firm.id)
+    )
+    add_case(db, law_firm.id, client.id, status="active")
+
+    db.get(LawFirmStats, law_firm.id).clients_count = 7
+    db.delete(db.get(LawFirmStats, other.id))
+    db.commit()
+
+    assert service.repair_law_firm_stats() == 2
+    assert service.get_law_firm_stats(law_firm.id) == {
+        "clients_count": 1, "cases_count": 1, "active_cases_count": 1,
+    }
+    assert db.get(LawFirmStats, other.id).cases_count == 0
+    assert service.repair_law_firm_stats(law_firm.id) == 0
@@ -0,0 +1,66 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from app.core.metrics import MetricsMiddleware
+from app.main import app
+
+engine = create_engine("sqlite://")
+
+test_app = FastAPI()
+test_app.add_middleware(MetricsMiddleware)
+
+
+@test_app.get("/sprawy/{case_id}")
+def get_case(case_id: int):
+    # Endpoint synchroniczny: wykonywany w puli wątków
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        connection.execute(text("SELECT 2"))
+    return {"id": case_id}
+
+
+client = TestClient(test_app)
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_latency_and_queries_per_route_template():
+    """Test histogramów czasu i liczby zapytań wg szablonu trasy"""
+    labels = {"method": "GET", "route": "/sprawy/{case_id}"}
+    requests_before = _sample("http_request_duration_seconds_count", status="200", **labels)
+    queries_before = _sample("db_queries_per_request_sum", **labels)
+
+    client.get("/sprawy/1")
+    client.get("/sprawy/2")
+
+    assert _sample("http_request_duration_seconds_count", status="200", **labels) == requests_before + 2
+    assert _sample("db_queries_per_request_sum", **labels) == queries_before + 4
+    assert _sample("http_requests_in_progress", method="GET") == 0
+
+
+def test_unmatched_paths_share_one_label():
+    """Test ograniczenia liczby serii dla nieznanych ścieżek"""
+    labels = {"method": "GET", "route": "<unmatched>", "status": "404"}
+    before = _sample("http_request_duration_seconds_count", **labels)
+
+    client.get("/nie/ma/takiej/42")
+    client.get("/nie/ma/takiej/43")
+
+    assert _sample("http_request_duration_seconds_count", **labels) == before + 2
+
+
+def test_metrics_endpoint():
+    """Test endpointu /metrics w formacie Prometheus"""
+    main_client = TestClient(app)
+    main_client.get("/health")
+
+    response = main_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="/health"' in response.text
+    assert 'route="/metrics"' not in response.text
@@ -0,0 +1,82 @@
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql
+
+from app.api.v1.endpoints import klienci, sprawy
+from app.db.pagination import CountMode, Explain, InvalidCursor, PageParams, decode_cursor, encode_cursor
+from app.models.kancelaria import Case
+from app.services.kancelaria_service import CaseService
+
+
+@pytest.fixture
+def law_firm_id(seed):
+    # Ta sama sekunda created_at (SQLite): kolejność rozstrzyga id
+    return str(seed(cases=7).law_firm_id)
+
+
+@pytest.fixture
+def routers():
+    return [klienci, sprawy]
+
+
+def test_cursor_walks_all_pages_once(client, law_firm_id):
+    """Test przejścia po wszystkich stronach bez powtórzeń i pominięć"""
+    seen, cursor = [], None
+    while True:
+        params = {"law_firm_id": law_firm_id, "limit": 3, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/v1/sprawy/", params=params).json()
+        assert page["total"] == 7 and page["total_is_estimate"] is False and page["size"] == 3
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 7 and len(set(seen)) == 7
+    assert seen == sorted(seen, reverse=True)  # jednakowe created_at, malejąco po id
+
+
+def test_new_rows_do_not_shift_later_pages(client, sessions, law_firm_id):
+    """Test stabilności kursora przy dopisywaniu nowych wierszy"""
+    first = client.get("/api/v1/sprawy/", params={"law_firm_id": law_firm_id, "limit": 4}).json()
+    with sessions() as db:
+        case = db.query(Case).first()
+        db.add(Case(law_firm_id=case.law_firm_id, client_id=case.client_id, case_number="N", title="Nowa",
+                    created_at=case.created_at + timedelta(seconds=1)))  # nowszy niż wszystkie strony
+        db.commit()
+
+    rest = client.get("/api/v1/sprawy/", params={
+        "law_firm_id": law_firm_id, "limit": 4, "cursor": first["next_cursor"], "count": "none",
+    }).json()
+    assert rest["total"] is None and rest["next_cursor"] is None
+    assert len(rest["items"]) == 3
+    assert not {item["id"] for item in first["items"]} & {item["id"] for item in rest["items"]}
+
+
+def test_page_query_is_bounded(sessions, law_firm_id):
+    """Test zapytania strony: warunek na kursor i LIMIT zamiast OFFSET"""
+    with sessions() as db:
+        page = CaseService(db).get_cases(page=PageParams(limit=2, count=CountMode.none))
+        statements = []
+        event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+        CaseService(db).get_cases(page=PageParams(cursor=decode_cursor(page["next_cursor"]), limit=2, count=CountMode.none))
+
+    assert len(statements) == 1  # bez osobnego COUNT i bez przeglądania wcześniejszych stron
+    assert ") < (strftime(" in statements[0] and "LIMIT" in statements[0]
+
+
+def test_invalid_cursor_is_rejected(client, sessions, law_firm_id):
+    """Test odrzucenia uszkodzonego lub niepasującego kursora"""
+    response = client.get("/api/v1/sprawy/", params={"cursor": "nie-kursor!"})
+    assert response.status_code == 400
+    with sessions() as db, pytest.raises(InvalidCursor):
+        CaseService(db).get_cases(page=PageParams(cursor=decode_cursor(encode_cursor({"offset": 3}))))
+
+
+def test_estimate_compiles_to_explain():
+    """Test szacowania liczby wierszy przez EXPLAIN w PostgreSQL"""
+    statement = select(Case.id).where(Case.law_firm_id == uuid4())
+    sql = str(Explain(statement).compile(dialect=postgresql.dialect()))
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT cases.id")
@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.profiler import ProfilerMiddleware
+
+
+def slow_lookup():
+    deadline = time.perf_counter() + 0.1
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _client(output_dir, **options) -> TestClient:
+    test_app = FastAPI()
+    test_app.add_middleware(ProfilerMiddleware, output_dir=str(output_dir), interval=0.001,
+                            **{"token": "s3cret", **options})
+
+    @test_app.get("/sprawy/{case_id}")
+    def get_case(case_id: int):
+        slow_lookup()
+        return {"id": case_id}
+
+    @test_app.get("/async/{case_id}")
+    async def get_case_async(case_id: int):
+        slow_lookup()
+        await asyncio.sleep(0)
+        return {"id": case_id}
+
+    return TestClient(test_app)
+
+
+def _stacks(profile) -> list[str]:
+    return [line.rsplit(" ", 1)[0] for line in profile.read_text().splitlines()]
+
+
+def test_token_profiles_sync_endpoint(tmp_path):
+    """Test profilowania endpointu synchronicznego (wątek z puli)"""
+    response = _client(tmp_path).get("/sprawy/7", headers={"X-Profile": "s3cret"})
+
+    profile = tmp_path / response.headers["x-profile-id"]
+    assert "GET-sprawy-case-id" in profile.name
+    stacks = _stacks(profile)
+    assert stacks[0].split(";")[-1].startswith("slow_lookup (")
+    assert all("get_case (" in stack for stack in stacks)
+
+
+def test_token_profiles_async_endpoint(tmp_path):
+    """Test profilowania endpointu async (pętla zdarzeń)"""
+    response = _client(tmp_path).get("/async/7", headers={"X-Profile": "s3cret"})
+
+    stacks = _stacks(tmp_path / response.headers["x-profile-id"])
+    assert stacks[0].split(";")[-1].startswith("slow_lookup (")
+
+
+def test_requests_without_token_are_not_profiled(tmp_path):
+    """Test braku profilu bez poprawnego tokenu"""
+    client = _client(tmp_path)
+
+    assert "x-profile-id" not in client.get("/sprawy/7").headers
+    assert "x-profile-id" not in client.get("/sprawy/7", headers={"X-Profile": "zly"}).headers
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_sample_rate(tmp_path):
+    """Test losowego profilowania bez nagłówka"""
+    client = _client(tmp_path, token=None, sample_rate=1.0)
+
+    assert "x-profile-id" in client.get("/sprawy/7").headers
@@ -0,0 +1,58 @@
+"""Add foreign-key and filter indexes
+
+Revision ID: 3c9a1f2e7b41
+Revises:
+Create Date: 2025-08-04 10:12:31.418220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9a1f2e7b41'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns), one entry per service query:
+#   OrderService.get_orders_by_user       -> orders(user_id)
+#   Order.documents / DocumentService     -> documents(order_id)
+#   AnalysisService.get_analyses_for_order -> analyses(order_id)
+#   Order.payments / confirm_payment      -> payments(order_id, status)
+# The create_payment_intent pending check is served by the unique partial
+# index uq_payments_order_id_pending (b71e05c3d8fa).
+INDEXES = [
+    ('ix_orders_user_id', 'orders', ['user_id']),
+    ('ix_documents_order_id', 'documents', ['order_id']),
+    ('ix_analyses_order_id', 'analyses', ['order_id']),
+    ('ix_payments_order_id_status', 'payments', ['order_id', 'status']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block and
+    # avoids locking out writes on tables that are already large.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True
+            )
@@ -0,0 +1,39 @@
+"""Add stripe_events table and payments.status_synced_at
+
+Revision ID: 8e2d4b6a9c13
+Revises: 3c9a1f2e7b41
+Create Date: 2025-08-05 09:41:07.552913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2d4b6a9c13'
+down_revision: Union[str, Sequence[str], None] = '3c9a1f2e7b41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'stripe_events',
+        sa.Column('id', sa.String(length=255), nullable=False),
+        sa.Column('type', sa.String(length=100), nullable=False),
+        sa.Column('payment_intent_id', sa.String(length=255), nullable=True),
+        sa.Column('received_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('payments') as batch_op:
+        batch_op.add_column(sa.Column('status_synced_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('payments') as batch_op:
+        batch_op.drop_column('status_synced_at')
+    op.drop_table('stripe_events')
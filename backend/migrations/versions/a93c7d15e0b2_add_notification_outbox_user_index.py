@@ -0,0 +1,40 @@
+"""Add notification_outbox user pending index
+
+Revision ID: a93c7d15e0b2
+Revises: 5f0b93e7a2c6
+Create Date: 2025-08-08 17:32:41.551083
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93c7d15e0b2'
+down_revision: Union[str, Sequence[str], None] = '5f0b93e7a2c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_notification_outbox_user_pending', 'notification_outbox', ['user_id', 'channel', 'recipient'],
+            unique=False,
+            postgresql_where=sa.text("status = 'pending'"),
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_notification_outbox_user_pending', table_name='notification_outbox',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
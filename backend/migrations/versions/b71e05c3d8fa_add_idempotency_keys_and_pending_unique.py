@@ -0,0 +1,67 @@
+"""Add idempotency_keys and a unique pending-payment index
+
+Revision ID: b71e05c3d8fa
+Revises: 8e2d4b6a9c13
+Create Date: 2025-08-06 14:03:52.190417
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71e05c3d8fa'
+down_revision: Union[str, Sequence[str], None] = '8e2d4b6a9c13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'idempotency_keys',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('key', sa.String(length=255), nullable=False),
+        sa.Column('request_fingerprint', sa.String(length=64), nullable=False),
+        sa.Column('response_code', sa.Integer(), nullable=True),
+        sa.Column('response_body', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'key', name='uq_idempotency_keys_user_id_key')
+    )
+
+    if not context.is_offline_mode():
+        duplicates = op.get_bind().execute(sa.text(
+            "SELECT order_id FROM payments WHERE status = 'pending' GROUP BY order_id HAVING count(*) > 1"
+        )).scalars().all()
+        if duplicates:
+            raise RuntimeError(
+                'Orders with more than one pending payment must be reconciled before '
+                f'uq_payments_order_id_pending can be created: {duplicates}'
+            )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_payments_order_id_pending', 'payments', ['order_id'],
+            unique=True,
+            if_not_exists=True,
+            postgresql_concurrently=True,
+            postgresql_where=sa.text("status = 'pending'")
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'uq_payments_order_id_pending', table_name='payments',
+            if_exists=True,
+            postgresql_concurrently=True
+        )
+    op.drop_table('idempotency_keys')
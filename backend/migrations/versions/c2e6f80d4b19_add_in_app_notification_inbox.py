@@ -0,0 +1,71 @@
+"""Add in-app notification inbox and unread counters
+
+Revision ID: c2e6f80d4b19
+Revises: a93c7d15e0b2
+Create Date: 2025-08-08 18:05:12.873410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e6f80d4b19'
+down_revision: Union[str, Sequence[str], None] = 'a93c7d15e0b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'in_app_notifications',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('type', sa.String(length=50), nullable=False),
+        sa.Column('read_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_in_app_notifications_user_id_id', 'in_app_notifications', ['user_id', 'id'], unique=False)
+    op.create_index(
+        'ix_in_app_notifications_user_id_unread', 'in_app_notifications', ['user_id'],
+        unique=False,
+        postgresql_where=sa.text('read_at IS NULL')
+    )
+    op.create_table(
+        'unread_notification_counters',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('unread_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # In-app notifications no longer go through the outbox; move queued ones to the inbox
+    op.execute("""
+        INSERT INTO in_app_notifications (user_id, message, type, created_at)
+        SELECT user_id, body, type, created_at
+        FROM notification_outbox
+        WHERE channel = 'in_app' AND user_id IS NOT NULL
+        ORDER BY id
+    """)
+    op.execute("""
+        INSERT INTO unread_notification_counters (user_id, unread_count)
+        SELECT user_id, count(*)
+        FROM in_app_notifications
+        WHERE read_at IS NULL
+        GROUP BY user_id
+    """)
+    op.execute("DELETE FROM notification_outbox WHERE channel = 'in_app'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('unread_notification_counters')
+    op.drop_index('ix_in_app_notifications_user_id_unread', table_name='in_app_notifications')
+    op.drop_index('ix_in_app_notifications_user_id_id', table_name='in_app_notifications')
+    op.drop_table('in_app_notifications')
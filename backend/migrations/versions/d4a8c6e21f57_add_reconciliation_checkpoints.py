@@ -0,0 +1,37 @@
+"""Add reconciliation_checkpoints
+
+Revision ID: d4a8c6e21f57
+Revises: b71e05c3d8fa
+Create Date: 2025-08-07 11:26:44.873105
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8c6e21f57'
+down_revision: Union[str, Sequence[str], None] = 'b71e05c3d8fa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'reconciliation_checkpoints',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('window_start', sa.Integer(), nullable=True),
+        sa.Column('window_end', sa.Integer(), nullable=True),
+        sa.Column('starting_after', sa.String(length=255), nullable=True),
+        sa.Column('last_completed_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('reconciliation_checkpoints')
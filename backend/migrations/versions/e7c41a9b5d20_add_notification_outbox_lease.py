@@ -0,0 +1,44 @@
+"""Add notification_outbox.lease_expires_at
+
+Revision ID: e7c41a9b5d20
+Revises: c2e6f80d4b19
+Create Date: 2025-08-11 10:24:36.205718
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7c41a9b5d20'
+down_revision: Union[str, Sequence[str], None] = 'c2e6f80d4b19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('notification_outbox') as batch_op:
+        batch_op.add_column(sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_notification_outbox_lease', 'notification_outbox', ['lease_expires_at'],
+            unique=False,
+            postgresql_where=sa.text("status = 'sending'"),
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_notification_outbox_lease', table_name='notification_outbox',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
+    with op.batch_alter_table('notification_outbox') as batch_op:
+        batch_op.drop_column('lease_expires_at')
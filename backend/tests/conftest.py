@@ -1,18 +1,52 @@
 import pytest
+from flask import Flask
 from backend.app import create_app, db
+from backend.app.config import TestingConfig
 from backend.app.models.user import User
 from werkzeug.security import generate_password_hash
 
 @pytest.fixture(scope='session')
 def app():
-    app = create_app()
-    app.config.from_object('backend.app.config.TestingConfig')
+    app = create_app('testing')
     with app.app_context():
         db.create_all()
         yield app
         db.session.remove()
         db.drop_all()
 
+@pytest.fixture(scope='function')
+def sqlite_app():
+    """Factory for a bare app on in-memory SQLite with only the given tables.
+
+    ``sqlite_app(tables, init=(), **config)`` applies ``config`` over
+    TestingConfig, calls each ``init`` with the app before ``db.init_app``
+    (a ReplicaRouter adds its binds there), creates the tables on every
+    engine and returns the app with its context pushed until the test ends.
+    """
+    built = []
+
+    def make(tables, init=(), **config):
+        app = Flask(__name__)
+        app.config.from_object(TestingConfig)
+        app.config.update(SQLALCHEMY_DATABASE_URI='sqlite://', SQLALCHEMY_ENGINE_OPTIONS={})
+        app.config.update(config)
+        for extension in init:
+            extension(app)
+        db.init_app(app)
+        context = app.app_context()
+        context.push()
+        built.append((context, tables))
+        for engine in db.engines.values():
+            db.metadata.create_all(engine, tables=tables)
+        return app
+
+    yield make
+    for context, tables in reversed(built):
+        db.session.remove()
+        for engine in db.engines.values():
+            db.metadata.drop_all(engine, tables=tables)
+        context.pop()
+
 @pytest.fixture(scope='function')
 def client(app):
     return app.test_client()
@@ -0,0 +1,105 @@
+import gzip
+import io
+import json
+import zlib
+import pytest
+from flask import Flask, Response, send_file
+from backend.app.config import TestingConfig
+from backend.app.utils.compression import Compression, brotli
+
+LARGE = {'items': [{'id': i, 'status': 'pending'} for i in range(500)]}
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.config.from_object(TestingConfig)
+    Compression(app)
+
+    @app.route('/large')
+    def large():
+        return LARGE
+
+    @app.route('/small')
+    def small():
+        return {'status': 'ok'}
+
+    @app.route('/pdf')
+    def pdf():
+        return send_file(io.BytesIO(b'%PDF-1.4' + b'0' * 5000), mimetype='application/pdf')
+
+    @app.route('/stream')
+    def stream():
+        def rows():
+            for i in range(200):
+                yield json.dumps({'id': i}) + '\n'
+        return Response(rows(), mimetype='application/x-ndjson')
+
+    return app.test_client()
+
+
+def test_gzip_when_requested(client):
+    response = client.get('/large', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert json.loads(gzip.decompress(response.data)) == LARGE
+    assert int(response.headers['Content-Length']) == len(response.data)
+
+
+@pytest.mark.skipif(brotli is None, reason='brotli is not installed')
+def test_brotli_preferred_when_accepted(client):
+    response = client.get('/large', headers={'Accept-Encoding': 'gzip, deflate, br'})
+
+    assert response.headers['Content-Encoding'] == 'br'
+    assert json.loads(brotli.decompress(response.data)) == LARGE
+
+
+def test_quality_zero_is_respected(client):
+    response = client.get('/large', headers={'Accept-Encoding': 'br;q=0, gzip;q=0.5'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+
+
+def test_identity_without_accept_encoding(client):
+    response = client.get('/large')
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.json == LARGE
+
+
+def test_small_responses_are_not_compressed(client):
+    response = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_pdf_downloads_pass_through(client):
+    response = client.get('/pdf', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.data.startswith(b'%PDF')
+
+
+def test_streamed_responses_are_compressed_incrementally(client):
+    client.application.extensions['compression'].flush_size = 256
+    response = client.get('/stream', headers={'Accept-Encoding': 'gzip'}, buffered=False)
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    chunks = iter(response.response)
+    first = b''
+    while not first:
+        first = decoder.decompress(next(chunks)) # the gzip header comes first, on its own
+    assert len(first) >= 256 and first.endswith(b'\n') # decodable before the stream ends
+    body = first + decoder.decompress(b''.join(chunks)) + decoder.flush()
+    assert body.decode().splitlines()[-1] == '{"id": 199}'
+
+
+def test_short_streams_are_flushed_once(client):
+    response = client.get('/stream', headers={'Accept-Encoding': 'gzip'}, buffered=False)
+
+    chunks = list(response.response)
+    assert len(chunks) == 2 # gzip header, then the whole body when the stream ends
+    assert len(gzip.decompress(b''.join(chunks)).splitlines()) == 200
@@ -0,0 +1,87 @@
+import os
+import subprocess
+import sys
+import pytest
+from flask import Flask
+from prometheus_client import REGISTRY, CollectorRegistry, multiprocess
+from sqlalchemy import create_engine, text
+from backend.app.config import TestingConfig
+from backend.app.utils.metrics import Metrics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.config.from_object(TestingConfig)
+    Metrics(app)
+    engine = create_engine('sqlite://')
+
+    @app.route('/orders/<int:order_id>')
+    def order(order_id):
+        with engine.connect() as connection:
+            for _ in range(3):
+                connection.execute(text('SELECT 1'))
+        return {'id': order_id}
+
+    @app.route('/boom')
+    def boom():
+        raise RuntimeError('boom')
+
+    return app.test_client()
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_latency_and_queries_are_recorded_per_route(client):
+    labels = {'method': 'GET', 'route': '/orders/<int:order_id>'}
+    requests_before = _sample('http_request_duration_seconds_count', status='200', **labels)
+    queries_before = _sample('db_queries_per_request_sum', **labels)
+
+    client.get('/orders/1')
+    client.get('/orders/2')
+
+    assert _sample('http_request_duration_seconds_count', status='200', **labels) == requests_before + 2
+    assert _sample('db_queries_per_request_sum', **labels) == queries_before + 6
+    assert _sample('http_requests_in_progress', **labels) == 0
+
+
+def test_errors_and_unknown_paths_are_labelled(client):
+    client.application.config['PROPAGATE_EXCEPTIONS'] = False
+    errors_before = _sample('http_request_duration_seconds_count', method='GET', route='/boom', status='500')
+    unmatched_before = _sample('http_request_duration_seconds_count', method='GET', route='<unmatched>', status='404')
+
+    client.get('/boom')
+    client.get('/no/such/path/42')
+
+    assert _sample('http_request_duration_seconds_count', method='GET', route='/boom', status='500') == errors_before + 1
+    assert _sample('http_request_duration_seconds_count', method='GET', route='<unmatched>', status='404') == unmatched_before + 1
+
+
+def test_metrics_endpoint_serves_text_format(client):
+    client.get('/orders/1')
+
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert b'http_request_duration_seconds_bucket{' in response.data
+    assert b'route="/metrics"' not in response.data
+
+
+def test_workers_are_aggregated_in_multiprocess_mode(tmp_path):
+    script = (
+        'from backend.app.utils.metrics import REQUEST_LATENCY\n'
+        "REQUEST_LATENCY.labels('GET', '/orders', '200').observe(0.02)\n"
+    )
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    for _ in range(2): # Two worker processes
+        subprocess.run([sys.executable, '-c', script], cwd=ROOT, env=env, check=True)
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=str(tmp_path))
+    labels = {'method': 'GET', 'route': '/orders', 'status': '200'}
+    assert registry.get_sample_value('http_request_duration_seconds_count', labels) == 2
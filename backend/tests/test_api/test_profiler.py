@@ -0,0 +1,62 @@
+import time
+import pytest
+from flask import Flask
+from backend.app.config import TestingConfig
+from backend.app.utils.profiler import Profiler
+
+
+def slow_lookup():
+    deadline = time.perf_counter() + 0.1
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _app(tmp_path, **overrides):
+    app = Flask(__name__)
+    app.config.from_object(TestingConfig)
+    app.config.update({'PROFILER_ENABLED': True, 'PROFILER_TOKEN': 's3cret', 'PROFILER_INTERVAL': 0.001,
+                       'PROFILER_OUTPUT_DIR': str(tmp_path), **overrides})
+    Profiler(app)
+
+    @app.route('/orders/<int:order_id>')
+    def order(order_id):
+        slow_lookup()
+        return {'id': order_id}
+
+    return app
+
+
+def test_token_header_profiles_the_request(tmp_path):
+    client = _app(tmp_path).test_client()
+
+    response = client.get('/orders/7', headers={'X-Profile': 's3cret'})
+
+    profile = tmp_path / response.headers['X-Profile-Id']
+    assert 'GET-orders-int-order-id' in profile.name
+    lines = profile.read_text().splitlines()
+    stack, count = lines[0].rsplit(' ', 1)
+    assert 'order (' in stack and stack.split(';')[-1].startswith('slow_lookup (')
+    assert int(count) > 10
+
+
+@pytest.mark.parametrize('headers', [{}, {'X-Profile': 'wrong'}])
+def test_requests_without_the_token_are_not_profiled(tmp_path, headers):
+    client = _app(tmp_path).test_client()
+
+    response = client.get('/orders/7', headers=headers)
+
+    assert 'X-Profile-Id' not in response.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_sample_rate_profiles_without_a_header(tmp_path):
+    client = _app(tmp_path, PROFILER_TOKEN=None, PROFILER_SAMPLE_RATE=1.0).test_client()
+
+    assert 'X-Profile-Id' in client.get('/orders/7').headers
+
+
+def test_disabled_profiler_registers_no_hooks(tmp_path):
+    app = _app(tmp_path, PROFILER_ENABLED=False)
+
+    assert 'profiler' not in app.extensions
+    assert not app.before_request_funcs and not app.after_request_funcs
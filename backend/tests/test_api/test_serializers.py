@@ -0,0 +1,108 @@
+from datetime import datetime
+import pytest
+from flask import Flask
+from flask_restx import Api, Resource, fields, marshal
+from backend.app.api.analyses import analysis_model
+from backend.app.api.documents import document_model
+from backend.app.api.notifications import notification_page_model
+from backend.app.api.orders import order_model
+from backend.app.config import TestingConfig
+from backend.app.models.analysis import Analysis
+from backend.app.models.document import Document
+from backend.app.models.in_app_notification import InAppNotification
+from backend.app.models.order import Order
+from backend.app.models.payment import Payment # noqa: F401 (configures Order.payments)
+from backend.app.models.user import User # noqa: F401
+from backend.app.utils.serializers import compile_model, serialize, serialize_list_with
+
+NOW = datetime(2025, 8, 8, 12, 30, 15, 123456)
+
+
+def _orders():
+    return [
+        Order(id=1, user_id=7, status='pending', created_at=NOW, updated_at=NOW),
+        Order(id=2, user_id=7, status='paid', created_at=NOW, updated_at=None),
+    ]
+
+
+def _analyses():
+    return [
+        Analysis(id=1, order_id=1, analysis_type='summary', result_data={'pages': 3, 'tags': ['a', 'ż']},
+                 status='completed', created_at=NOW, completed_at=NOW),
+        Analysis(id=2, order_id=1, analysis_type='entities', result_data=None, status='pending', created_at=NOW),
+    ]
+
+
+def _documents():
+    return [Document(id=1, order_id=1, filename='umowa.pdf', file_type='pdf', uploaded_at=NOW, status='uploaded')]
+
+
+def _notification_page():
+    items = [InAppNotification(id=i, message=f'Hello {i}', type='info', created_at=NOW) for i in (3, 2)]
+    return {'items': items, 'next_cursor': 2, 'unread_count': 5}
+
+
+@pytest.mark.parametrize('model, data', [
+    (order_model, _orders()),
+    (analysis_model, _analyses()),
+    (document_model, _documents()),
+    (notification_page_model, _notification_page()),
+])
+def test_compiled_serializer_matches_marshal(model, data):
+    assert serialize(data, model) == marshal(data, model)
+
+
+def test_defaults_and_fallbacks_match_marshal():
+    model = {
+        'count': fields.Integer(default=3),
+        'label': fields.String(attribute='name'),
+        'nested_name': fields.String(attribute='child.name'),
+        'price': fields.Float,
+        'flag': fields.Boolean(default=True),
+        'fixed': fields.Fixed(decimals=2),
+        'numeric_string': fields.Integer,
+    }
+    child = Order(status='child')
+    child.name = 'inner'
+    obj = Order(status='x')
+    obj.name, obj.child, obj.price, obj.count, obj.flag, obj.fixed, obj.numeric_string = 'n', child, 2, None, None, '1.5', '42'
+
+    assert compile_model(model)(obj) == marshal(obj, model)
+    assert compile_model(model)({'name': 'from dict'}) == marshal({'name': 'from dict'}, model)
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.config.from_object(TestingConfig)
+    api = Api(app)
+    ns = api.namespace('orders')
+
+    @ns.route('/marshal')
+    class Marshalled(Resource):
+        @ns.marshal_list_with(order_model)
+        def get(self):
+            return _orders()
+
+    @ns.route('/compiled')
+    class Compiled(Resource):
+        @serialize_list_with(order_model)
+        def get(self):
+            return _orders()
+
+    return app.test_client()
+
+
+def test_response_bytes_are_identical(client):
+    expected = client.get('/orders/marshal')
+    actual = client.get('/orders/compiled')
+
+    assert actual.status_code == expected.status_code == 200
+    assert actual.content_type == expected.content_type
+    assert actual.data == expected.data
+
+
+def test_field_mask_header_is_honoured(client):
+    headers = {'X-Fields': 'id,status'}
+
+    assert client.get('/orders/compiled', headers=headers).data == client.get('/orders/marshal', headers=headers).data
@@ -0,0 +1,130 @@
+"""
+Plan regression checks for the hot service queries.
+
+Seeds a realistically sized dataset, runs EXPLAIN on the exact queries the
+services issue and fails if the planner falls back to a sequential scan.
+Requires PostgreSQL (TEST_DATABASE_URL); skipped on other backends.
+"""
+import pytest
+from decouple import config
+from flask import Flask
+from sqlalchemy import text
+from backend.app import db
+from backend.app.config import TestingConfig
+from backend.app.models.analysis import Analysis
+from backend.app.models.document import Document
+from backend.app.models.order import Order
+from backend.app.models.payment import Payment
+from backend.app.models.user import User
+
+TEST_DATABASE_URL = config('TEST_DATABASE_URL', '')
+TABLES = [User.__table__, Order.__table__, Document.__table__, Analysis.__table__, Payment.__table__]
+
+SEED_USERS = 5000
+ORDERS_PER_USER = 10
+DOCUMENTS_PER_ORDER = 3
+ANALYSES_PER_ORDER = 2
+
+SEED_STATEMENTS = [
+    """
+    INSERT INTO users (email, password_hash)
+    SELECT 'plan-user-' || g || '@example.com', 'x'
+    FROM generate_series(1, :users) AS g
+    """,
+    """
+    INSERT INTO orders (user_id, status)
+    SELECT u.id, 'pending'
+    FROM users u, generate_series(1, :orders_per_user)
+    """,
+    """
+    INSERT INTO documents (order_id, filename, file_path, file_type, status)
+    SELECT o.id, 'doc.pdf', '/tmp/doc.pdf', 'pdf', 'uploaded'
+    FROM orders o, generate_series(1, :documents_per_order)
+    """,
+    """
+    INSERT INTO analyses (order_id, analysis_type, status)
+    SELECT o.id, 'summary', 'completed'
+    FROM orders o, generate_series(1, :analyses_per_order)
+    """,
+    """
+    INSERT INTO payments (order_id, stripe_payment_intent_id, amount, currency, status)
+    SELECT o.id, 'pi_plan_' || o.id, 10.0, 'usd',
+           CASE WHEN o.id % 50 = 0 THEN 'pending' ELSE 'succeeded' END
+    FROM orders o
+    """,
+]
+
+# One entry per query issued by the services, built the same way they build it.
+SERVICE_QUERIES = {
+    'AuthService.login_user': lambda ids: User.query.filter_by(email=ids['email']).limit(1),
+    'OrderService.get_orders_by_user': lambda ids: Order.query.filter_by(user_id=ids['user_id']),
+    'Order.documents': lambda ids: Document.query.filter_by(order_id=ids['order_id']),
+    'AnalysisService.get_analyses_for_order': lambda ids: Analysis.query.filter_by(order_id=ids['order_id']),
+    'PaymentService.create_payment_intent': lambda ids: Payment.query.filter_by(
+        order_id=ids['order_id'], status='pending').limit(1),
+    'PaymentService.confirm_payment': lambda ids: Payment.query.filter_by(
+        order_id=ids['order_id'], stripe_payment_intent_id=ids['payment_intent_id']).limit(1),
+}
+
+
+def _plan_nodes(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from _plan_nodes(child)
+
+
+@pytest.fixture(scope='module')
+def plan_app():
+    if not TEST_DATABASE_URL.startswith('postgresql'):
+        pytest.skip('Query plan checks require PostgreSQL (TEST_DATABASE_URL).')
+
+    app = Flask(__name__)
+    app.config.from_object(TestingConfig)
+    app.config['SQLALCHEMY_DATABASE_URI'] = TEST_DATABASE_URL
+    db.init_app(app)
+    with app.app_context():
+        db.metadata.create_all(db.engine, tables=TABLES)
+        yield app
+        db.session.remove()
+        db.metadata.drop_all(db.engine, tables=TABLES)
+
+
+@pytest.fixture(scope='module')
+def seeded_database(plan_app):
+    db.session.begin_nested()
+    params = {
+        'users': SEED_USERS,
+        'orders_per_user': ORDERS_PER_USER,
+        'documents_per_order': DOCUMENTS_PER_ORDER,
+        'analyses_per_order': ANALYSES_PER_ORDER,
+    }
+    for statement in SEED_STATEMENTS:
+        db.session.execute(text(statement), params)
+    for table in ('users', 'orders', 'documents', 'analyses', 'payments'):
+        db.session.execute(text(f'ANALYZE {table}'))
+
+    payment = Payment.query.filter_by(status='pending').first()
+    order = Order.query.get(payment.order_id)
+    ids = {
+        'email': order.user.email,
+        'user_id': order.user_id,
+        'order_id': order.id,
+        'payment_intent_id': payment.stripe_payment_intent_id,
+    }
+    yield ids
+    db.session.rollback()
+
+
+@pytest.mark.parametrize('query_name', sorted(SERVICE_QUERIES))
+def test_service_query_uses_index(seeded_database, query_name):
+    query = SERVICE_QUERIES[query_name](seeded_database)
+    sql = str(query.statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True}))
+
+    plan = db.session.execute(text(f'EXPLAIN (FORMAT JSON) {sql}')).scalar()
+    seq_scans = [
+        node.get('Relation Name')
+        for node in _plan_nodes(plan[0]['Plan'])
+        if node['Node Type'] == 'Seq Scan'
+    ]
+
+    assert not seq_scans, f'{query_name} falls back to a sequential scan on {seq_scans}:\n{sql}'
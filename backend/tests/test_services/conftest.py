@@ -0,0 +1,109 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import pytest
+from backend.app import db, payment_gateway
+from backend.app.models.analysis import Analysis # noqa: F401 (configures Order.analyses)
+from backend.app.models.document import Document # noqa: F401 (configures Order.documents)
+from backend.app.models.idempotency_key import IdempotencyKey
+from backend.app.models.order import Order
+from backend.app.models.payment import Payment
+from backend.app.models.reconciliation_checkpoint import ReconciliationCheckpoint
+from backend.app.models.stripe_event import StripeEvent
+from backend.app.models.user import User
+
+PAYMENT_TABLES = [
+    User.__table__, Order.__table__, Payment.__table__, StripeEvent.__table__,
+    IdempotencyKey.__table__, ReconciliationCheckpoint.__table__,
+]
+
+
+class FakeStripeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1' # keep-alive, like the real API
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        # A new intent per call, except that a retried Idempotency-Key gets its original intent back
+        created = self.server.created
+        intent_id = created.setdefault(self.headers.get('Idempotency-Key') or object(), f'pi_fake_{len(created) + 1}')
+        self._respond({
+            'id': intent_id, 'object': 'payment_intent', 'amount': 1000,
+            'currency': 'usd', 'status': 'requires_payment_method', 'client_secret': f'{intent_id}_secret'
+        })
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/v1/payment_intents':
+            return self._list(parse_qs(url.query))
+        intent_id = url.path.rsplit('/', 1)[-1]
+        status = self.server.intents.get(intent_id, 'succeeded')
+        self._respond({'id': intent_id, 'object': 'payment_intent', 'status': status})
+
+    def _list(self, query):
+        ids = list(self.server.intents)
+        if 'starting_after' in query:
+            ids = ids[ids.index(query['starting_after'][0]) + 1:]
+        limit = int(query['limit'][0])
+        self._respond({
+            'object': 'list', 'url': '/v1/payment_intents', 'has_more': len(ids) > limit,
+            'data': [{'id': i, 'object': 'payment_intent', 'status': self.server.intents[i]} for i in ids[:limit]]
+        })
+
+    def _respond(self, body):
+        server = self.server
+        server.requests.append((self.command, self.path, dict(self.headers), self.client_address))
+        if server.delay:
+            time.sleep(server.delay)
+        if server.failures_left > 0:
+            server.failures_left -= 1
+            status, body = 500, {'error': {'type': 'api_error', 'message': 'Fake outage'}}
+        else:
+            status = 200
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fake_stripe():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeStripeHandler)
+    server.requests = []
+    server.failures_left = 0
+    server.delay = 0
+    server.created = {} # Idempotency-Key (or a fresh object) -> intent id
+    server.intents = {} # intent id -> status, in list order; retrieve defaults to 'succeeded'
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def payments_app(fake_stripe, sqlite_app):
+    """App context with the payment tables in SQLite and the gateway pointed at the fake Stripe server.
+
+    Returns the id of a user owning no orders yet.
+    """
+    app = sqlite_app(
+        PAYMENT_TABLES,
+        STRIPE_SECRET_KEY='sk_test_fake',
+        STRIPE_WEBHOOK_SECRET='whsec_test',
+        STRIPE_API_BASE=f'http://127.0.0.1:{fake_stripe.server_port}',
+        STRIPE_READ_TIMEOUT=0.5,
+        STRIPE_MAX_RETRIES=0,
+    )
+    payment_gateway.init_app(app)
+    user = User(email='buyer@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    return user.id
@@ -0,0 +1,59 @@
+import threading
+import pytest
+from sqlalchemy import create_engine, exc, text
+from backend.app.utils.db_pool import InstrumentedQueuePool, pool_status, prewarm_pool
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # A SQLite file behaves like a server database for pooling purposes
+    engine = create_engine(f'sqlite:///{tmp_path}/pool.db', poolclass=InstrumentedQueuePool,
+                           pool_size=2, max_overflow=1, pool_timeout=0.2)
+    yield engine
+    engine.dispose()
+
+
+def test_prewarm_fills_the_pool(engine):
+    assert prewarm_pool(engine, 2) == 2
+
+    status = pool_status(engine)
+    assert status['checked_in'] == 2
+    assert status['checked_out'] == 0
+    assert status['overflow_connections'] == 0
+
+
+def test_overflow_and_timeouts_are_counted(engine):
+    held = [engine.connect() for _ in range(3)] # pool_size 2 + 1 overflow
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+
+    status = pool_status(engine)
+    assert status['checked_out'] == 3
+    assert status['overflow'] == 1
+    assert status['overflow_connections'] == 1
+    assert status['timeouts'] == 1
+    assert status['wait_seconds_max'] >= 0.2
+    for connection in held:
+        connection.close()
+
+
+def test_wait_time_covers_blocked_checkouts(engine):
+    held = [engine.connect() for _ in range(3)]
+    timer = threading.Timer(0.05, held[0].close)
+    timer.start()
+
+    with engine.connect() as connection:
+        connection.execute(text('SELECT 1'))
+
+    timer.join()
+    assert pool_status(engine)['wait_seconds_max'] >= 0.04
+    for connection in held[1:]:
+        connection.close()
+
+
+def test_stats_survive_dispose(engine):
+    engine.connect().close()
+    engine.dispose()
+    engine.connect().close()
+
+    assert pool_status(engine)['checkouts'] == 2
@@ -0,0 +1,133 @@
+import pytest
+from flask import g
+from sqlalchemy.exc import OperationalError
+from backend.app import db
+from backend.app.models.analysis import Analysis # noqa: F401 (configures Order.analyses)
+from backend.app.models.document import Document # noqa: F401 (configures Order.documents)
+from backend.app.models.in_app_notification import InAppNotification
+from backend.app.models.order import Order
+from backend.app.models.payment import Payment # noqa: F401 (configures Order.payments)
+from backend.app.models.unread_notification_counter import UnreadNotificationCounter
+from backend.app.models.user import User
+from backend.app.services.inbox_service import InboxService
+from backend.app.services.order_service import OrderService
+from backend.app.utils.db_routing import ReplicaRouter, replica_reads
+
+TABLES = [User.__table__, Order.__table__, InAppNotification.__table__, UnreadNotificationCounter.__table__]
+
+
+class FakeLag:
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+
+    def __call__(self, engine):
+        self.calls += 1
+        if self.seconds is None:
+            raise OperationalError('SELECT 1', {}, Exception('connection refused'))
+        return self.seconds
+
+
+@pytest.fixture
+def routed(tmp_path, request, sqlite_app):
+    # SQLite files stand in for the primary and replicas that have not caught up yet;
+    # replica_N holds N + 1 of the primary's 3 orders
+    replicas = getattr(request, 'param', 1)
+    lag = FakeLag()
+    router = ReplicaRouter(lag_probe=lag)
+    app = sqlite_app(
+        TABLES,
+        init=[router.init_app],
+        SQLALCHEMY_DATABASE_URI=f'sqlite:///{tmp_path}/primary.db',
+        SQLALCHEMY_REPLICA_URIS=[f'sqlite:///{tmp_path}/replica_{index}.db' for index in range(replicas)],
+        REPLICA_MAX_LAG_SECONDS=5.0,
+        REPLICA_LAG_CHECK_INTERVAL=0,
+    )
+    engines = [(db.engine, 3)] + [(db.engines[f'replica_{index}'], index + 1) for index in range(replicas)]
+    for engine, orders in engines:
+        with engine.begin() as connection:
+            connection.execute(User.__table__.insert(), [
+                {'id': 1, 'email': 'owner@example.com', 'password_hash': 'x'},
+                {'id': 2, 'email': 'other@example.com', 'password_hash': 'x'},
+            ])
+            connection.execute(Order.__table__.insert(), [{'user_id': 1, 'status': 'pending'}] * orders)
+            connection.execute(InAppNotification.__table__.insert(), {'id': 1, 'user_id': 1, 'message': 'Ready', 'type': 'info'})
+            connection.execute(UnreadNotificationCounter.__table__.insert(), {'user_id': 1, 'unread_count': 1})
+    return app, router, lag
+
+
+def test_read_only_service_calls_use_the_replica(routed):
+    assert len(OrderService.get_orders_by_user(1)) == 1
+    assert Order.query.filter_by(user_id=1).count() == 3 # Not marked read-only
+
+
+def test_lagging_or_unreachable_replica_is_skipped(routed):
+    app, router, lag = routed
+    lag.seconds = 30.0
+    assert len(OrderService.get_orders_by_user(1)) == 3
+
+    db.session.remove()
+    lag.seconds = None
+    assert len(OrderService.get_orders_by_user(1)) == 3
+    assert router.status() == {'replica_0': None}
+
+    db.session.remove()
+    lag.seconds = 1.0
+    assert len(OrderService.get_orders_by_user(1)) == 1
+
+
+@pytest.mark.parametrize('routed', [2], indirect=True)
+def test_session_keeps_one_replica(routed):
+    counts = []
+    for _ in range(2):
+        counts.append({len(OrderService.get_orders_by_user(1)) for _ in range(4)})
+        db.session.remove()
+
+    assert sorted(counts, key=min) == [{1}, {2}] # The next session may use the other replica
+
+
+def test_session_reads_its_own_writes(routed):
+    OrderService.create_order(1)
+
+    assert len(OrderService.get_orders_by_user(1)) == 4
+    db.session.remove()
+    assert len(OrderService.get_orders_by_user(1)) == 1 # New session, no user to pin
+
+
+def test_user_stays_on_the_primary_after_a_write(routed):
+    app, router, lag = routed
+    with app.test_request_context():
+        g.current_user_id = 1
+        OrderService.create_order(1)
+        db.session.remove()
+
+    with app.test_request_context():
+        g.current_user_id = 1
+        assert len(OrderService.get_orders_by_user(1)) == 4
+        db.session.remove()
+    with app.test_request_context():
+        g.current_user_id = 2
+        with replica_reads():
+            assert Order.query.count() == 1
+
+
+
+def test_bulk_update_reads_its_own_writes(routed):
+    app, router, lag = routed
+    with app.test_request_context():
+        g.current_user_id = 1
+        assert InboxService.mark_read(1, 1) == 0 # The replica still counts 1
+        db.session.remove()
+
+    assert router.is_sticky(1)
+    with replica_reads():
+        assert InboxService.unread_count(1) == 1 # Other users still read from the replica
+
+
+def test_lag_is_probed_once_per_interval(routed):
+    app, router, lag = routed
+    router.check_interval = 60
+    for _ in range(5):
+        OrderService.get_orders_by_user(1)
+
+    assert lag.calls == 1
@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+from datetime import datetime
+import pytest
+from backend.app import db
+from backend.app.models.document import Document
+from backend.app.models.order import Order
+from backend.app.models.payment import Payment # noqa: F401 (configures Order.payments)
+from backend.app.models.user import User
+from backend.app.services.export_service import ExportService
+from backend.app.utils.exceptions import BadRequestError, NotFoundError
+
+TABLES = [User.__table__, Order.__table__, Document.__table__]
+
+
+@pytest.fixture
+def export_app(sqlite_app):
+    # Export queries are plain SQL, so SQLite exercises the whole path
+    sqlite_app(TABLES)
+    owner, other = User(email='owner@example.com', password_hash='x'), User(email='other@example.com', password_hash='x')
+    db.session.add_all([owner, other])
+    db.session.flush()
+    for day in range(1, 11):
+        order = Order(user_id=owner.id, status='pending', created_at=datetime(2025, 1, day))
+        db.session.add(order)
+        db.session.flush()
+        db.session.add(Document(order_id=order.id, filename=f'faktura-{day}.pdf', file_path='x', file_type='pdf',
+                                uploaded_at=datetime(2025, 1, day)))
+    db.session.add(Order(user_id=other.id, status='pending', created_at=datetime(2025, 1, 5)))
+    db.session.commit()
+    return owner.id
+
+
+def _ndjson(chunks):
+    return [json.loads(line) for line in ''.join(chunks).splitlines()]
+
+
+def test_ndjson_streams_only_the_users_rows_in_batches(export_app):
+    chunks = list(ExportService.stream('orders', 'ndjson', export_app, batch_size=3))
+
+    rows = _ndjson(chunks)
+    assert len(chunks) == 4 # 10 rows in batches of 3
+    assert [row['id'] for row in rows] == list(range(1, 11))
+    assert rows[0] == {'id': 1, 'status': 'pending', 'created_at': '2025-01-01T00:00:00', 'updated_at': rows[0]['updated_at']}
+
+
+def test_resume_after_cursor_and_date_range(export_app):
+    rows = _ndjson(ExportService.stream('documents', 'ndjson', export_app, batch_size=100,
+                                        since=datetime(2025, 1, 3), until=datetime(2025, 1, 8), after=4))
+
+    assert [row['filename'] for row in rows] == ['faktura-5.pdf', 'faktura-6.pdf', 'faktura-7.pdf']
+
+
+def test_csv_has_header_and_one_line_per_row(export_app):
+    text = ''.join(ExportService.stream('documents', 'csv', export_app, batch_size=4))
+
+    rows = list(csv.reader(io.StringIO(text)))
+    assert rows[0] == list(ExportService.columns('documents'))
+    assert len(rows) == 11
+    assert rows[1][2] == 'faktura-1.pdf'
+
+
+def test_csv_of_empty_export_is_just_the_header(export_app):
+    text = ''.join(ExportService.stream('orders', 'csv', export_app, batch_size=4, after=1000))
+
+    assert text.splitlines() == [','.join(ExportService.columns('orders'))]
+
+
+def test_invalid_requests(export_app):
+    with pytest.raises(NotFoundError):
+        ExportService.stream('payments', 'ndjson', export_app, batch_size=10)
+    with pytest.raises(BadRequestError):
+        ExportService.stream('orders', 'xml', export_app, batch_size=10)
+    with pytest.raises(BadRequestError):
+        ExportService.stream('orders', 'csv', export_app, batch_size=10,
+                             since=datetime(2025, 2, 1), until=datetime(2025, 1, 1))
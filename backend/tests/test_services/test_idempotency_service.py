@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+import pytest
+from flask import current_app
+from backend.app import db
+from backend.app.models.idempotency_key import IdempotencyKey
+from backend.app.services.idempotency_service import IdempotencyService
+from backend.app.utils.decorators import idempotent
+from backend.app.utils.exceptions import BadRequestError, ConflictError
+
+
+@pytest.fixture
+def view(payments_app):
+    """An @idempotent view counting how often its body really runs."""
+    calls = []
+
+    @idempotent
+    def create(current_user, fail):
+        calls.append(current_user.id)
+        if fail:
+            raise RuntimeError('Stripe is down')
+        return {'call': len(calls)}, 201
+
+    def request(body=b'{"amount": 1000}', key='key-1', fail=False):
+        headers = {'Idempotency-Key': key} if key else {}
+        with current_app.test_request_context('/orders/1/payment-intent', method='POST', data=body, headers=headers):
+            return create(SimpleNamespace(id=payments_app), fail)
+
+    request.calls = calls
+    return request
+
+
+def test_retry_replays_the_stored_response(view):
+    assert view() == ({'call': 1}, 201)
+    assert view() == ({'call': 1}, 201)
+
+    assert len(view.calls) == 1
+    record = IdempotencyKey.query.one()
+    assert record.response_code == 201
+    assert record.completed_at is not None
+
+
+def test_requests_without_key_are_not_recorded(view):
+    view(key=None)
+    view(key=None)
+
+    assert len(view.calls) == 2
+    assert IdempotencyKey.query.count() == 0
+
+
+def test_key_reused_for_a_different_request_is_rejected(view):
+    view()
+
+    with pytest.raises(BadRequestError):
+        view(body=b'{"amount": 2000}')
+    assert len(view.calls) == 1
+
+
+def test_failed_request_releases_the_key(view):
+    with pytest.raises(RuntimeError):
+        view(fail=True)
+    assert IdempotencyKey.query.count() == 0
+
+    assert view() == ({'call': 2}, 201)
+
+
+def test_concurrent_begin_loses_on_the_unique_key(payments_app):
+    fingerprint = IdempotencyService.fingerprint('POST', '/orders/1/payment-intent?', b'{}')
+    first = IdempotencyService.begin(payments_app, 'key-1', fingerprint)
+
+    # The second request of the race hits uq_idempotency_keys_user_id_key while the first is in flight
+    with pytest.raises(ConflictError):
+        IdempotencyService.begin(payments_app, 'key-1', fingerprint)
+
+    IdempotencyService.complete(first, {'client_secret': 'pi_fake_1_secret'}, 201)
+    replay = IdempotencyService.begin(payments_app, 'key-1', fingerprint)
+    assert replay.id == first.id
+    assert (replay.response_body, replay.response_code) == ({'client_secret': 'pi_fake_1_secret'}, 201)
+    assert db.session.query(IdempotencyKey).count() == 1
@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+import pytest
+from backend.app import db
+from backend.app.models.in_app_notification import InAppNotification
+from backend.app.models.unread_notification_counter import UnreadNotificationCounter
+from backend.app.models.user import User
+from backend.app.services.inbox_service import InboxService
+from backend.app.services.notification_service import NotificationService
+from backend.app.utils.exceptions import NotFoundError
+
+TABLES = [User.__table__, InAppNotification.__table__, UnreadNotificationCounter.__table__]
+
+
+@pytest.fixture
+def inbox(sqlite_app):
+    sqlite_app(TABLES)
+    user = User(email='reader@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    for i in range(5):
+        NotificationService.send_in_app_notification(user.id, f'Analysis {i} completed')
+    db.session.commit()
+    return SimpleNamespace(id=user.id)
+
+
+def test_insert_increments_unread_counter(inbox):
+    assert InboxService.unread_count(inbox.id) == 5
+
+
+def test_cursor_pages_are_newest_first_and_disjoint(inbox):
+    first, cursor = InboxService.list_notifications(inbox.id, limit=2)
+    second, cursor = InboxService.list_notifications(inbox.id, cursor=cursor, limit=2)
+    third, cursor = InboxService.list_notifications(inbox.id, cursor=cursor, limit=2)
+
+    ids = [n.id for n in first + second + third]
+    assert ids == sorted(ids, reverse=True)
+    assert len(set(ids)) == 5
+    assert cursor is None
+
+
+def test_mark_read_decrements_counter_once(inbox):
+    notification = InAppNotification.query.filter_by(user_id=inbox.id).first()
+
+    assert InboxService.mark_read(inbox.id, notification.id) == 4
+    assert InboxService.mark_read(inbox.id, notification.id) == 4 # already read
+
+
+def test_mark_read_of_unknown_notification(inbox):
+    with pytest.raises(NotFoundError):
+        InboxService.mark_read(inbox.id, 999999)
+
+
+def test_mark_all_read_resets_counter(inbox):
+    assert InboxService.mark_all_read(inbox.id) == 5
+    assert InboxService.unread_count(inbox.id) == 0
+    items, _ = InboxService.list_notifications(inbox.id, unread_only=True)
+    assert items == []
@@ -0,0 +1,246 @@
+import socketserver
+import threading
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+from backend.app import db
+from backend.app.models.notification_outbox import NotificationOutbox
+from backend.app.models.user import User
+from backend.app.services.notification_dispatcher import NotificationDispatcher, NotificationJob
+
+TABLES = [User.__table__, NotificationOutbox.__table__]
+
+
+class FakeSMTPHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP dialogue: enough for smtplib.send_message, NOOP and RSET."""
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self._reply('220 fake.smtp ready')
+        in_data = False
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            line = line.decode().rstrip('\r\n')
+            if in_data:
+                if line == '.':
+                    in_data = False
+                    with server.lock:
+                        server.messages.append(self._rcpt)
+                    self._reply('250 queued')
+                continue
+            command = line.split(' ', 1)[0].upper()
+            if command in ('EHLO', 'HELO'):
+                self._reply('250 fake.smtp')
+            elif command == 'MAIL':
+                self._rcpt = []
+                self._reply('250 ok')
+            elif command == 'RCPT':
+                address = line.split(':', 1)[1].strip(' <>')
+                if address in server.rejected:
+                    self._reply('550 no such user')
+                else:
+                    self._rcpt.append(address)
+                    self._reply('250 ok')
+            elif command == 'DATA':
+                in_data = True
+                self._reply('354 go ahead')
+            elif command in ('NOOP', 'RSET'):
+                self._reply('250 ok')
+            elif command == 'QUIT':
+                self._reply('221 bye')
+                return
+            else:
+                self._reply('502 not implemented')
+
+    def _reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+
+@pytest.fixture
+def fake_smtp():
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), FakeSMTPHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    server.messages = []
+    server.rejected = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def dispatcher(fake_smtp, sqlite_app):
+    app = sqlite_app(
+        TABLES,
+        SMTP_HOST='127.0.0.1',
+        SMTP_PORT=fake_smtp.server_address[1],
+        SMTP_USERNAME=None,
+        SMTP_USE_TLS=False,
+        SMTP_TIMEOUT=2,
+        NOTIFICATION_CHANNEL_CONCURRENCY={'email': 2, 'sms': 1},
+    )
+    dispatcher = NotificationDispatcher(app)
+    yield dispatcher
+    dispatcher.close()
+
+
+def _email(job_id, recipient):
+    return NotificationJob(job_id, 'email', recipient, 'Order update', 'Your order has shipped.', 0)
+
+
+def test_smtp_connections_are_reused_across_messages(dispatcher, fake_smtp):
+    jobs = [_email(i, f'user{i}@example.com') for i in range(10)]
+
+    results = dispatcher.dispatch(jobs)
+
+    assert all(error is None for error in results.values())
+    assert len(fake_smtp.messages) == 10
+    assert fake_smtp.connections <= 2 # bounded by the email channel concurrency
+
+
+def test_rejected_recipient_fails_only_its_job(dispatcher, fake_smtp):
+    fake_smtp.rejected.add('bounce@example.com')
+    jobs = [_email(1, 'ok@example.com'), _email(2, 'bounce@example.com'), _email(3, 'also-ok@example.com')]
+
+    results = dispatcher.dispatch(jobs)
+
+    assert results[1] is None
+    assert results[3] is None
+    assert 'SMTPRecipientsRefused' in results[2]
+    assert len(fake_smtp.messages) == 2
+
+
+def test_unknown_channel_is_reported_as_failure(dispatcher):
+    results = dispatcher.dispatch([NotificationJob(1, 'pigeon', 'x', None, 'hi', 0)])
+
+    assert results[1] == 'Unknown notification channel.'
+
+
+def _row(row_id, user_id, channel='email', type='info', recipient='user@example.com', attempts=0):
+    return SimpleNamespace(
+        id=row_id, user_id=user_id, channel=channel, type=type, recipient=recipient,
+        subject=f'Document {row_id} analysed', body=f'Analysis {row_id} is ready.', attempts=attempts
+    )
+
+
+def test_rows_of_one_user_are_merged_into_a_digest(dispatcher):
+    rows = [_row(i, user_id=7) for i in range(1, 41)] + [_row(41, user_id=8, recipient='other@example.com')]
+
+    jobs = dispatcher.build_jobs(rows)
+
+    assert len(jobs) == 2
+    digest = jobs[0]
+    assert digest.row_ids == tuple(range(1, 41))
+    assert digest.subject == 'You have 40 new notifications'
+    assert 'Document 40 analysed' in digest.body
+    assert jobs[1].row_ids == ()
+
+
+def test_digest_keeps_the_attempts_of_each_row(dispatcher):
+    jobs = dispatcher.build_jobs([_row(1, user_id=7, attempts=4), _row(2, user_id=7)])
+
+    assert jobs[0].attempts == 0
+    assert jobs[0].row_attempts == (4, 0)
+
+
+def test_urgent_rows_bypass_the_digest(dispatcher):
+    rows = [
+        _row(1, user_id=7),
+        _row(2, user_id=7, type='security'),
+        _row(3, user_id=7, type='security'),
+        _row(4, user_id=None),
+        _row(5, user_id=7),
+    ]
+
+    jobs = dispatcher.build_jobs(rows)
+
+    assert sorted(job.id for job in jobs) == [1, 2, 3, 4]
+    assert next(job for job in jobs if job.id == 1).row_ids == (1, 5)
+
+
+def test_digest_is_sent_as_one_message(dispatcher, fake_smtp):
+    jobs = dispatcher.build_jobs([_row(i, user_id=7) for i in range(1, 11)])
+
+    results = dispatcher.dispatch(jobs)
+
+    assert results == {1: None}
+    assert fake_smtp.messages == [['user@example.com']]
+
+
+def _outbox(recipient, type='urgent', **values):
+    row = NotificationOutbox(channel='email', recipient=recipient, subject='Order update', body='Shipped.', type=type, **values)
+    db.session.add(row)
+    db.session.commit()
+    return row.id
+
+
+def test_claim_commits_the_lease_before_sending(dispatcher):
+    due = _outbox('due@example.com')
+    _outbox('later@example.com', next_attempt_at=datetime.utcnow() + timedelta(hours=1))
+
+    jobs, lease = dispatcher.claim()
+
+    assert [job.id for job in jobs] == [due]
+    assert not db.session().in_transaction() # no row lock is held while sending
+    row = db.session.get(NotificationOutbox, due)
+    assert (row.status, row.lease_expires_at) == ('sending', lease)
+    assert dispatcher.claim()[0] == [] # leased rows are not claimed twice
+
+
+def test_run_once_records_results_in_a_second_transaction(dispatcher, fake_smtp):
+    fake_smtp.rejected.add('bounce@example.com')
+    sent, bounced = _outbox('ok@example.com'), _outbox('bounce@example.com')
+
+    summary = dispatcher.run_once()
+
+    assert summary == {'claimed': 2, 'messages': 2, 'sent': 1, 'failed': 1}
+    rows = {row.id: row for row in NotificationOutbox.query}
+    assert (rows[sent].status, rows[sent].attempts, rows[sent].lease_expires_at) == ('sent', 1, None)
+    assert (rows[bounced].status, rows[bounced].attempts, rows[bounced].lease_expires_at) == ('pending', 1, None)
+    assert 'SMTPRecipientsRefused' in rows[bounced].last_error
+
+
+def test_expired_lease_is_claimed_again(dispatcher):
+    now = datetime.utcnow()
+    stuck = _outbox('stuck@example.com', status='sending', lease_expires_at=now - timedelta(seconds=1))
+    _outbox('busy@example.com', status='sending', lease_expires_at=now + timedelta(minutes=5))
+
+    jobs, _ = dispatcher.claim()
+
+    assert [job.id for job in jobs] == [stuck]
+
+
+def test_results_are_dropped_when_the_lease_was_lost(dispatcher, fake_smtp):
+    row_id = _outbox('slow@example.com')
+    jobs, lease = dispatcher.claim()
+    # The lease ran out and another dispatcher claimed the row meanwhile
+    NotificationOutbox.query.filter_by(id=row_id).update({'lease_expires_at': lease + timedelta(minutes=5)})
+    db.session.commit()
+
+    dispatcher._record_results(jobs, dispatcher.dispatch(jobs), lease)
+    db.session.commit()
+
+    assert db.session.get(NotificationOutbox, row_id).status == 'sending'
+
+
+def test_new_row_merged_with_a_retrying_one_is_not_failed_early(dispatcher, fake_smtp):
+    fake_smtp.rejected.add('user@example.com')
+    user = User(email='user@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+    retrying = _outbox('user@example.com', type='info', user_id=user.id, attempts=4)
+    fresh = _outbox('user@example.com', type='info', user_id=user.id)
+
+    summary = dispatcher.run_once()
+
+    assert summary['messages'] == 1 # one digest for both rows
+    rows = {row.id: row for row in NotificationOutbox.query}
+    assert (rows[retrying].status, rows[retrying].attempts) == ('failed', 5)
+    assert (rows[fresh].status, rows[fresh].attempts) == ('pending', 1)
@@ -0,0 +1,70 @@
+import time
+import pytest
+import stripe
+from flask import Flask
+from backend.app.config import TestingConfig
+from backend.app.services.payment_gateway import PaymentGateway
+
+
+@pytest.fixture
+def gateway(fake_stripe):
+    app = Flask(__name__)
+    app.config.from_object(TestingConfig)
+    app.config.update(
+        STRIPE_SECRET_KEY='sk_test_fake',
+        STRIPE_API_BASE=f'http://127.0.0.1:{fake_stripe.server_port}',
+        STRIPE_READ_TIMEOUT=0.5,
+        STRIPE_MAX_RETRIES=2,
+        STRIPE_RETRY_BACKOFF=0.01,
+    )
+    return PaymentGateway(app)
+
+
+def test_create_payment_intent_sends_idempotency_key(gateway, fake_stripe):
+    intent = gateway.create_payment_intent(1000, 'usd', {'order_id': 1}, idempotency_key='order-1-attempt-1')
+
+    assert intent.client_secret == 'pi_fake_1_secret'
+    assert fake_stripe.requests[0][2]['Idempotency-Key'] == 'order-1-attempt-1'
+
+
+def test_retries_reuse_the_same_idempotency_key(gateway, fake_stripe):
+    fake_stripe.failures_left = 2
+
+    intent = gateway.create_payment_intent(1000, 'usd', {'order_id': 1})
+
+    assert intent.id == 'pi_fake_1'
+    keys = {headers['Idempotency-Key'] for _, _, headers, _ in fake_stripe.requests}
+    assert len(fake_stripe.requests) == 3
+    assert len(keys) == 1
+    assert gateway.metrics()['payment_intents.create']['retries'] == 2
+
+
+def test_retries_are_bounded(gateway, fake_stripe):
+    fake_stripe.failures_left = 10
+
+    with pytest.raises(stripe.error.APIError):
+        gateway.retrieve_payment_intent('pi_fake_1')
+
+    assert len(fake_stripe.requests) == 3 # 1 call + STRIPE_MAX_RETRIES
+
+
+def test_read_timeout_bounds_slow_responses(gateway, fake_stripe):
+    fake_stripe.delay = 2
+    gateway.max_retries = 0
+
+    start = time.perf_counter()
+    with pytest.raises(stripe.error.APIConnectionError):
+        gateway.retrieve_payment_intent('pi_fake_1')
+
+    assert time.perf_counter() - start < 1.5
+
+
+def test_connections_are_kept_alive(gateway, fake_stripe):
+    for _ in range(3):
+        gateway.retrieve_payment_intent('pi_fake_1')
+
+    client_ports = {address[1] for _, _, _, address in fake_stripe.requests}
+    assert len(client_ports) == 1
+    stats = gateway.metrics()['payment_intents.retrieve']
+    assert stats['count'] == 3
+    assert stats['errors'] == 0
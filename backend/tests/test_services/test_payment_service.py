@@ -0,0 +1,131 @@
+import hashlib
+import hmac
+import json
+import time
+import pytest
+from backend.app import db
+from backend.app.models.order import Order
+from backend.app.models.payment import Payment
+from backend.app.models.stripe_event import StripeEvent
+from backend.app.services.payment_service import PaymentService
+from backend.app.utils.exceptions import BadRequestError, ConflictError
+
+
+def _order(user_id):
+    order = Order(user_id=user_id, status='pending')
+    db.session.add(order)
+    db.session.commit()
+    return order
+
+
+def _webhook(event_id, status, intent_id='pi_fake_1', secret='whsec_test'):
+    """A payment_intent event signed the way Stripe signs webhooks: (payload, Stripe-Signature header)."""
+    payload = json.dumps({
+        'id': event_id, 'object': 'event', 'type': f'payment_intent.{status}',
+        'data': {'object': {'id': intent_id, 'object': 'payment_intent', 'status': status}}
+    })
+    timestamp = int(time.time())
+    signature = hmac.new(secret.encode(), f'{timestamp}.{payload}'.encode(), hashlib.sha256).hexdigest()
+    return payload.encode(), f't={timestamp},v1={signature}'
+
+
+def test_new_payment_is_confirmed_against_stripe(payments_app, fake_stripe):
+    order = _order(payments_app)
+    PaymentService.create_payment_intent(order.id, 1000, payments_app)
+    assert Payment.query.one().status_synced_at is None
+
+    assert PaymentService.confirm_payment(order.id, 'pi_fake_1', payments_app) is True
+
+    assert [command for command, *_ in fake_stripe.requests] == ['POST', 'GET']
+    assert order.status == 'paid'
+
+    PaymentService.confirm_payment(order.id, 'pi_fake_1', payments_app) # final status, no second lookup
+    assert len(fake_stripe.requests) == 2
+
+
+def test_recently_synced_status_is_trusted(payments_app, fake_stripe):
+    order = _order(payments_app)
+    PaymentService.create_payment_intent(order.id, 1000, payments_app)
+    PaymentService.handle_webhook_event(*_webhook('evt_1', 'processing'))
+
+    with pytest.raises(BadRequestError):
+        PaymentService.confirm_payment(order.id, 'pi_fake_1', payments_app)
+
+    assert [command for command, *_ in fake_stripe.requests] == ['POST']
+
+
+def test_webhook_rejects_missing_or_invalid_signature(payments_app):
+    payload, signature = _webhook('evt_1', 'succeeded')
+
+    with pytest.raises(BadRequestError) as missing:
+        PaymentService.handle_webhook_event(payload, None)
+    with pytest.raises(BadRequestError) as tampered:
+        PaymentService.handle_webhook_event(payload.replace(b'succeeded', b'canceled'), signature)
+    with pytest.raises(BadRequestError) as wrong_secret:
+        PaymentService.handle_webhook_event(*_webhook('evt_1', 'succeeded', secret='whsec_other'))
+
+    assert missing.value.message == 'Missing Stripe-Signature header.'
+    assert tampered.value.message == wrong_secret.value.message == 'Invalid webhook signature.'
+
+    assert StripeEvent.query.count() == 0
+
+
+def test_webhook_redelivery_is_applied_once(payments_app):
+    order = _order(payments_app)
+    PaymentService.create_payment_intent(order.id, 1000, payments_app)
+    payload, signature = _webhook('evt_1', 'succeeded')
+
+    assert PaymentService.handle_webhook_event(payload, signature) is True
+    assert PaymentService.handle_webhook_event(payload, signature) is False
+
+    assert StripeEvent.query.count() == 1
+    assert Payment.query.one().status == 'succeeded'
+    assert db.session.get(Order, order.id).status == 'paid'
+
+
+def test_out_of_order_webhook_keeps_final_status(payments_app):
+    order = _order(payments_app)
+    PaymentService.create_payment_intent(order.id, 1000, payments_app)
+
+    PaymentService.handle_webhook_event(*_webhook('evt_2', 'succeeded'))
+    PaymentService.handle_webhook_event(*_webhook('evt_1', 'processing')) # delivered late
+
+    payment = Payment.query.one()
+    assert payment.status == 'succeeded'
+    assert payment.status_synced_at is not None
+    assert StripeEvent.query.count() == 2
+
+
+def test_open_intent_keeps_blocking_a_second_payment(payments_app, fake_stripe):
+    order = _order(payments_app)
+    PaymentService.create_payment_intent(order.id, 1000, payments_app)
+    PaymentService.handle_webhook_event(*_webhook('evt_1', 'requires_payment_method'))
+
+    assert Payment.query.one().status == 'pending'
+    with pytest.raises(ConflictError):
+        PaymentService.create_payment_intent(order.id, 1000, payments_app)
+    assert [command for command, *_ in fake_stripe.requests] == ['POST']
+
+
+def test_failed_confirmation_reports_the_stripe_status(payments_app, fake_stripe):
+    order = _order(payments_app)
+    PaymentService.create_payment_intent(order.id, 1000, payments_app)
+    fake_stripe.intents['pi_fake_1'] = 'requires_action'
+
+    with pytest.raises(BadRequestError) as error:
+        PaymentService.confirm_payment(order.id, 'pi_fake_1', payments_app)
+
+    assert 'requires_action' in error.value.message
+    assert Payment.query.one().status == 'pending'
+
+
+def test_new_intent_after_a_canceled_one(payments_app, fake_stripe):
+    order = _order(payments_app)
+    PaymentService.create_payment_intent(order.id, 1000, payments_app)
+    PaymentService.handle_webhook_event(*_webhook('evt_1', 'canceled'))
+
+    PaymentService.create_payment_intent(order.id, 1000, payments_app)
+
+    assert [(p.stripe_payment_intent_id, p.status) for p in Payment.query.order_by(Payment.id)] == [
+        ('pi_fake_1', 'canceled'), ('pi_fake_2', 'pending'),
+    ]
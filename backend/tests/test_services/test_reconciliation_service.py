@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlsplit
+import pytest
+import stripe
+from sqlalchemy import event
+from backend.app import db, payment_gateway
+from backend.app.models.order import Order
+from backend.app.models.payment import Payment
+from backend.app.models.reconciliation_checkpoint import ReconciliationCheckpoint
+from backend.app.services.reconciliation_service import PaymentReconciliationService
+
+STRIPE_STATUSES = ['succeeded', 'requires_payment_method', 'canceled', 'succeeded', 'processing']
+
+
+@pytest.fixture
+def payments(payments_app, fake_stripe):
+    """Five pending local payments pi_1..pi_5 and their current status in Stripe."""
+    for number, status in enumerate(STRIPE_STATUSES, start=1):
+        order = Order(user_id=payments_app, status='pending')
+        db.session.add(order)
+        db.session.flush()
+        db.session.add(Payment(order_id=order.id, stripe_payment_intent_id=f'pi_{number}', amount=10.0, status='pending'))
+        fake_stripe.intents[f'pi_{number}'] = status
+    db.session.commit()
+
+
+def _list_queries(fake_stripe):
+    return [parse_qs(urlsplit(path).query) for command, path, *_ in fake_stripe.requests if command == 'GET']
+
+
+def _statuses():
+    return {payment.stripe_payment_intent_id: payment.status for payment in Payment.query.order_by(Payment.id)}
+
+
+def test_pages_are_applied_with_one_update_each(payments, fake_stripe):
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+    summary = PaymentReconciliationService.reconcile(page_size=2)
+
+    assert summary == {'pages': 3, 'intents': 5, 'payments_synced': 5, 'orders_paid': 2, 'resumed': False}
+    updates = [statement for statement in statements if statement.startswith('UPDATE payments')]
+    assert len(updates) == 3 # one executemany UPDATE per page
+    assert _statuses() == {'pi_1': 'succeeded', 'pi_2': 'pending', 'pi_3': 'canceled', 'pi_4': 'succeeded', 'pi_5': 'pending'}
+    assert Order.query.filter_by(status='paid').count() == 2
+
+    queries = _list_queries(fake_stripe)
+    assert [query.get('starting_after') for query in queries] == [None, ['pi_2'], ['pi_4']]
+    checkpoint = db.session.get(ReconciliationCheckpoint, PaymentReconciliationService.CHECKPOINT_NAME)
+    assert checkpoint.starting_after is None and checkpoint.last_completed_at is not None
+
+
+def test_interrupted_run_resumes_after_the_last_page(payments, fake_stripe, monkeypatch):
+    list_payment_intents = payment_gateway.list_payment_intents
+    calls = []
+
+    def fail_second_page(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 2:
+            fake_stripe.failures_left = 1
+        return list_payment_intents(**kwargs)
+
+    monkeypatch.setattr(payment_gateway, 'list_payment_intents', fail_second_page)
+    with pytest.raises(stripe.error.APIError):
+        PaymentReconciliationService.reconcile(page_size=2)
+    db.session.rollback()
+
+    checkpoint = db.session.get(ReconciliationCheckpoint, PaymentReconciliationService.CHECKPOINT_NAME)
+    assert checkpoint.starting_after == 'pi_2'
+    assert _statuses()['pi_1'] == 'succeeded' and _statuses()['pi_4'] == 'pending'
+
+    summary = PaymentReconciliationService.reconcile(page_size=2)
+
+    assert summary['resumed'] is True
+    assert (summary['pages'], summary['intents']) == (2, 3)
+    assert calls[2]['starting_after'] == 'pi_2'
+    assert calls[2]['created'] == calls[0]['created'] # same window as the interrupted run
+    assert _statuses()['pi_4'] == 'succeeded'
+
+
+def test_window_ignores_abandoned_payments(payments, fake_stripe):
+    long_ago = datetime.utcnow() - timedelta(days=90)
+    Payment.query.filter(Payment.stripe_payment_intent_id != 'pi_5').update({'created_at': long_ago})
+    db.session.commit()
+
+    PaymentReconciliationService.reconcile()
+
+    created = _list_queries(fake_stripe)[0]
+    window_start = datetime.utcfromtimestamp(int(created['created[gte]'][0]))
+    assert window_start > datetime.utcnow() - timedelta(hours=1)
+
+    Payment.query.filter_by(stripe_payment_intent_id='pi_5').update({'created_at': long_ago})
+    db.session.commit()
+    fake_stripe.requests.clear()
+
+    assert PaymentReconciliationService.reconcile()['pages'] == 0
+    assert fake_stripe.requests == []
@@ -0,0 +1,114 @@
+-- Liczniki statystyk kancelarii utrzymywane przyrostowo przez triggery.
+-- Odczyt statystyk to jeden wiersz zamiast złączenia law_firms z clients i cases.
+CREATE TABLE public.law_firm_stats (
+    law_firm_id UUID NOT NULL PRIMARY KEY REFERENCES public.law_firms(id) ON DELETE CASCADE,
+    clients_count INTEGER NOT NULL DEFAULT 0,
+    cases_count INTEGER NOT NULL DEFAULT 0,
+    active_cases_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+);
+
+ALTER TABLE public.law_firm_stats ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view their law firm stats" ON public.law_firm_stats
+    FOR SELECT USING (
+        law_firm_id = public.get_user_law_firm(auth.uid()) OR
+        public.get_user_role(auth.uid()) = 'admin'
+    );
+
+-- Zmiana liczników jednej kancelarii. Wiersz powstaje tylko przy przyroście:
+-- przy kaskadowym usuwaniu kancelarii nie wolno go odtwarzać.
+CREATE OR REPLACE FUNCTION public.bump_law_firm_stats(
+    p_law_firm_id UUID, p_clients INTEGER, p_cases INTEGER, p_active_cases INTEGER
+)
+RETURNS VOID AS $$
+BEGIN
+    IF p_clients = 0 AND p_cases = 0 AND p_active_cases = 0 THEN
+        RETURN;
+    END IF;
+
+    UPDATE public.law_firm_stats
+    SET clients_count = clients_count + p_clients,
+        cases_count = cases_count + p_cases,
+        active_cases_count = active_cases_count + p_active_cases,
+        updated_at = now()
+    WHERE law_firm_id = p_law_firm_id;
+
+    IF NOT FOUND AND p_clients >= 0 AND p_cases >= 0 AND p_active_cases >= 0 THEN
+        INSERT INTO public.law_firm_stats AS s (law_firm_id, clients_count, cases_count, active_cases_count)
+        VALUES (p_law_firm_id, p_clients, p_cases, p_active_cases)
+        ON CONFLICT (law_firm_id) DO UPDATE SET
+            clients_count = s.clients_count + EXCLUDED.clients_count,
+            cases_count = s.cases_count + EXCLUDED.cases_count,
+            active_cases_count = s.active_cases_count + EXCLUDED.active_cases_count,
+            updated_at = now();
+    END IF;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION public.law_firm_stats_on_client_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.law_firm_id IS NOT DISTINCT FROM NEW.law_firm_id THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM public.bump_law_firm_stats(OLD.law_firm_id, -1, 0, 0);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM public.bump_law_firm_stats(NEW.law_firm_id, 1, 0, 0);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION public.law_firm_stats_on_case_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.law_firm_id IS NOT DISTINCT FROM NEW.law_firm_id
+            AND OLD.status IS NOT DISTINCT FROM NEW.status THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM public.bump_law_firm_stats(OLD.law_firm_id, 0, -1, -(OLD.status = 'active')::INTEGER);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM public.bump_law_firm_stats(NEW.law_firm_id, 0, 1, (NEW.status = 'active')::INTEGER);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION public.law_firm_stats_on_law_firm_insert()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO public.law_firm_stats (law_firm_id) VALUES (NEW.id) ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE TRIGGER law_firms_stats_insert
+    AFTER INSERT ON public.law_firms
+    FOR EACH ROW
+    EXECUTE FUNCTION public.law_firm_stats_on_law_firm_insert();
+
+CREATE TRIGGER clients_law_firm_stats
+    AFTER INSERT OR DELETE OR UPDATE OF law_firm_id ON public.clients
+    FOR EACH ROW
+    EXECUTE FUNCTION public.law_firm_stats_on_client_change();
+
+CREATE TRIGGER cases_law_firm_stats
+    AFTER INSERT OR DELETE OR UPDATE OF law_firm_id, status ON public.cases
+    FOR EACH ROW
+    EXECUTE FUNCTION public.law_firm_stats_on_case_change();
+
+-- Stan początkowy (tabela jest jeszcze pusta; osobne podzapytania zamiast
+-- złączenia clients x cases, które zawyżało liczbę klientów)
+INSERT INTO public.law_firm_stats (law_firm_id, clients_count, cases_count, active_cases_count)
+SELECT
+    f.id,
+    (SELECT count(*) FROM public.clients c WHERE c.law_firm_id = f.id),
+    (SELECT count(*) FROM public.cases s WHERE s.law_firm_id = f.id),
+    (SELECT count(*) FROM public.cases s WHERE s.law_firm_id = f.id AND s.status = 'active')
+FROM public.law_firms f
+ON CONFLICT (law_firm_id) DO NOTHING;
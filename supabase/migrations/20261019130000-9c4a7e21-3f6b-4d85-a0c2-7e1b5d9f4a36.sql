@@ -0,0 +1,22 @@
+-- Wersja spraw kancelarii: podbijana przy każdym zapisie do cases.
+-- API trzyma statystyki spraw w pamięci pod tą wersją (jeden odczyt wiersza zamiast agregacji).
+ALTER TABLE public.law_firm_stats ADD COLUMN cases_version BIGINT NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION public.law_firm_stats_bump_cases_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- Wiersz law_firm_stats zakłada wcześniejszy trigger cases_law_firm_stats (kolejność alfabetyczna)
+    UPDATE public.law_firm_stats
+    SET cases_version = cases_version + 1
+    WHERE law_firm_id IN (
+        CASE WHEN TG_OP <> 'INSERT' THEN OLD.law_firm_id END,
+        CASE WHEN TG_OP <> 'DELETE' THEN NEW.law_firm_id END
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE TRIGGER cases_stats_version
+    AFTER INSERT OR UPDATE OR DELETE ON public.cases
+    FOR EACH ROW
+    EXECUTE FUNCTION public.law_firm_stats_bump_cases_version();
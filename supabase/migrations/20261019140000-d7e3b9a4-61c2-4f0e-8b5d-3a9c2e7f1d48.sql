@@ -0,0 +1,44 @@
+-- Wyszukiwanie klientów po podciągu: kolumna search_text (bez diakrytyków)
+-- z indeksem GIN pg_trgm zamiast ILIKE na concat(...) przeglądającego wszystkich klientów.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+-- Odpowiednik app.core.search.search_fold w API
+CREATE OR REPLACE FUNCTION public.search_fold(value TEXT)
+RETURNS TEXT AS $$
+    SELECT btrim(regexp_replace(lower(public.unaccent('public.unaccent', coalesce(value, ''))), '\s+', ' ', 'g'));
+$$ LANGUAGE SQL IMMUTABLE;
+
+-- Odpowiednik app.core.search.client_search_text w API
+CREATE OR REPLACE FUNCTION public.client_search_text(
+    first_name TEXT, last_name TEXT, email TEXT, phone TEXT, pesel TEXT
+)
+RETURNS TEXT AS $$
+    SELECT concat_ws(' ',
+        nullif(public.search_fold(first_name), ''),
+        nullif(public.search_fold(last_name), ''),
+        nullif(public.search_fold(email), ''),
+        nullif(regexp_replace(coalesce(phone, ''), '\D', '', 'g'), ''),
+        nullif(btrim(pesel), '')
+    );
+$$ LANGUAGE SQL IMMUTABLE;
+
+ALTER TABLE public.clients ADD COLUMN search_text TEXT;
+
+CREATE OR REPLACE FUNCTION public.set_client_search_text()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.search_text := public.client_search_text(NEW.first_name, NEW.last_name, NEW.email, NEW.phone, NEW.pesel);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER set_clients_search_text
+    BEFORE INSERT OR UPDATE OF first_name, last_name, email, phone, pesel ON public.clients
+    FOR EACH ROW
+    EXECUTE FUNCTION public.set_client_search_text();
+
+UPDATE public.clients
+SET search_text = public.client_search_text(first_name, last_name, email, phone, pesel);
+
+CREATE INDEX idx_clients_search_text_trgm ON public.clients USING gin (search_text gin_trgm_ops);
@@ -0,0 +1,93 @@
+-- Wyszukiwanie pełnotekstowe spraw: tsvector z numeru, tytułu, opisu i jawnych
+-- (is_private = false) notatek, w osobnej tabeli case_search z indeksem GIN.
+-- Osobna tabela: dopisanie notatki nie przepisuje wiersza cases (updated_at, wersja statystyk).
+
+-- Konfiguracja "polish": bez słownika hunspell PostgreSQL nie ma polskiej odmiany,
+-- więc domyślnie to simple + unaccent. Po instalacji słownika wystarczy zmienić mapowanie.
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_ts_config WHERE cfgname = 'polish' AND cfgnamespace = 'public'::regnamespace
+    ) THEN
+        CREATE TEXT SEARCH CONFIGURATION public.polish (COPY = pg_catalog.simple);
+        ALTER TEXT SEARCH CONFIGURATION public.polish
+            ALTER MAPPING FOR asciiword, asciihword, hword_asciipart, word, hword, hword_part
+            WITH public.unaccent, simple;
+    END IF;
+END
+$$;
+
+CREATE TABLE public.case_search (
+    case_id UUID NOT NULL PRIMARY KEY REFERENCES public.cases(id) ON DELETE CASCADE,
+    law_firm_id UUID NOT NULL REFERENCES public.law_firms(id) ON DELETE CASCADE,
+    search_vector TSVECTOR NOT NULL
+);
+
+CREATE INDEX idx_case_search_vector ON public.case_search USING gin (search_vector);
+CREATE INDEX idx_case_search_law_firm_id ON public.case_search(law_firm_id);
+
+ALTER TABLE public.case_search ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Law firm members can search cases" ON public.case_search
+    FOR SELECT USING (law_firm_id = public.get_user_law_firm(auth.uid()));
+
+-- Wagi: A - numer i tytuł, B - opis, C - notatki
+CREATE OR REPLACE FUNCTION public.case_search_vector(p_case_id UUID)
+RETURNS TSVECTOR AS $$
+    SELECT setweight(to_tsvector('public.polish', coalesce(c.case_number, '')), 'A')
+        || setweight(to_tsvector('public.polish', coalesce(c.title, '')), 'A')
+        || setweight(to_tsvector('public.polish', coalesce(c.description, '')), 'B')
+        || setweight(to_tsvector('public.polish', coalesce((
+            SELECT string_agg(n.content, ' ' ORDER BY n.created_at)
+            FROM public.case_notes n
+            WHERE n.case_id = c.id AND n.is_private IS NOT TRUE
+        ), '')), 'C')
+    FROM public.cases c
+    WHERE c.id = p_case_id;
+$$ LANGUAGE SQL STABLE SET search_path = public;
+
+CREATE OR REPLACE FUNCTION public.case_search_on_case_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO public.case_search (case_id, law_firm_id, search_vector)
+    VALUES (NEW.id, NEW.law_firm_id, public.case_search_vector(NEW.id))
+    ON CONFLICT (case_id) DO UPDATE SET
+        law_firm_id = EXCLUDED.law_firm_id,
+        search_vector = EXCLUDED.search_vector;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Nowa jawna notatka jest dopisywana do wektora; zmiana lub usunięcie przelicza go od nowa
+CREATE OR REPLACE FUNCTION public.case_search_on_note_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        IF NEW.is_private IS NOT TRUE THEN
+            UPDATE public.case_search
+            SET search_vector = search_vector || setweight(to_tsvector('public.polish', NEW.content), 'C')
+            WHERE case_id = NEW.case_id;
+        END IF;
+        RETURN NULL;
+    END IF;
+
+    -- coalesce: przy kaskadowym usuwaniu sprawy jej wiersz w cases już nie istnieje
+    UPDATE public.case_search
+    SET search_vector = coalesce(public.case_search_vector(case_id), search_vector)
+    WHERE case_id IN (OLD.case_id, CASE WHEN TG_OP = 'UPDATE' THEN NEW.case_id END);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE TRIGGER cases_case_search
+    AFTER INSERT OR UPDATE OF case_number, title, description, law_firm_id ON public.cases
+    FOR EACH ROW
+    EXECUTE FUNCTION public.case_search_on_case_change();
+
+CREATE TRIGGER case_notes_case_search
+    AFTER INSERT OR DELETE OR UPDATE OF content, is_private, case_id ON public.case_notes
+    FOR EACH ROW
+    EXECUTE FUNCTION public.case_search_on_note_change();
+
+INSERT INTO public.case_search (case_id, law_firm_id, search_vector)
+SELECT id, law_firm_id, public.case_search_vector(id) FROM public.cases;
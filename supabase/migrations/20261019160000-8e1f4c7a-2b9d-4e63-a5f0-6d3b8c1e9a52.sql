@@ -0,0 +1,8 @@
+-- Indeksy dla paginacji kursorem (created_at, id) od najnowszych: strona to odczyt
+-- `limit` + 1 wpisów indeksu niezależnie od tego, jak daleko jest od początku listy.
+CREATE INDEX idx_law_firms_created_at_id ON public.law_firms(created_at DESC, id DESC);
+CREATE INDEX idx_clients_law_firm_created_at_id ON public.clients(law_firm_id, created_at DESC, id DESC);
+CREATE INDEX idx_clients_created_at_id ON public.clients(created_at DESC, id DESC);
+CREATE INDEX idx_cases_law_firm_created_at_id ON public.cases(law_firm_id, created_at DESC, id DESC);
+CREATE INDEX idx_cases_client_created_at_id ON public.cases(client_id, created_at DESC, id DESC);
+CREATE INDEX idx_case_notes_case_created_at_id ON public.case_notes(case_id, created_at DESC, id DESC);
@@ -0,0 +1,4 @@
+-- Najnowsze dokumenty sprawy w szczegółach sprawy (limit osadzonych elementów):
+-- odczyt `limit` + 1 wpisów indeksu zamiast sortowania wszystkich dokumentów sprawy.
+CREATE INDEX idx_documents_case_created_at_id ON public.documents(case_id, created_at DESC, id DESC);
+DROP INDEX IF EXISTS public.idx_documents_case_id;